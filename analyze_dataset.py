@@ -1,11 +1,11 @@
-import pandas as pd
 import geopandas as gpd
 
+from region_codes import RegionCodes
+
 print("Loading data...")
 
-# Load excel region codes
-excel_path = 'datasets/shapefile/센서스 공간정보 지역 코드.xlsx'
-df_codes = pd.read_excel(excel_path)
+# Load region codes (cached registry: the Excel is parsed only when it changes)
+df_codes = RegionCodes.load().frame
 print("\n=== Excel Region Codes Sample ===")
 print(df_codes.head())
 print("Excel Columns:", df_codes.columns)
@@ -1,33 +1,40 @@
 """NABIS 균형발전지표 대시보드 — Plotly Dash."""
 
+import gzip
+import hashlib
 import json
+import os
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
-from dash import Dash, Input, Output, Patch, State, dcc, html, no_update
+from flask import Response, abort, request
+from dash import ClientsideFunction, Dash, Input, Output, Patch, State, dcc, html, no_update
+
+try:
+    import brotli
+except ImportError:  # brotli 미설치: gzip만 사용
+    brotli = None
+try:
+    from flask_compress import Compress
+except ImportError:  # flask-compress 미설치: 압축 없이 동작
+    Compress = None
+
+import data_export
+import metrics
+import static_views
+from figure_cache import FigureCache
+from indicator_store import IndicatorCube, change_missing, read_indicators_csv
+from region_index import RegionIndex
+from region_search import RegionSearch
 
 # ═══════════════════════════════════════════════════════════════════
 # SECTION 1: 데이터 로딩
 # ═══════════════════════════════════════════════════════════════════
 
-DATA = Path("datasets/processed")
-
-# 지표 데이터
-df = pd.read_csv(DATA / "indicators_long.csv")
-df["sido"] = df["sido"].replace({"전라북도": "전북특별자치도"})
-
-# 군위군: 2023년 경상북도 → 대구광역시 편입 (GeoJSON은 최신 기준 대구광역시)
-df.loc[df["sigungu"] == "군위군", "sido"] = "대구광역시"
-
-# 세종: 시도 레벨 데이터를 시군구 데이터에 병합
-sejong = df[(df["sido"] == "세종특별자치시") & (df["region_type"] == "시도")].copy()
-sejong["region_type"] = "시군구"
-df = pd.concat([df, sejong], ignore_index=True)
-
-# 동명 시군구 대응: sido+sigungu 복합키 (서구, 중구, 동구 등 7종 중복)
-df["sido_sigungu"] = df["sido"] + " " + df["sigungu"]
+# 데이터 디렉터리 (합성 데이터 등으로 바꿔 실행할 때 NABIS_DATA_DIR 지정)
+DATA = Path(os.environ.get("NABIS_DATA_DIR", "datasets/processed"))
 
 # 지표 카탈로그
 with open(DATA / "indicator_catalog.json", encoding="utf-8") as f:
@@ -38,25 +45,408 @@ indicator_options = [
     for ind in catalog
 ]
 
+# 시군구 id 색인 (prepare_dashboard_data.py): 큐브 시군구 축과 GeoJSON feature가 같은 id 순서를 공유한다
+regions = RegionIndex.load(DATA / "region_index.json")
+
+# 지표 × 년도 × 시군구 큐브 (콜백은 DataFrame 스캔 대신 배열 슬라이스로 조회)
+# build_indicator_store.py로 만든 번들(지역명 보정·키 검증 완료)이 있으면 mmap으로 열고 (파싱 없음, 워커 간 페이지 공유),
+# 없으면 같은 규칙으로 CSV를 읽어 직접 색인한다.
+STORE = DATA / "indicator_store"
+if (STORE / "meta.json").exists():
+    cube = IndicatorCube.load(STORE)
+    if cube.regions != regions.regions:
+        raise RuntimeError(f"{STORE}의 시군구 축이 region_index.json과 다릅니다. build_indicator_store.py를 다시 실행하세요.")
+else:
+    cube = IndicatorCube.from_frame(
+        read_indicators_csv(DATA / "indicators_long.csv"),
+        [ind["indicator_name"] for ind in catalog],
+        regions.regions,
+    )
+
+# 지역 검색 색인 (region_search.py: 시군구·시도 이름 앞부분·초성). region_hierarchy.json(CSV 원래 지역명)이 있으면 옛 이름으로도 찾는다
+_hierarchy_path = DATA / "region_hierarchy.json"
+if _hierarchy_path.exists():
+    with open(_hierarchy_path, encoding="utf-8") as f:
+        _hierarchy = json.load(f)
+else:
+    _hierarchy = None
+search_index = RegionSearch(cube.regions, cube.sidos, _hierarchy)
+
 # 연도 옵션 (내림차순: 최근 연도가 위에)
-years = sorted(df["publish_year"].unique())
+years = cube.years
 year_options = [{"label": str(y), "value": y} for y in reversed(years)]
 
 # GeoJSON (EPSG:4326)
 with open(DATA / "geo_sgg_4326.json", encoding="utf-8") as f:
     geojson = json.load(f)
 
-# 시도 외곽선 GeoJSON
+# 시도 외곽선 GeoJSON (기본 단계 시군구를 dissolve한 것. 호버 강조와 줌 단계 목록이 없을 때의 외곽선 레이어)
 with open(DATA / "geo_sido_4326.json", encoding="utf-8") as f:
     geojson_sido = json.load(f)
 
+# 지도 응답 캐시 상한 (MB) 및 시작 시 전체 (년도, 지표) 조합 사전 적재 여부
+MAP_CACHE_MB = float(os.environ.get("NABIS_MAP_CACHE_MB", "32"))
+CACHE_WARMUP = os.environ.get("NABIS_CACHE_WARMUP", "0") == "1"
+
+# 지오메트리 전달 방식: "url" (내용 해시 URL의 정적 자산, 브라우저 장기 캐시) | "inline" (Figure JSON에 포함)
+GEOMETRY_MODE = os.environ.get("NABIS_GEOMETRY_MODE", "url")
+
+# 응답 압축 (br/gzip, Accept-Encoding 협상) 및 최소 크기 (bytes, 미만은 압축하지 않음)
+COMPRESS = os.environ.get("NABIS_COMPRESS", "1") == "1" and Compress is not None
+COMPRESS_MIN_SIZE = int(os.environ.get("NABIS_COMPRESS_MIN_SIZE", "500"))
+
+# 호버 강조 방식: "clientside" (브라우저에서 처리) | "server" (강조 레이어만 Patch 전송)
+HOVER_MODE = os.environ.get("NABIS_HOVER_MODE", "clientside")
+# 강조 외곽선 좌표 자릿수 (3자리 ≈ 100 m)
+HOVER_OUTLINE_DIGITS = 3
+
+# 사전 렌더링 뷰 디렉터리 (export_static_views.py 결과, 비우면 사용 안 함)
+STATIC_DIR = os.environ.get("NABIS_STATIC_DIR", "")
+
+EMPTY_GEOJSON = {"type": "FeatureCollection", "features": []}
+
+# 시도별 GeoJSON 캐시 (앱 로딩 시 1회 생성)
+_sido_geojson_cache = {}
+for _f in geojson_sido["features"]:
+    _name = _f["properties"].get("SIDO_NM")
+    if _name:
+        _sido_geojson_cache[_name] = {"type": "FeatureCollection", "features": [_f]}
+
+
+def _polygon_rings(geometry):
+    """Polygon / MultiPolygon / GeometryCollection의 모든 링 좌표."""
+    kind = geometry["type"]
+    if kind == "Polygon":
+        return geometry["coordinates"]
+    if kind == "MultiPolygon":
+        return [ring for polygon in geometry["coordinates"] for ring in polygon]
+    if kind == "GeometryCollection":
+        return [ring for g in geometry["geometries"] for ring in _polygon_rings(g)]
+    return []
+
+
+def _outline(collection, ndigits):
+    """시도 FeatureCollection → 좌표를 반올림한 MultiLineString 외곽선 (강조 레이어 전용)."""
+    lines = []
+    for feature in collection["features"]:
+        for ring in _polygon_rings(feature["geometry"]):
+            line = []
+            for x, y in ring:
+                point = [round(x, ndigits), round(y, ndigits)]
+                if not line or line[-1] != point:
+                    line.append(point)
+            if len(line) >= 2:
+                lines.append(line)
+    return {
+        "type": "FeatureCollection",
+        "features": [{"type": "Feature", "properties": {}, "geometry": {"type": "MultiLineString", "coordinates": lines}}],
+    }
+
+
+# 시도별 경량 외곽선 (원본 3.3 MB → 수백 KB, 호버 강조에만 사용)
+_sido_outline_cache = {name: _outline(fc, HOVER_OUTLINE_DIGITS) for name, fc in _sido_geojson_cache.items()}
+
+# 지오메트리 정적 자산: 파일명 → (본문, 해시). 파일명에 내용 해시가 들어가므로 내용이 바뀌면 URL도 바뀐다.
+_geo_assets = {}
+
+
+def _publish_geometry(name, obj):
+    body = json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    digest = hashlib.sha256(body).hexdigest()[:16]
+    filename = f"{name}.{digest}.json"
+    _geo_assets[filename] = (body, digest)
+    return filename
+
+
+def _feature_bbox(geometry):
+    coords = np.concatenate([np.asarray(ring, dtype=float) for ring in _polygon_rings(geometry)])
+    return [*coords.min(axis=0), *coords.max(axis=0)]
+
+
+# 줌 단계별 시군구 지오메트리와 시도 외곽선 (거친 → 세밀, prepare_dashboard_data.py의 geo_sgg_lod.json).
+# 목록이 없으면 기본 단계(geo_sgg_4326.json, geo_sido_4326.json) 하나만 사용한다. 모든 단계의 feature 위치 = 지역 id.
+# 외곽선은 단계마다 그 단계 시군구를 dissolve한 것이므로 시군구 단계를 바꿀 때 외곽선 레이어도 함께 바꾼다.
+if (DATA / "geo_sgg_lod.json").exists():
+    with open(DATA / "geo_sgg_lod.json", encoding="utf-8") as f:
+        _lod_manifest = sorted(json.load(f), key=lambda entry: entry["min_zoom"])
+else:
+    _lod_manifest = [{"file": "geo_sgg_4326.json", "min_zoom": 0}]
+
+geo_levels = []
+for _entry in _lod_manifest:
+    if _entry["file"] == "geo_sgg_4326.json":
+        _level_geojson = geojson
+    else:
+        with open(DATA / _entry["file"], encoding="utf-8") as f:
+            _level_geojson = json.load(f)
+    if _entry.get("outline", "geo_sido_4326.json") == "geo_sido_4326.json":
+        _level_outline = geojson_sido
+    else:
+        with open(DATA / _entry["outline"], encoding="utf-8") as f:
+            _level_outline = json.load(f)
+    _features = _level_geojson["features"]
+    regions.check_features(_features)
+    geo_levels.append({
+        "min_zoom": _entry["min_zoom"],
+        "geojson": _level_geojson,
+        "outline": _level_outline,
+        "features": _features,
+        "bbox": np.array([_feature_bbox(feat["geometry"]) for feat in _features]),  # (R, 4) minx, miny, maxx, maxy
+    })
+
+# 시도 드릴다운 지오메트리 (prepare_dashboard_data.py의 geo_sgg_sido.json): 시도별 시군구 부분집합 + 시도 범위.
+# 파일이 없으면 가장 세밀한 줌 단계를 시도별로 나눠 쓴다.
+if (DATA / "geo_sgg_sido.json").exists():
+    with open(DATA / "geo_sgg_sido.json", encoding="utf-8") as f:
+        _drill_entries = json.load(f)
+else:
+    _drill_members = {}
+    for _r, (_sido, _) in enumerate(regions.regions):
+        _drill_members.setdefault(_sido, []).append(_r)
+    _drill_entries = [
+        {
+            "sido": _sido,
+            "region_ids": _ids,
+            "bbox": [*geo_levels[-1]["bbox"][_ids, :2].min(axis=0), *geo_levels[-1]["bbox"][_ids, 2:].max(axis=0)],
+            "geojson": {"type": "FeatureCollection", "features": [geo_levels[-1]["features"][_r] for _r in _ids]},
+        }
+        for _sido, _ids in sorted(_drill_members.items())
+    ]
+
+# 지도 영역의 대략 크기 (px): 시도 범위에 맞춘 줌 계산용 (사이드바를 뺀 일반적인 데스크톱 화면)
+MAP_VIEW_PX = (900, 700)
+
+
+def _fit_view(bbox, padding=0.3):
+    """경위도 범위 → 범위가 화면에 들어오는 지도 중심과 줌 (웹 메르카토르, 512 px 타일)."""
+    minx, miny, maxx, maxy = bbox
+    y0, y1 = (np.log(np.tan(np.pi / 4 + np.radians(lat) / 2)) for lat in (miny, maxy))
+    zoom_x = np.log2(MAP_VIEW_PX[0] * 360 / (512 * max(maxx - minx, 1e-6)))
+    zoom_y = np.log2(MAP_VIEW_PX[1] * 2 * np.pi / (512 * max(y1 - y0, 1e-6)))
+    center = {"lat": float(np.degrees(np.arctan(np.sinh((y0 + y1) / 2)))), "lon": float(minx + maxx) / 2}
+    return center, round(float(min(zoom_x, zoom_y)) - padding, 2)
+
+
+# 지역 검색으로 이동할 때의 최대 줌 (작은 구·섬도 주변 시군구와 함께 보이도록)
+SEARCH_MAX_ZOOM = 10.5
+
+
+def _region_view(r):
+    """시군구 r을 가운데에 두는 지도 중심과 줌."""
+    center, zoom = _fit_view(geo_levels[-1]["bbox"][r], padding=1.0)
+    return center, min(zoom, SEARCH_MAX_ZOOM)
+
+
+# 시도 → {ids, locations, customdata, geojson, center, zoom}. 드릴다운 지도는 시도 시군구만 id 순서로 싣는다.
+drill_views = {}
+for _entry in _drill_entries:
+    _ids = np.asarray(_entry["region_ids"], dtype=np.intp)
+    if [feat["properties"].get("region_id") for feat in _entry["geojson"]["features"]] != _ids.tolist():
+        raise ValueError("geo_sgg_sido.json이 지역 색인과 다릅니다. prepare_dashboard_data.py를 다시 실행하세요.")
+    _center, _zoom = _fit_view(_entry["bbox"])
+    drill_views[_entry["sido"]] = {
+        "ids": _ids,
+        "locations": [cube.region_keys[_r] for _r in _ids],
+        "customdata": [list(cube.regions[_r]) for _r in _ids],
+        "geojson": _entry["geojson"],
+        "center": _center,
+        "zoom": _zoom,
+    }
+
 # ═══════════════════════════════════════════════════════════════════
 # SECTION 2: 레이아웃
 # ═══════════════════════════════════════════════════════════════════
 
+# 지도 표시 방식: 값 | 전국 시군구 중 순위·백분위·5분위 | 비교 년도 대비 증감·증감률
+# (모두 큐브에 미리 계산된 배열 — 요청마다 정렬·병합하지 않고 슬라이스만 한다)
+MAP_MODES = {
+    "value": "값", "rank": "순위", "percentile": "백분위", "quintile": "5분위",
+    "change": "증감", "change_pct": "증감률",
+}
+# 증감 지도는 0을 가운데로 하는 발산 색상표(coloraxis2)로 칠한다
+CHANGE_MODES = ("change", "change_pct")
+
+
+
+def _map_hovertemplate(unit, mode="value", n=0):
+    # 호버 템플릿 직접 지정 (customdata 오염 방지)
+    head = "<b>%{customdata[1]}</b> (%{customdata[0]})<br>"
+    body = {
+        "value": "값: %{z:.2f} " + unit,
+        "rank": f"순위: %{{z}}위 / {n}",
+        "percentile": "백분위: %{z:.1f}",
+        "quintile": "%{z}분위 (5 = 상위 20%)",
+        "change": "증감: %{z:+.2f} " + unit,
+        "change_pct": "증감률: %{z:+.1f}%",
+    }[mode]
+    return head + body + "<extra></extra>"
+
+
+# 전국 화면 (드릴다운 해제 시 복귀)
+MAP_CENTER = {"lat": 36.5, "lon": 127.8}
+MAP_ZOOM = 5.8
+
+
+def build_base_map_figure():
+    """지오메트리·시군구 목록·스타일을 담은 지도 기본 Figure.
+
+    locations/customdata는 큐브의 시군구 축 순서로 고정되므로
+    이후 콜백은 z(값)와 라벨만 교체하면 된다. 값이 없는 지역(NaN)은 채색되지 않는다.
+    """
+    fig = go.Figure(
+        go.Choroplethmap(
+            geojson=geo_levels[0]["source"],
+            featureidkey="properties.csv_sido_sigungu",
+            locations=cube.region_keys,
+            z=[None] * len(cube.regions),
+            customdata=[[sido, sigungu] for sido, sigungu in cube.regions],
+            coloraxis="coloraxis",
+            marker_opacity=0.8,
+            marker_line_color="#ccc",
+            marker_line_width=0.5,
+            hovertemplate=_map_hovertemplate(""),
+        )
+    )
+    fig.update_layout(
+        paper_bgcolor="#D9D9D9",
+        margin=dict(l=0, r=0, t=40, b=0),
+        title=dict(
+            text="",
+            font=dict(size=16, color="#333", family="Inter, sans-serif"),
+            x=0.5,
+            xanchor="center",
+            y=0.98,
+        ),
+        coloraxis=dict(
+            colorscale="YlOrRd",
+            colorbar=dict(
+                title=dict(text=""),
+                len=0.6,
+                thickness=12,
+                x=0.98,
+            ),
+        ),
+        # 증감 지도용 (감소 파랑 — 0 흰색 — 증가 빨강). 쓰는 trace가 없으면 색상 막대도 그리지 않는다
+        coloraxis2=dict(
+            colorscale="RdBu_r",
+            cmid=0,
+            colorbar=dict(
+                title=dict(text=""),
+                len=0.6,
+                thickness=12,
+                x=0.98,
+            ),
+        ),
+        map=dict(
+            style="white-bg",
+            center=MAP_CENTER,
+            zoom=MAP_ZOOM,
+            # [0] 시도 기본 경계, [1] 호버 강조 (호버 시 source만 교체)
+            layers=[
+                dict(
+                    sourcetype="geojson",
+                    source=geo_levels[0]["outline_source"],
+                    type="line",
+                    color="#888",
+                    line=dict(width=1),
+                ),
+                dict(
+                    sourcetype="geojson",
+                    source=EMPTY_GEOJSON,
+                    type="line",
+                    color="#1565C0",
+                    line=dict(width=2.5),
+                ),
+            ],
+        ),
+        uirevision="constant",
+    )
+    return fig
+
+
 app = Dash(__name__)
 app.title = "균형발전상황판"
 
+# 콜백 응답·레이아웃·Dash 자산 압축: 클라이언트 Accept-Encoding에 따라 br → gzip 순으로 선택.
+# 응답마다 압축하므로 수준은 속도 위주 (지오메트리 자산은 아래에서 1회 고압축한 본문을 그대로 보낸다).
+if COMPRESS:
+    app.server.config.update(
+        COMPRESS_ALGORITHM=["br", "gzip"] if brotli else ["gzip"],
+        COMPRESS_MIN_SIZE=COMPRESS_MIN_SIZE,
+        COMPRESS_LEVEL=6,
+        COMPRESS_BR_LEVEL=4,
+        COMPRESS_MIMETYPES=[
+            "application/json", "text/html", "text/css", "application/javascript", "text/javascript", "text/csv",
+        ],
+    )
+    Compress(app.server)
+
+# 지오메트리 자산 압축본: (파일명, 인코딩) → 본문. 내용이 불변이므로 최초 요청 시 최고 수준으로 1회만 압축한다.
+GEO_ENCODINGS = (["br"] if brotli else []) + ["gzip"]
+_geo_encoded = {}
+
+
+def _encoded_geometry(filename, encoding):
+    key = (filename, encoding)
+    body = _geo_encoded.get(key)
+    if body is None:
+        raw = _geo_assets[filename][0]
+        body = brotli.compress(raw, quality=11) if encoding == "br" else gzip.compress(raw, compresslevel=9, mtime=0)
+        _geo_encoded[key] = body
+    return body
+
+
+def precompress_geometry():
+    """모든 지오메트리 자산을 미리 압축 (wsgi.py: fork 전에 1회 → 워커가 공유)."""
+    if COMPRESS:
+        for filename in _geo_assets:
+            for encoding in GEO_ENCODINGS:
+                _encoded_geometry(filename, encoding)
+
+
+@app.server.route("/geo/<filename>")
+def serve_geometry(filename):
+    """내용 해시 URL의 지오메트리: 1년 불변 캐시 + ETag/304 + 미리 압축한 본문 (br/gzip 협상)."""
+    asset = _geo_assets.get(filename)
+    if asset is None:
+        abort(404)
+    body, digest = asset
+    encoding = request.accept_encodings.best_match(GEO_ENCODINGS) if COMPRESS and len(body) >= COMPRESS_MIN_SIZE else None
+    if encoding:
+        response = Response(_encoded_geometry(filename, encoding), mimetype="application/json")
+        response.headers["Content-Encoding"] = encoding
+        response.set_etag(f"{digest}-{encoding}")
+    else:
+        response = Response(body, mimetype="application/json")
+        response.set_etag(digest)
+    response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    response.vary.add("Accept-Encoding")
+    return response.make_conditional(request)
+
+
+# 시도 강조 외곽선 URL: 서버 호버 모드는 geometry 모드와 무관하게 항상 URL만 보낸다.
+# 시도마다 불변 URL이므로 브라우저가 한 번 받은 외곽선은 세션 동안 다시 전송되지 않는다.
+sido_highlight_urls = {
+    name: app.get_relative_path("/geo/" + _publish_geometry(f"sido_outline_{i}", outline))
+    for i, (name, outline) in enumerate(_sido_outline_cache.items())
+}
+
+# Figure에 들어갈 지오메트리 source: url 모드는 URL 문자열, inline 모드는 GeoJSON 객체
+if GEOMETRY_MODE == "url":
+    for _i, _level in enumerate(geo_levels):
+        _level["source"] = app.get_relative_path("/geo/" + _publish_geometry(f"sgg_lod{_i}", _level["geojson"]))
+        _level["outline_source"] = app.get_relative_path("/geo/" + _publish_geometry(f"sido_lod{_i}", _level["outline"]))
+    for _i, _view in enumerate(drill_views.values()):
+        _view["source"] = app.get_relative_path("/geo/" + _publish_geometry(f"sgg_sido_{_i}", _view["geojson"]))
+    sido_highlight_sources = sido_highlight_urls
+else:
+    for _level in geo_levels:
+        _level["source"] = _level["geojson"]
+        _level["outline_source"] = _level["outline"]
+    for _view in drill_views.values():
+        _view["source"] = _view["geojson"]
+    sido_highlight_sources = _sido_outline_cache
+
 SIDEBAR_W = 200
 
 sidebar = html.Div(
@@ -76,6 +466,17 @@ sidebar = html.Div(
         # 컨트롤 영역
         html.Div(
             [
+                # 지역 검색 (입력할 때마다 서버 색인 조회 → 선택 시 사이드바 갱신 + 지도 이동)
+                html.Label("지역 검색", style={"fontFamily": "Inter, sans-serif", "fontSize": "14px", "color": "#1E1E1E"}),
+                dcc.Dropdown(
+                    id="region-search",
+                    options=[],
+                    placeholder="예: 강남, ㄱㄴ, 전북",
+                    search_order="original",
+                    style={"marginBottom": "8px"},
+                ),
+                # 검색으로 고른 시군구 (다른 시도로 드릴다운할 때 update_drill이 시도 대신 이 시군구로 화면을 맞춘다)
+                dcc.Store(id="map-focus"),
                 # 기준년도
                 html.Label("기준년도", style={"fontFamily": "Inter, sans-serif", "fontSize": "14px", "color": "#1E1E1E"}),
                 dcc.Dropdown(
@@ -92,7 +493,50 @@ sidebar = html.Div(
                     options=indicator_options,
                     value=indicator_options[0]["value"],
                     clearable=False,
-                    style={"marginBottom": "12px"},
+                    style={"marginBottom": "8px"},
+                ),
+                # 지도 표시 방식
+                html.Label("지도 표시", style={"fontFamily": "Inter, sans-serif", "fontSize": "14px", "color": "#1E1E1E"}),
+                dcc.RadioItems(
+                    id="map-mode",
+                    options=[{"label": label, "value": mode} for mode, label in MAP_MODES.items()],
+                    value="value",
+                    inline=True,
+                    inputStyle={"marginRight": "2px"},
+                    labelStyle={"marginRight": "8px"},
+                    style={"fontSize": "12px", "color": "#1E1E1E", "marginBottom": "8px"},
+                ),
+                # 증감 지도의 비교 년도 (비교 년도 → 기준년도 변화). 증감 표시 방식에서만 보인다
+                html.Div(
+                    id="base-year-row",
+                    children=[
+                        html.Label(
+                            "비교 년도 (→ 기준년도 증감)",
+                            style={"fontFamily": "Inter, sans-serif", "fontSize": "14px", "color": "#1E1E1E"},
+                        ),
+                        dcc.Dropdown(
+                            id="base-year",
+                            options=year_options,
+                            value=years[0],
+                            clearable=False,
+                            style={"marginBottom": "8px"},
+                        ),
+                    ],
+                    style={"display": "none"},
+                ),
+                # 시도 드릴다운 (비우면 전국). 전국 화면에서 지도를 클릭해도 그 시도로 들어간다.
+                html.Label("시도", style={"fontFamily": "Inter, sans-serif", "fontSize": "14px", "color": "#1E1E1E"}),
+                dcc.Dropdown(
+                    id="sido-select",
+                    options=[{"label": sido, "value": sido} for sido in drill_views],
+                    value=None,
+                    placeholder="전국",
+                ),
+                dcc.Checklist(
+                    id="color-scale",
+                    options=[{"label": " 전국 기준 색상 범위", "value": "national"}],
+                    value=[],
+                    style={"fontSize": "12px", "color": "#666", "marginBottom": "12px"},
                 ),
                 # 지역명 라벨
                 html.Div(
@@ -134,6 +578,60 @@ sidebar = html.Div(
                         "padding": "0 4px 4px 4px",
                     },
                 ),
+                # 데이터 내려받기: 링크(GET /export)로 받으므로 응답은 서버에서 조각 단위로 스트리밍된다
+                html.Details(
+                    [
+                        html.Summary("데이터 내려받기", style={"cursor": "pointer", "fontWeight": "bold"}),
+                        dcc.Dropdown(
+                            id="export-indicators",
+                            options=indicator_options,
+                            multi=True,
+                            placeholder="현재 관심지표",
+                            style={"marginTop": "6px"},
+                        ),
+                        dcc.Dropdown(
+                            id="export-years",
+                            options=year_options,
+                            multi=True,
+                            placeholder="현재 기준년도",
+                            style={"marginTop": "4px"},
+                        ),
+                        dcc.RadioItems(
+                            id="export-scope",
+                            options=[
+                                {"label": "클릭한 지역", "value": "region"},
+                                {"label": "시도", "value": "sido"},
+                                {"label": "전국", "value": "all"},
+                            ],
+                            value="all",
+                            inline=True,
+                            inputStyle={"marginRight": "2px"},
+                            labelStyle={"marginRight": "6px"},
+                            style={"marginTop": "4px"},
+                        ),
+                        dcc.RadioItems(
+                            id="export-format",
+                            options=[
+                                {"label": "CSV", "value": "csv"},
+                                {"label": "Parquet", "value": "parquet", "disabled": "parquet" not in data_export.FORMATS},
+                            ],
+                            value="csv",
+                            inline=True,
+                            inputStyle={"marginRight": "2px"},
+                            labelStyle={"marginRight": "6px"},
+                        ),
+                        dcc.Store(id="export-base", data=app.get_relative_path("/export")),
+                        html.A("내려받기", id="export-link", download="", style={"fontWeight": "bold"}),
+                    ],
+                    style={
+                        "fontSize": "12px",
+                        "marginTop": "8px",
+                        "padding": "6px 8px",
+                        "border": "1px solid #D9D9D9",
+                        "borderRadius": "8px",
+                        "backgroundColor": "#FFF",
+                    },
+                ),
             ],
             style={"padding": "0 10px", "display": "flex", "flexDirection": "column", "gap": "4px"},
         ),
@@ -169,9 +667,70 @@ sidebar = html.Div(
     },
 )
 
+# 지표 상관관계 · 유사 지역 패널 (지도 위 오른쪽). 열려 있는 동안만 서버에서 계산·전송한다
+analysis_panel = html.Div(
+    id="analysis-panel",
+    style={"display": "none"},
+    children=html.Div(
+        [
+            dcc.Graph(
+                id="correlation-heatmap",
+                config={"displayModeBar": False},
+                style={"height": "380px", "width": "100%"},
+            ),
+            html.Div(id="correlated-indicators", style={"fontSize": "12px", "marginTop": "6px"}),
+            html.Div(id="similar-regions", style={"fontSize": "12px", "marginTop": "10px"}),
+        ],
+        style={
+            "position": "absolute",
+            "top": "50px",
+            "right": "10px",
+            "width": "420px",
+            "maxHeight": "calc(100vh - 70px)",
+            "overflowY": "auto",
+            "padding": "8px 10px",
+            "border": "1px solid #D9D9D9",
+            "borderRadius": "8px",
+            "backgroundColor": "rgba(255,255,255,0.95)",
+            "fontFamily": "Inter, sans-serif",
+            "color": "#1E1E1E",
+            "zIndex": 10,
+        },
+    ),
+)
+
 content = html.Div(
-    dcc.Graph(id="choropleth-map", style={"height": "100%", "width": "100%"}),
-    style={"flex": 1, "height": "100vh", "backgroundColor": "#D9D9D9"},
+    [
+        dcc.Graph(id="choropleth-map", figure=build_base_map_figure(), style={"height": "100%", "width": "100%"}),
+        html.Button(
+            "지표 상관관계 · 유사 지역",
+            id="analysis-toggle",
+            n_clicks=0,
+            style={
+                "position": "absolute",
+                "top": "10px",
+                "left": "10px",
+                "fontSize": "12px",
+                "padding": "4px 8px",
+                "border": "1px solid #999",
+                "borderRadius": "4px",
+                "backgroundColor": "#FFF",
+                "cursor": "pointer",
+                "zIndex": 10,
+            },
+        ),
+        analysis_panel,
+        # 분석 패널 열림 여부 (닫혀 있으면 update_analysis가 계산하지 않음)
+        dcc.Store(id="analysis-open", data=False),
+        # 호버 중인 시도명 (브라우저에서 중복·연속 이벤트를 걸러낸 값)
+        dcc.Store(id="hover-sido"),
+        # 지도 화면 상태 {zoom, bounds}와 현재 적용된 줌 단계 키
+        dcc.Store(id="map-view"),
+        dcc.Store(id="map-lod", data=[0]),
+        # 시도별 경량 외곽선 (url 모드에서는 URL): clientside 모드에서 페이지 로딩 시 1회만 전송
+        dcc.Store(id="sido-outlines", data=sido_highlight_sources if HOVER_MODE == "clientside" else None),
+    ],
+    style={"flex": 1, "height": "100vh", "backgroundColor": "#D9D9D9", "position": "relative"},
 )
 
 app.layout = html.Div(
@@ -185,142 +744,445 @@ app.layout = html.Div(
 # ═══════════════════════════════════════════════════════════════════
 
 # --- Callback A: 코로플레스 지도 갱신 ---
+# 지오메트리는 기본 Figure에 1회만 실리고, 년도·지표 변경 시에는 값과 라벨만 Patch로 교체한다.
+# (년도, 지표) 조합은 많지 않으므로 완성된 Patch를 LRU 캐시에 보관해 반복 요청은 사전 조회로 끝낸다.
+
+map_cache = FigureCache("map", max_bytes=int(MAP_CACHE_MB * 1e6))
+
+
+def _json_values(values):
+    """값 배열 → JSON용 리스트 (float32 최단 표기 유지, NaN → None). 캐시 적중 시 재직렬화 비용 최소화."""
+    return [None if v == "nan" else float(v) for v in values.astype(str)]
+
+
+# 증감 지도 색상 범위: 전국 |증감|의 이 백분위수까지 (극단값 몇 곳이 나머지를 모두 흰색으로 만들지 않도록)
+CHANGE_RANGE_PERCENTILE = 95
+
+
+def _change_annotation(missing, base_year, year):
+    """비교할 수 없는 시군구 수 안내 (결측을 0이나 빈 칸으로 조용히 넘기지 않는다). 모두 비교 가능하면 []."""
+    labels = {"base": f"{base_year}년 값 없음", "target": f"{year}년 값 없음", "zero": f"{base_year}년 값 0 (증감률 불가)"}
+    parts = [f"{label} {missing[key]}곳" for key, label in labels.items() if missing.get(key)]
+    if not parts:
+        return []
+    return [dict(
+        text="비교 불가: " + " · ".join(parts),
+        showarrow=False, xref="paper", yref="paper", x=0.01, y=0.01, xanchor="left", yanchor="bottom",
+        font=dict(size=11, color="#666"), bgcolor="rgba(255,255,255,0.7)",
+    )]
+
+
+def build_map_patch(year, indicator, sido=None, national_scale=False, mode="value", base_year=None):
+    """지도 값·라벨 Patch. sido를 주면 그 시도 시군구 값만 (드릴다운 지도의 locations 순서).
+
+    색상 범위는 보이는 값에 자동으로 맞춰지므로 드릴다운에서는 시도 값 범위가 된다.
+    national_scale이면 전국 범위로 고정해 다른 시도와 색을 비교할 수 있게 한다.
+    순위·백분위·5분위(mode)는 전국 시군구 기준 값이며, 전국 화면에서는 전체 범위(1위–n위, 0–100, 1–5분위)로 칠한다.
+    5분위는 값이 1–5 정수뿐이므로 같은 색상표에서 다섯 단계 색으로 나뉜다.
+    증감·증감률은 base_year → year 변화로 cube.change(i, base, y)가 시군구 수만큼 뺄셈해 구하며,
+    0 중심 대칭 범위(coloraxis2)로 칠하고 비교할 수 없는 시군구 수를 지도에 표시한다.
+    """
+    missing = {}
+    with metrics.phase("lookup"):
+        loc = cube.locate(indicator, year)
+        base = cube.year_index.get(base_year) if mode in CHANGE_MODES else None
+        if mode in CHANGE_MODES and base is None:
+            loc = None
+        if loc:
+            unit = cube.units[loc[0]] if cube.present[loc].any() else ""
+            n = int(cube.ranked[loc])
+            if mode == "rank":
+                z = np.where(cube.rank[loc] > 0, cube.rank[loc], np.nan)
+            elif mode == "percentile":
+                z = cube.percentile[loc]
+            elif mode == "quintile":
+                z = np.where(cube.quintile[loc] > 0, cube.quintile[loc], np.nan)
+            elif mode in CHANGE_MODES:
+                i, y = loc
+                z = cube.change(i, base, y)["delta" if mode == "change" else "delta_pct"]
+                missing = change_missing(cube.local[i, base], cube.local[i, y])
+                if mode == "change":
+                    missing.pop("zero")
+            else:
+                z = cube.local[loc]
+        else:
+            z = np.full(len(cube.regions), np.nan)
+            unit = ""
+            n = 0
+
+        cmin = cmax = None
+        if mode == "quintile":
+            cmin, cmax = 0.5, 5.5
+        elif sido and not national_scale:
+            pass
+        elif mode == "rank":
+            cmin, cmax = 1, max(n, 1)
+        elif mode == "percentile":
+            cmin, cmax = 0, 100
+        elif mode in CHANGE_MODES:
+            spread = np.abs(z[~np.isnan(z)])
+            if spread.size and spread.max() > 0:
+                cmax = float(_json_values(np.percentile(spread, CHANGE_RANGE_PERCENTILE, keepdims=True).astype(z.dtype))[0])
+                cmin = -cmax
+        elif sido and not np.isnan(z).all():
+            cmin, cmax = _json_values(np.array([np.nanmin(z), np.nanmax(z)], dtype=z.dtype))
+        if sido:
+            ids = drill_views[sido]["ids"]
+            z = z[ids]
+            if missing:
+                missing = change_missing(cube.local[loc[0], base, ids], cube.local[loc[0], loc[1], ids])
+                if mode == "change":
+                    missing.pop("zero")
+
+    with metrics.phase("figure"):
+        label = {"value": unit, "change": f"증감 ({unit})", "change_pct": "증감률 (%)"}.get(mode, MAP_MODES[mode])
+        suffix = f" · {base_year}→{year} {MAP_MODES[mode]}" if mode in CHANGE_MODES else f" · {label}"
+        patched = Patch()
+        patched["data"][0]["z"] = _json_values(z)
+        patched["data"][0]["hovertemplate"] = _map_hovertemplate(unit, mode, n)
+        patched["layout"]["title"]["text"] = (
+            f"{indicator} ({unit})" + ("" if mode == "value" else suffix) + (f" · {sido}" if sido else "")
+        )
+        if mode in CHANGE_MODES:
+            patched["data"][0]["coloraxis"] = "coloraxis2"
+            patched["layout"]["coloraxis2"]["cmin"] = cmin
+            patched["layout"]["coloraxis2"]["cmax"] = cmax
+            patched["layout"]["coloraxis2"]["colorbar"]["title"]["text"] = label
+            patched["layout"]["annotations"] = _change_annotation(missing, base_year, year)
+            return patched
+        patched["data"][0]["coloraxis"] = "coloraxis"
+        # 순위는 1위(최댓값)가 가장 진하도록 뒤집는다
+        patched["layout"]["coloraxis"]["reversescale"] = mode == "rank"
+        patched["layout"]["coloraxis"]["cmin"] = cmin
+        patched["layout"]["coloraxis"]["cmax"] = cmax
+        patched["layout"]["coloraxis"]["colorbar"]["title"]["text"] = label
+        patched["layout"]["coloraxis"]["colorbar"]["tickvals"] = [1, 2, 3, 4, 5] if mode == "quintile" else None
+        patched["layout"]["coloraxis"]["colorbar"]["ticktext"] = (
+            ["1분위", "2분위", "3분위", "4분위", "5분위"] if mode == "quintile" else None
+        )
+        patched["layout"]["annotations"] = []
+    return patched
+
+
+def build_empty_map_patch(sido=None):
+    """관심지표 미선택 안내 (값 없음)."""
+    patched = Patch()
+    patched["data"][0]["z"] = [None] * (len(drill_views[sido]["ids"]) if sido else len(cube.regions))
+    patched["layout"]["title"]["text"] = ""
+    patched["layout"]["annotations"] = [
+        dict(text="관심지표를 선택하세요", showarrow=False, font=dict(size=18, color="#666"))
+    ]
+    return patched
+
 
 @app.callback(
     Output("choropleth-map", "figure"),
     Input("year-select", "value"),
     Input("indicator-select", "value"),
+    Input("color-scale", "value"),
+    Input("map-mode", "value"),
+    Input("base-year", "value"),
+    State("sido-select", "value"),
 )
-def update_map(year, indicator):
+@metrics.instrument("update_map")
+def update_map(year, indicator, color_scale=None, mode=None, base_year=None, sido=None):
     if not indicator:
-        fig = go.Figure()
-        fig.update_layout(
-            paper_bgcolor="#D9D9D9",
-            plot_bgcolor="#D9D9D9",
-            margin=dict(l=0, r=0, t=0, b=0),
-            annotations=[dict(text="관심지표를 선택하세요", showarrow=False, font=dict(size=18, color="#666"))],
-            xaxis=dict(visible=False),
-            yaxis=dict(visible=False),
-        )
-        return fig
-
-    filtered = df[(df["region_type"] == "시군구") & (df["publish_year"] == year) & (df["indicator_name"] == indicator)]
-    merged = filtered[["sido", "sigungu", "sido_sigungu", "local_value", "unit"]].copy()
-
-    fig = px.choropleth_map(
-        merged,
-        geojson=geojson,
-        locations="sido_sigungu",
-        featureidkey="properties.csv_sido_sigungu",
-        color="local_value",
-        color_continuous_scale="YlOrRd",
-        custom_data=["sido", "sigungu"],
-        map_style="white-bg",
-        center={"lat": 36.5, "lon": 127.8},
-        zoom=5.8,
-        opacity=0.8,
-    )
-    # 호버 템플릿 직접 지정 (customdata 오염 방지)
-    unit = merged["unit"].iloc[0] if len(merged) > 0 else ""
-    fig.update_traces(
-        hovertemplate="<b>%{customdata[1]}</b> (%{customdata[0]})<br>값: %{z:.2f} " + unit + "<extra></extra>",
-        marker_line_color="#ccc",
-        marker_line_width=0.5,
+        return build_empty_map_patch(sido)
+
+    mode = mode if mode in MAP_MODES else "value"
+    # 비교 년도는 증감 지도에서만 캐시 키에 넣는다 (다른 표시 방식에서 바꿔도 같은 Patch)
+    base_year = base_year if mode in CHANGE_MODES else None
+    national_scale = bool(sido) and "national" in (color_scale or [])
+    return map_cache.get_or_build(
+        (year, indicator, sido, national_scale, mode, base_year),
+        lambda: build_map_patch(year, indicator, sido, national_scale, mode, base_year),
     )
-    fig.update_layout(
-        paper_bgcolor="#D9D9D9",
-        margin=dict(l=0, r=0, t=40, b=0),
-        title=dict(
-            text=f"{indicator} ({unit})",
-            font=dict(size=16, color="#333", family="Inter, sans-serif"),
-            x=0.5,
-            xanchor="center",
-            y=0.98,
-        ),
-        coloraxis_colorbar=dict(
-            title=dict(text=unit),
-            len=0.6,
-            thickness=12,
-            x=0.98,
-        ),
-        map_layers=[
-            dict(
-                sourcetype="geojson",
-                source=geojson_sido,
-                type="line",
-                color="#888",
-                line=dict(width=1),
-            ),
-        ],
-        uirevision="constant",
+
+
+# 증감 표시 방식에서만 비교 년도 선택 상자를 보인다
+app.clientside_callback(
+    ClientsideFunction(namespace="nabis", function_name="changeControls"),
+    Output("base-year-row", "style"),
+    Input("map-mode", "value"),
+)
+
+
+def warm_map_cache(background=True):
+    """전국 화면의 전체 (년도, 지표) 조합을 지도 캐시에 적재. 실행 진입점(SECTION 4, wsgi.py)에서 호출한다.
+
+    import 시점에 스레드를 띄우지 않는 이유: 멀티 워커 서버는 import 후 fork하므로
+    적재 중인 스레드(와 그 잠금)가 워커로 복제되면 안 된다. wsgi.py는 fork 전에 동기 적재한다.
+    """
+    return map_cache.warm(
+        [(year, name, None, False, "value", None) for name in cube.indicators for year in reversed(years)],
+        lambda key: build_map_patch(*key),
+        background=background,
     )
-    return fig
 
 
-# --- Callback: 시도 강조 (호버) ---
+# --- Callback: 시도 드릴다운 ---
+# 시도를 고르면 (선택 상자 또는 전국 화면에서 지도 클릭) 그 시도의 시군구만 담은 지오메트리·값으로 지도를 바꾸고
+# 시도 범위에 맞춰 확대한다. 이후 년도·지표 변경은 위 update_map이 시도 시군구 값만 보낸다.
 
-# 시도별 GeoJSON 캐시 (앱 로딩 시 1회 생성)
-_sido_geojson_cache = {}
-for _f in geojson_sido["features"]:
-    _name = _f["properties"].get("SIDO_NM")
-    if _name:
-        _sido_geojson_cache[_name] = {"type": "FeatureCollection", "features": [_f]}
+# 전국 화면에서 지도 클릭 → 클릭한 지역의 시도로 드릴다운 (드릴다운 중 클릭은 사이드바만 갱신)
+app.clientside_callback(
+    ClientsideFunction(namespace="nabis", function_name="drillSido"),
+    Output("sido-select", "value"),
+    Input("choropleth-map", "clickData"),
+    State("sido-select", "value"),
+    prevent_initial_call=True,
+)
 
 
 @app.callback(
     Output("choropleth-map", "figure", allow_duplicate=True),
-    Input("choropleth-map", "hoverData"),
+    Output("map-lod", "data", allow_duplicate=True),
+    Output("map-focus", "data", allow_duplicate=True),
+    Input("sido-select", "value"),
+    State("year-select", "value"),
+    State("indicator-select", "value"),
+    State("color-scale", "value"),
+    State("map-mode", "value"),
+    State("base-year", "value"),
+    State("map-focus", "data"),
+    State("map-lod", "data"),
     prevent_initial_call=True,
 )
-def highlight_sido_on_hover(hover_data):
+@metrics.instrument("update_drill")
+def update_drill(sido, year, indicator, color_scale=None, mode=None, base_year=None, focus=None, lod=None):
+    view = drill_views.get(sido)
+    if sido and view is None:
+        return no_update, no_update, no_update
+    mode = mode if mode in MAP_MODES else "value"
+    national_scale = bool(sido) and "national" in (color_scale or [])
+    if indicator:
+        patched = build_map_patch(year, indicator, sido, national_scale, mode, base_year)
+    else:
+        patched = build_empty_map_patch(sido)
+
+    with metrics.phase("figure"):
+        # 시도 외곽선 레이어: 드릴다운 지도는 가장 세밀한 단계, 전국 복귀는 가장 거친 단계 (시군구 지오메트리와 같은 단계).
+        # 이미 그 단계면 다시 보내지 않는다 (inline 모드에서는 외곽선 전체가 응답에 실리므로)
+        level = len(geo_levels) - 1 if view else 0
+        if not lod or lod[0] != level:
+            patched["layout"]["map"]["layers"][0]["source"] = geo_levels[level]["outline_source"]
+        if view:
+            patched["data"][0]["geojson"] = view["source"]
+            patched["data"][0]["locations"] = view["locations"]
+            patched["data"][0]["customdata"] = view["customdata"]
+            # 지역 검색으로 들어온 경우 고른 시군구로 화면을 맞춘다
+            if focus is not None and cube.regions[focus][0] == sido:
+                patched["layout"]["map"]["center"], patched["layout"]["map"]["zoom"] = _region_view(focus)
+            else:
+                patched["layout"]["map"]["center"] = view["center"]
+                patched["layout"]["map"]["zoom"] = view["zoom"]
+        else:
+            patched["data"][0]["geojson"] = geo_levels[0]["source"]
+            patched["data"][0]["locations"] = cube.region_keys
+            patched["data"][0]["customdata"] = [list(region) for region in cube.regions]
+            patched["layout"]["map"]["center"] = MAP_CENTER
+            patched["layout"]["map"]["zoom"] = MAP_ZOOM
+        # uirevision이 바뀌어야 사용자가 옮긴 화면 대신 새 중심·줌이 적용된다
+        patched["layout"]["uirevision"] = sido or "constant"
+    # 드릴다운 중에는 가장 세밀한 단계, 전국 복귀 시 가장 거친 단계 (줌 단계 교체는 드릴다운 중 멈춘다). 검색 초점은 한 번만 쓴다
+    return patched, [level], None
+
+
+# --- Callback: 지역 검색 ---
+# 입력할 때마다 미리 만든 색인(region_search.py)을 사전 한 번 조회해 후보를 보낸다 (지역명 전체를 훑지 않음).
+# 고르면 그 시도로 드릴다운하고 시군구로 화면을 맞추며, 지도 클릭과 같은 clickData로 사이드바를 갱신한다.
+
+
+@app.callback(
+    Output("region-search", "options"),
+    Input("region-search", "search_value"),
+    State("region-search", "value"),
+    prevent_initial_call=True,
+)
+@metrics.instrument("search_regions")
+def search_regions(search_value, value=None):
+    if not search_value:
+        return no_update
+    with metrics.phase("lookup"):
+        found = search_index.search(search_value)
+    # Dropdown은 받은 옵션을 입력값으로 다시 거르므로 (초성 검색어는 이름에 없음) search에 입력값을 넣어 통과시킨다.
+    # 고른 값이 목록에서 빠지면 선택 표시가 지워지므로 함께 둔다
+    options = [{"label": entry["label"], "value": entry["key"], "search": f"{entry['label']} {search_value}"} for entry in found]
+    if value and value not in {option["value"] for option in options} and value in search_index.by_key:
+        options.append({"label": search_index.by_key[value]["label"], "value": value, "search": search_value})
+    return options
+
+
+@app.callback(
+    Output("sido-select", "value", allow_duplicate=True),
+    Output("choropleth-map", "clickData"),
+    Output("map-focus", "data"),
+    Output("choropleth-map", "figure", allow_duplicate=True),
+    Input("region-search", "value"),
+    State("sido-select", "value"),
+    prevent_initial_call=True,
+)
+@metrics.instrument("choose_region")
+def choose_region(key, current_sido=None):
+    entry = search_index.by_key.get(key)
+    if entry is None:
+        return no_update, no_update, no_update, no_update
+    r, sido = entry["region"], entry["sido"]
+    click = {"points": [{"customdata": list(cube.regions[r])}]} if r is not None else no_update
+    if entry["kind"] == "시도" or sido not in drill_views:
+        return (sido if sido != current_sido and sido in drill_views else no_update), click, no_update, no_update
+    if sido != current_sido:
+        # 시도가 바뀌면 update_drill이 지오메트리 교체와 함께 map-focus 시군구로 화면을 맞춘다
+        return sido, click, r, no_update
     patched = Patch()
-    base_layer = dict(
-        sourcetype="geojson",
-        source=geojson_sido,
-        type="line",
-        color="#888",
-        line=dict(width=1),
+    patched["layout"]["map"]["center"], patched["layout"]["map"]["zoom"] = _region_view(r)
+    patched["layout"]["uirevision"] = key
+    return no_update, click, no_update, patched
+
+
+# --- Callback: 줌 단계별 지오메트리 교체 ---
+# 전국 화면은 가장 거친 단계, 확대하면 줌에 맞는 세밀 단계로 바꾼다.
+# url 모드는 단계마다 내용 해시 URL 하나라서 응답은 URL 문자열뿐이고 (브라우저가 단계별로 한 번 받아 캐시),
+# 같은 단계 안의 이동·확대는 응답이 없다. inline 모드는 화면(+ 여백) 안 시군구의 세밀 단계 feature만 보낸다.
+
+# inline 모드에서 화면 범위에 더할 여백 (화면 크기 대비 비율, 조금 이동해도 빈 곳이 보이지 않도록)
+DETAIL_MARGIN = 0.5
+
+# relayoutData → {zoom, bounds}: 줌/이동 이벤트만 통과 (호버 강조의 relayout은 서버로 가지 않음)
+app.clientside_callback(
+    ClientsideFunction(namespace="nabis", function_name="mapView"),
+    Output("map-view", "data"),
+    Input("choropleth-map", "relayoutData"),
+    prevent_initial_call=True,
+)
+
+
+def select_geometry(zoom, bounds):
+    """화면 상태 → (단계 키, geojson source). 키가 같으면 geometry도 같다."""
+    level = max(i for i, lv in enumerate(geo_levels) if lv["min_zoom"] <= zoom)
+    if level == 0 or GEOMETRY_MODE == "url" or not bounds:
+        return [level], geo_levels[level]["source"]
+
+    minx, miny, maxx, maxy = bounds
+    dx, dy = (maxx - minx) * DETAIL_MARGIN, (maxy - miny) * DETAIL_MARGIN
+    bbox = geo_levels[level]["bbox"]
+    visible = np.flatnonzero(
+        (bbox[:, 0] <= maxx + dx) & (bbox[:, 2] >= minx - dx) & (bbox[:, 1] <= maxy + dy) & (bbox[:, 3] >= miny - dy)
+    ).tolist()
+    # 단계마다 feature 위치 = 지역 id. 화면 밖 시군구는 싣지 않는다 (지도에 그려지지 않을 뿐 값·목록은 그대로)
+    features = [geo_levels[level]["features"][r] for r in visible]
+    return [level] + visible, {"type": "FeatureCollection", "features": features}
+
+
+if len(geo_levels) > 1:
+    @app.callback(
+        Output("choropleth-map", "figure", allow_duplicate=True),
+        Output("map-lod", "data"),
+        Input("map-view", "data"),
+        State("map-lod", "data"),
+        State("sido-select", "value"),
+        prevent_initial_call=True,
     )
-    if not hover_data:
-        patched["layout"]["map"]["layers"] = [base_layer]
-        return patched
+    @metrics.instrument("update_map_detail")
+    def update_map_detail(view, current, sido=None):
+        # 드릴다운 지도는 가장 세밀한 단계의 시도 부분집합이므로 교체하지 않는다
+        if not view or sido:
+            return no_update, no_update
+        with metrics.phase("lookup"):
+            key, source = select_geometry(view["zoom"], view.get("bounds"))
+        if key == current:
+            return no_update, no_update
+        patched = Patch()
+        patched["data"][0]["geojson"] = source
+        if not current or current[0] != key[0]:
+            patched["layout"]["map"]["layers"][0]["source"] = geo_levels[key[0]]["outline_source"]
+        return patched, key
 
-    customdata = hover_data.get("points", [{}])[0].get("customdata")
-    if not customdata or len(customdata) < 2:
-        patched["layout"]["map"]["layers"] = [base_layer]
-        return patched
 
-    hovered_sido = customdata[0]
-    highlight_geojson = _sido_geojson_cache.get(hovered_sido)
-    if highlight_geojson:
-        patched["layout"]["map"]["layers"] = [
-            base_layer,
-            dict(
-                sourcetype="geojson",
-                source=highlight_geojson,
-                type="line",
-                color="#1565C0",
-                line=dict(width=2.5),
-            ),
-        ]
-    else:
-        patched["layout"]["map"]["layers"] = [base_layer]
-    return patched
+# --- Callback: 시도 강조 (호버) ---
+
+# 호버 이벤트 → 시도명: 같은 시도 안에서의 이동은 무시하고, 시도 전환은 스로틀링 (assets/dashboard.js)
+app.clientside_callback(
+    ClientsideFunction(namespace="nabis", function_name="hoverSido"),
+    Output("hover-sido", "data"),
+    Input("choropleth-map", "hoverData"),
+    prevent_initial_call=True,
+)
+
+if HOVER_MODE == "clientside":
+    # 브라우저에서 강조 레이어(map.layers[1])의 source만 교체 — 서버 왕복 없음
+    app.clientside_callback(
+        ClientsideFunction(namespace="nabis", function_name="highlightSido"),
+        Input("hover-sido", "data"),
+        State("sido-outlines", "data"),
+        prevent_initial_call=True,
+    )
+    # 지도 Patch로 다시 그려지면 보관된 figure에 없는 강조가 지워지므로 현재 호버 시도를 다시 칠한다
+    app.clientside_callback(
+        ClientsideFunction(namespace="nabis", function_name="restoreHighlight"),
+        Input("choropleth-map", "figure"),
+        State("hover-sido", "data"),
+        State("sido-outlines", "data"),
+        prevent_initial_call=True,
+    )
+else:
+    @app.callback(
+        Output("choropleth-map", "figure", allow_duplicate=True),
+        Input("hover-sido", "data"),
+        prevent_initial_call=True,
+    )
+    @metrics.instrument("highlight_sido_on_hover")
+    def highlight_sido_on_hover(hovered_sido):
+        # 기본 경계 레이어는 클라이언트에 그대로 두고 강조 레이어의 source만 전송
+        patched = Patch()
+        patched["layout"]["map"]["layers"][1]["source"] = sido_highlight_urls.get(hovered_sido, EMPTY_GEOJSON)
+        return patched
 
 
 # --- Callback B: 사이드바 갱신 (지도 클릭) ---
+# 추이 계열은 로딩 시 (지표, 지역)별로 년도 오름차순 리스트를 만들어 두고,
+# 완성된 사이드바 응답은 (시군구 id, 지표, 년도)별로 캐시한다. 클릭은 사전 조회 + 작은 Figure 생성으로 끝난다.
 
-@app.callback(
-    Output("region-label", "children"),
-    Output("info-panel", "children"),
-    Output("sparkline", "figure"),
-    Input("choropleth-map", "clickData"),
-    State("year-select", "value"),
-    State("indicator-select", "value"),
-)
-def update_sidebar(click_data, year, indicator):
-    empty_fig = go.Figure()
-    empty_fig.update_layout(
+SIDEBAR_CACHE_MB = float(os.environ.get("NABIS_SIDEBAR_CACHE_MB", "16"))
+sidebar_cache = FigureCache("sidebar", max_bytes=int(SIDEBAR_CACHE_MB * 1e6))
+
+
+def _trend_table(present, *arrays):
+    """(I, Y, N) 존재 여부·값 배열 → {(i, n): (년도 리스트, 값 리스트, ...)}. 행이 존재하는 년도만 담는다."""
+    # 배열 전체를 한 번에 (I, N, Y) 파이썬 리스트(NaN → None)로 바꾼 뒤 조립 (원소별 NumPy 인덱싱 회피)
+    # float32 값은 지도(_json_values)·내려받기와 같은 최단 표기로 (float64로 넓힌 43.79618453979492 같은 잡음 방지)
+    present = np.asarray(present)
+    columns = []
+    for values in arrays:
+        values = np.asarray(values).astype(str).astype(float)
+        cells = values.astype(object)
+        cells[np.isnan(values)] = None
+        columns.append(cells.transpose(0, 2, 1).tolist())
+    full = present.all(axis=1)
+    mask = present.transpose(0, 2, 1).tolist()
+
+    table = {}
+    for i, n in zip(*(axis.tolist() for axis in np.nonzero(present.any(axis=1)))):
+        if full[i, n]:
+            table[i, n] = (years,) + tuple(col[i][n] for col in columns)
+        else:
+            keep = [y for y, ok in enumerate(mask[i][n]) if ok]
+            table[i, n] = ([years[y] for y in keep],) + tuple([col[i][n][y] for y in keep] for col in columns)
+    return table
+
+
+# (지표, 시군구) → (년도, 지자체값, 전국값), (지표, 시도) → (년도, 시도값)
+region_trends = _trend_table(cube.present, cube.local, cube.national)
+sido_trends = _trend_table(cube.sido_present, cube.sido)
+NO_TREND = ([], [], [])
+
+# 년도별 마커 크기: 선택 년도만 크게
+marker_sizes = {year: {y: 10 if y == year else 7 for y in years} for year in years}
+
+
+def build_empty_sparkline():
+    fig = go.Figure()
+    fig.update_layout(
         margin=dict(l=8, r=8, t=20, b=8),
         height=150,
         paper_bgcolor="#FFF",
@@ -328,134 +1190,100 @@ def update_sidebar(click_data, year, indicator):
         xaxis=dict(visible=False),
         yaxis=dict(visible=False),
     )
+    return fig
 
-    if not click_data or not indicator:
-        return "지도에서 지역을 클릭하세요", html.Div("", style={"minHeight": "60px"}), empty_fig
 
-    point = click_data["points"][0]
-    customdata = point.get("customdata")
-    if not customdata or len(customdata) < 2:
-        return no_update, no_update, no_update
+EMPTY_SPARKLINE = build_empty_sparkline()
 
-    sido = customdata[0]
-    sigungu = customdata[1]
 
-    # 지역명 라벨
-    if sido == sigungu:
-        label = sido
-    else:
-        label = f"{sido} - {sigungu}"
-
-    # 텍스트 요약
-    row = df[
-        (df["region_type"] == "시군구")
-        & (df["sido"] == sido)
-        & (df["sigungu"] == sigungu)
-        & (df["publish_year"] == year)
-        & (df["indicator_name"] == indicator)
-    ]
-    if len(row) > 0:
-        r = row.iloc[0]
-        local_v = r["local_value"]
-        national_v = r["national_value"]
-        local_str = f"{local_v:.2f}" if pd.notna(local_v) else "—"
-        national_str = f"{national_v:.2f}" if pd.notna(national_v) else "—"
-        ref_year = str(r["reference_year"]).rstrip("년") if pd.notna(r["reference_year"]) and r["reference_year"] != "-" else "—"
-        unit_text = r["unit"]
-
-        # 시도 값 조회
-        sido_row = df[
-            (df["region_type"] == "시도")
-            & (df["sido"] == sido)
-            & (df["publish_year"] == year)
-            & (df["indicator_name"] == indicator)
-        ]
-        if len(sido_row) > 0:
-            sido_v = sido_row.iloc[0]["local_value"]
-            sido_str = f"{sido_v:.2f}" if pd.notna(sido_v) else "—"
-        else:
-            sido_str = "—"
+def build_summary(r, indicator, year):
+    """지자체/시도/전국 값 + 기준년도 요약 패널."""
+    loc = cube.locate(indicator, year)
+    if not loc or not cube.present[loc + (r,)]:
+        return html.Div("데이터 없음", style={"color": "#999", "fontSize": "12px", "textAlign": "center", "padding": "16px 0"})
 
-        val_row_style = {"display": "flex", "justifyContent": "space-between", "padding": "2px 0"}
-        val_label_style = {"color": "#666", "fontSize": "12px"}
-        val_num_style = {"fontWeight": "bold", "fontSize": "13px", "color": "#1E1E1E"}
+    local_v = cube.local[loc + (r,)]
+    national_v = cube.national[loc + (r,)]
+    local_str = f"{local_v:.2f}" if pd.notna(local_v) else "—"
+    national_str = f"{national_v:.2f}" if pd.notna(national_v) else "—"
+    ref_year = cube.reference_label(*loc, r) or "—"
+    unit_text = cube.units[loc[0]]
 
-        summary = html.Div([
-            html.Div(
-                f"{r['indicator_name']} ({unit_text})",
-                style={"fontSize": "12px", "fontWeight": "600", "color": "#333", "marginBottom": "8px",
-                        "borderBottom": "1px solid #eee", "paddingBottom": "6px"},
-            ),
-            html.Div([
-                html.Span("지자체", style=val_label_style),
-                html.Span(f"{local_str} {unit_text}", style={**val_num_style, "color": "#2196F3"}),
-            ], style=val_row_style),
-            html.Div([
-                html.Span("시도", style=val_label_style),
-                html.Span(f"{sido_str} {unit_text}", style={**val_num_style, "color": "#FF9800"}),
-            ], style=val_row_style),
-            html.Div([
-                html.Span("전국", style=val_label_style),
-                html.Span(f"{national_str} {unit_text}", style={**val_num_style, "color": "#9E9E9E"}),
-            ], style=val_row_style),
-            html.Div([
-                html.Span("기준", style=val_label_style),
-                html.Span(ref_year, style={"fontSize": "12px", "color": "#999"}),
-            ], style={**val_row_style, "marginTop": "4px"}),
-        ])
-    else:
-        summary = html.Div("데이터 없음", style={"color": "#999", "fontSize": "12px", "textAlign": "center", "padding": "16px 0"})
-
-    # 추이 차트
-    trend = df[
-        (df["region_type"] == "시군구")
-        & (df["sido"] == sido)
-        & (df["sigungu"] == sigungu)
-        & (df["indicator_name"] == indicator)
-    ].sort_values("publish_year")
-
-    # 시도 추이
-    sido_trend = df[
-        (df["region_type"] == "시도")
-        & (df["sido"] == sido)
-        & (df["indicator_name"] == indicator)
-    ].sort_values("publish_year")
+    # 시도 값 조회
+    sido_v = cube.sido[loc + (cube.region_sido[r],)]
+    sido_str = f"{sido_v:.2f}" if pd.notna(sido_v) else "—"
 
+    # 전국 시군구 중 순위 (큐브에 미리 계산)
+    rank = int(cube.rank[loc + (r,)])
+    rank_str = f"{rank}위 / {int(cube.ranked[loc])} · {int(cube.quintile[loc + (r,)])}분위" if rank else "—"
+
+    val_row_style = {"display": "flex", "justifyContent": "space-between", "padding": "2px 0"}
+    val_label_style = {"color": "#666", "fontSize": "12px"}
+    val_num_style = {"fontWeight": "bold", "fontSize": "13px", "color": "#1E1E1E"}
+
+    return html.Div([
+        html.Div(
+            f"{indicator} ({unit_text})",
+            style={"fontSize": "12px", "fontWeight": "600", "color": "#333", "marginBottom": "8px",
+                    "borderBottom": "1px solid #eee", "paddingBottom": "6px"},
+        ),
+        html.Div([
+            html.Span("지자체", style=val_label_style),
+            html.Span(f"{local_str} {unit_text}", style={**val_num_style, "color": "#2196F3"}),
+        ], style=val_row_style),
+        html.Div([
+            html.Span("시도", style=val_label_style),
+            html.Span(f"{sido_str} {unit_text}", style={**val_num_style, "color": "#FF9800"}),
+        ], style=val_row_style),
+        html.Div([
+            html.Span("전국", style=val_label_style),
+            html.Span(f"{national_str} {unit_text}", style={**val_num_style, "color": "#9E9E9E"}),
+        ], style=val_row_style),
+        html.Div([
+            html.Span("순위", style=val_label_style),
+            html.Span(rank_str, style={"fontSize": "12px", "color": "#1E1E1E"}),
+        ], style=val_row_style),
+        html.Div([
+            html.Span("기준", style=val_label_style),
+            html.Span(ref_year, style={"fontSize": "12px", "color": "#999"}),
+        ], style={**val_row_style, "marginTop": "4px"}),
+    ])
+
+
+def build_sparkline_base():
+    """추이 차트 스타일 (지자체·시도·전국 3개 계열, 값 없음). 클릭마다 계열 값만 채운다."""
     fig = go.Figure()
 
     # 지자체값 (파란 실선)
-    local_sizes = [10 if y == year else 7 for y in trend["publish_year"]]
     fig.add_trace(go.Scatter(
-        x=trend["publish_year"],
-        y=trend["local_value"],
+        x=[],
+        y=[],
         mode="lines+markers",
         name="지자체",
         line=dict(color="#2196F3", width=2),
-        marker=dict(size=local_sizes, color="#2196F3"),
+        marker=dict(color="#2196F3"),
         connectgaps=False,
     ))
 
     # 시도값 (주황 점선)
-    sido_sizes = [10 if y == year else 7 for y in sido_trend["publish_year"]]
     fig.add_trace(go.Scatter(
-        x=sido_trend["publish_year"],
-        y=sido_trend["local_value"],
+        x=[],
+        y=[],
         mode="lines+markers",
         name="시도",
         line=dict(color="#FF9800", width=2, dash="dot"),
-        marker=dict(size=sido_sizes, color="#FF9800", symbol="diamond"),
+        marker=dict(color="#FF9800", symbol="diamond"),
         connectgaps=False,
     ))
 
     # 전국값 (회색 파선)
-    nat_sizes = [10 if y == year else 7 for y in trend["publish_year"]]
     fig.add_trace(go.Scatter(
-        x=trend["publish_year"],
-        y=trend["national_value"],
+        x=[],
+        y=[],
         mode="lines+markers",
         name="전국",
         line=dict(color="#9E9E9E", width=2, dash="dash"),
-        marker=dict(size=nat_sizes, color="#9E9E9E", symbol="circle-open"),
+        marker=dict(color="#9E9E9E", symbol="circle-open"),
         connectgaps=False,
     ))
 
@@ -488,13 +1316,225 @@ def update_sidebar(click_data, year, indicator):
             gridcolor="rgba(0,0,0,0.1)",
         ),
     )
+    return fig
+
+
+# 스타일은 1회만 검증·직렬화해 두고, 클릭 시에는 dict에 계열 값만 채운다 (go.Figure 생성 비용 회피)
+SPARKLINE_BASE = build_sparkline_base().to_plotly_json()
+
+
+def build_sparkline(r, indicator, year):
+    """추이 차트 (년도 오름차순, 행이 존재하는 년도만): 사전 계산된 계열을 그대로 사용."""
+    i = cube.indicator_index.get(indicator)
+    trend_years, trend_local, trend_national = region_trends.get((i, r), NO_TREND)
+    sido_years, sido_values = sido_trends.get((i, int(cube.region_sido[r])), NO_TREND[:2])
+    sizes = marker_sizes.get(year, {})
+
+    series = [(trend_years, trend_local), (sido_years, sido_values), (trend_years, trend_national)]
+    data = [
+        {**trace, "x": x, "y": y, "marker": {**trace["marker"], "size": [sizes.get(v, 7) for v in x]}}
+        for trace, (x, y) in zip(SPARKLINE_BASE["data"], series)
+    ]
+    return {"data": data, "layout": SPARKLINE_BASE["layout"]}
+
+
+def build_sidebar(r, indicator, year):
+    sido, sigungu = cube.regions[r]
+    # 지역명 라벨
+    label = sido if sido == sigungu else f"{sido} - {sigungu}"
+    with metrics.phase("summary"):
+        summary = build_summary(r, indicator, year)
+    with metrics.phase("figure"):
+        sparkline = build_sparkline(r, indicator, year)
+    return label, summary, sparkline
+
+
+@app.callback(
+    Output("region-label", "children"),
+    Output("info-panel", "children"),
+    Output("sparkline", "figure"),
+    Input("choropleth-map", "clickData"),
+    State("year-select", "value"),
+    State("indicator-select", "value"),
+)
+@metrics.instrument("update_sidebar")
+def update_sidebar(click_data, year, indicator):
+    if not click_data or not indicator:
+        return "지도에서 지역을 클릭하세요", html.Div("", style={"minHeight": "60px"}), EMPTY_SPARKLINE
+
+    point = click_data["points"][0]
+    customdata = point.get("customdata")
+    if not customdata or len(customdata) < 2:
+        return no_update, no_update, no_update
+
+    r = cube.region_index.get((customdata[0], customdata[1]))
+    if r is None:
+        return no_update, no_update, no_update
+
+    return sidebar_cache.get_or_build((r, indicator, year), lambda: build_sidebar(r, indicator, year))
+
+
+# --- Callback: 지표 상관관계 · 유사 지역 ---
+# 상관행렬(지표 × 지표)과 시군구별 유사 시군구는 큐브가 년도별로 한 번 계산해 보관하고 (IndicatorCube.analysis),
+# 년도별 히트맵 Figure는 캐시에 둔다. 히트맵은 (열림, 년도)에만 의존하므로 지역 클릭·관심지표 변경 때는 목록만 보낸다.
+
+ANALYSIS_CACHE_MB = float(os.environ.get("NABIS_ANALYSIS_CACHE_MB", "4"))
+analysis_cache = FigureCache("analysis", max_bytes=int(ANALYSIS_CACHE_MB * 1e6))
+# 관심지표와 상관이 높은 지표 목록 길이
+CORRELATED_TOP = 5
+
+# 버튼 → 패널 표시·열림 상태
+app.clientside_callback(
+    ClientsideFunction(namespace="nabis", function_name="toggleAnalysis"),
+    Output("analysis-open", "data"),
+    Output("analysis-panel", "style"),
+    Input("analysis-toggle", "n_clicks"),
+    prevent_initial_call=True,
+)
+
+
+def build_correlation_figure(year):
+    """년도별 지표 상관 히트맵 (지표 축은 카탈로그 순서, 지표명은 호버로)."""
+    y = cube.year_index.get(year)
+    corr = cube.analysis(y)["corr"] if y is not None else np.full((len(cube.indicators),) * 2, np.nan)
+    fig = go.Figure(
+        go.Heatmap(
+            z=[_json_values(row) for row in np.round(corr, 2)],
+            x=cube.indicators,
+            y=cube.indicators,
+            zmin=-1,
+            zmax=1,
+            colorscale="RdBu_r",
+            hovertemplate="%{y}<br>%{x}<br>r = %{z:.2f}<extra></extra>",
+            colorbar=dict(thickness=10, len=0.8),
+        )
+    )
+    fig.update_layout(
+        title=dict(text=f"지표 상관관계 ({year}년, 시군구 기준)", font=dict(size=13), x=0.5, xanchor="center"),
+        margin=dict(l=4, r=4, t=32, b=4),
+        xaxis=dict(showticklabels=False, showgrid=False),
+        yaxis=dict(showticklabels=False, showgrid=False, autorange="reversed"),
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="#FFF",
+    )
+    return fig
+
+
+def _josa_wa(word):
+    """word + 와/과 (마지막 글자 받침 유무)."""
+    code = ord(word[-1]) - 0xAC00 if word else -1
+    return word + ("과" if 0 <= code < 11172 and code % 28 else "와")
+
+
+def build_correlated_list(year, indicator):
+    """관심지표와 상관계수 절댓값이 큰 지표 CORRELATED_TOP개."""
+    loc = cube.locate(indicator, year)
+    if not loc:
+        return html.Div("관심지표를 선택하세요", style={"color": "#666"})
+    i, y = loc
+    found = cube.analysis(y)
+    row = np.where(np.arange(len(cube.indicators)) == i, np.nan, found["corr"][i])
+    order = [j for j in np.argsort(-np.abs(np.nan_to_num(row, nan=-1.0)))[:CORRELATED_TOP] if not np.isnan(row[j])]
+    if not order:
+        return html.Div(f"{indicator}: 상관계수를 계산할 수 있는 지표 없음", style={"color": "#666"})
+    return html.Div([
+        html.B(f"{_josa_wa(indicator)} 함께 움직이는 지표"),
+        html.Ol([
+            html.Li(f"{cube.indicators[j]}  r = {row[j]:+.2f} ({found['pairs'][i, j]}곳)") for j in order
+        ], style={"margin": "4px 0", "paddingLeft": "20px"}),
+    ])
+
+
+def build_similar_list(year, click_data):
+    """클릭한 시군구와 지표 구성이 가장 비슷한 시군구 (표준화 거리 순)."""
+    points = (click_data or {}).get("points") or [{}]
+    customdata = points[0].get("customdata")
+    r = cube.region_index.get(tuple(customdata[:2])) if customdata and len(customdata) >= 2 else None
+    y = cube.year_index.get(year)
+    if r is None or y is None:
+        return html.Div("지도에서 지역을 클릭하면 비슷한 지역을 보여줍니다", style={"color": "#666"})
+    found = cube.analysis(y)
+    sido, sigungu = cube.regions[r]
+    items = [
+        html.Li(f"{' '.join(dict.fromkeys(cube.regions[n]))}  거리 {d:.2f} (지표 {k}개)")
+        for n, d, k in zip(found["neighbours"][r], found["distance"][r], found["shared"][r])
+        if n >= 0
+    ]
+    return html.Div([
+        html.B(f"{_josa_wa(sigungu)} 비슷한 지역 ({sido})"),
+        html.Ol(items, style={"margin": "4px 0", "paddingLeft": "20px"}) if items
+        else html.Div("공통 지표가 충분한 지역 없음", style={"color": "#666"}),
+        html.Div("전 지표 표준화 점수 차이의 제곱평균제곱근 (작을수록 비슷함)", style={"fontSize": "10px", "color": "#666"}),
+    ])
+
+
+@app.callback(
+    Output("correlation-heatmap", "figure"),
+    Input("analysis-open", "data"),
+    Input("year-select", "value"),
+    prevent_initial_call=True,
+)
+@metrics.instrument("update_correlation")
+def update_correlation(is_open, year):
+    if not is_open:
+        return no_update
+    return analysis_cache.get_or_build(year, lambda: build_correlation_figure(year))
 
-    return label, summary, fig
+
+@app.callback(
+    Output("correlated-indicators", "children"),
+    Output("similar-regions", "children"),
+    Input("indicator-select", "value"),
+    Input("choropleth-map", "clickData"),
+    Input("year-select", "value"),
+    Input("analysis-open", "data"),
+    prevent_initial_call=True,
+)
+@metrics.instrument("update_similar")
+def update_similar(indicator, click_data, year, is_open=True):
+    if not is_open:
+        return no_update, no_update
+    with metrics.phase("lookup"):
+        return build_correlated_list(year, indicator), build_similar_list(year, click_data)
+
+
+# --- 데이터 내려받기 링크 ---
+# 선택 상태 → /export URL (브라우저에서 조립, 서버 왕복 없음). 비운 선택 상자는 현재 관심지표·기준년도를 뜻한다.
+app.clientside_callback(
+    ClientsideFunction(namespace="nabis", function_name="exportHref"),
+    Output("export-link", "href"),
+    Input("export-indicators", "value"),
+    Input("export-years", "value"),
+    Input("export-scope", "value"),
+    Input("export-format", "value"),
+    Input("indicator-select", "value"),
+    Input("year-select", "value"),
+    Input("choropleth-map", "clickData"),
+    Input("sido-select", "value"),
+    State("export-base", "data"),
+)
+
+
+# --- 계측: /metrics (NABIS_METRICS=1), 느린 콜백 로그 (NABIS_SLOW_CALLBACK_MS). 둘 다 꺼져 있으면 등록하지 않음 ---
+metrics.init_app(app.server, caches=[map_cache, sidebar_cache, analysis_cache])
+
+# --- 사전 렌더링 뷰 (NABIS_STATIC_DIR): 전국 지도·사이드바 응답을 콜백 실행 없이 파일 바이트로 응답 ---
+static = static_views.init_app(
+    app.server, STATIC_DIR, static_views.fingerprint(cube, (__file__,) + static_views.DEPENDENCY_SOURCES)
+) if STATIC_DIR else None
+
+# --- 데이터 내려받기 (/export): 선택한 지표·년도·지역을 CSV/Parquet 조각 단위로 스트리밍 ---
+data_export.init_app(app.server, cube)
 
 
 # ═══════════════════════════════════════════════════════════════════
 # SECTION 4: 실행
 # ═══════════════════════════════════════════════════════════════════
 
+# 개발용 단일 프로세스 서버. 운영 환경은 wsgi.py + gunicorn.conf.py (멀티 워커, 데이터 공유) 사용.
+server = app.server
+
 if __name__ == "__main__":
+    if CACHE_WARMUP:
+        warm_map_cache()
     app.run(debug=False, host="0.0.0.0", port=8050)
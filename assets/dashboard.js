@@ -0,0 +1,138 @@
+// NABIS 균형발전지표 대시보드 — clientside 콜백 (app.py에서 ClientsideFunction으로 참조)
+
+(function () {
+    // 시도 전환 이벤트 최소 간격 (ms)
+    var HOVER_THROTTLE_MS = 80;
+    var EMPTY_GEOJSON = {type: "FeatureCollection", features: []};
+
+    // sent: 마지막으로 보낸 hover-sido, shown: 강조 레이어에 그려 둔 시도
+    var hover = {sent: undefined, shown: null, last: 0, timer: null};
+
+    function mapGraphDiv() {
+        return document.querySelector("#choropleth-map .js-plotly-plot");
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        nabis: {
+            // hoverData → 시도명. 같은 시도 안에서의 이동은 무시하고,
+            // 시도 전환은 HOVER_THROTTLE_MS 간격으로 묶어 마지막 값만 반영한다.
+            hoverSido: function (hoverData) {
+                var nc = window.dash_clientside.no_update;
+                var point = hoverData && hoverData.points && hoverData.points[0];
+                var customdata = point && point.customdata;
+                var sido = customdata && customdata.length >= 2 ? customdata[0] : null;
+
+                clearTimeout(hover.timer);
+                hover.timer = null;
+                if (sido === hover.sent) {
+                    return nc;
+                }
+                var wait = hover.last + HOVER_THROTTLE_MS - Date.now();
+                if (wait <= 0) {
+                    hover.last = Date.now();
+                    hover.sent = sido;
+                    return sido;
+                }
+                hover.timer = setTimeout(function () {
+                    hover.last = Date.now();
+                    hover.sent = sido;
+                    window.dash_clientside.set_props("hover-sido", {data: sido});
+                }, wait);
+                return nc;
+            },
+
+            // relayoutData → {zoom, bounds}. 줌/이동 이벤트만 통과시키고
+            // 그 밖의 relayout(호버 강조의 source 교체 등)은 서버로 보내지 않는다.
+            mapView: function (relayoutData) {
+                if (!relayoutData || relayoutData["map.zoom"] === undefined) {
+                    return window.dash_clientside.no_update;
+                }
+                var derived = relayoutData["map._derived"];
+                var coords = derived && derived.coordinates;
+                var bounds = null;
+                if (coords && coords.length) {
+                    var lons = coords.map(function (c) { return c[0]; });
+                    var lats = coords.map(function (c) { return c[1]; });
+                    bounds = [Math.min.apply(null, lons), Math.min.apply(null, lats),
+                              Math.max.apply(null, lons), Math.max.apply(null, lats)];
+                }
+                return {zoom: relayoutData["map.zoom"], bounds: bounds};
+            },
+
+            // 전국 화면에서 클릭 → 클릭한 지역의 시도로 드릴다운. 드릴다운 중에는 그대로 둔다.
+            drillSido: function (clickData, current) {
+                var point = clickData && clickData.points && clickData.points[0];
+                var customdata = point && point.customdata;
+                if (current || !customdata || customdata.length < 2) {
+                    return window.dash_clientside.no_update;
+                }
+                return customdata[0];
+            },
+
+            // 증감 표시 방식(change, change_pct)에서만 비교 년도 선택 상자를 보인다.
+            changeControls: function (mode) {
+                return mode && mode.indexOf("change") === 0 ? {} : {display: "none"};
+            },
+
+            // 분석 패널 열기/닫기 (버튼 클릭 횟수 홀수 = 열림) → [열림 여부, 패널 style]
+            toggleAnalysis: function (nClicks) {
+                var open = (nClicks || 0) % 2 === 1;
+                return [open, open ? {} : {display: "none"}];
+            },
+
+            // 내려받기 선택 → /export URL. 지역 범위는 클릭한 시군구 / 그 시도(드릴다운 중이면 드릴다운 시도) / 전국.
+            // 클릭한 지역이 없으면 범위를 좁힐 수 없으므로 링크를 비운다.
+            exportHref: function (indicators, years, scope, format, indicator, year, clickData, sido, base) {
+                var point = clickData && clickData.points && clickData.points[0];
+                var customdata = point && point.customdata;
+                var params = new URLSearchParams({format: format || "csv"});
+                (indicators && indicators.length ? indicators : [indicator]).forEach(function (name) {
+                    if (name) { params.append("indicator", name); }
+                });
+                (years && years.length ? years : [year]).forEach(function (value) {
+                    if (value !== null && value !== undefined) { params.append("year", value); }
+                });
+                if (scope === "region") {
+                    if (!customdata || customdata.length < 2) { return null; }
+                    params.append("region", customdata[0] + " " + customdata[1]);
+                } else if (scope === "sido") {
+                    var target = sido || (customdata && customdata[0]);
+                    if (!target) { return null; }
+                    params.append("sido", target);
+                }
+                return base + "?" + params.toString();
+            },
+
+            // 강조 레이어(map.layers[1])의 source만 브라우저에서 교체한다.
+            highlightSido: function (sido, outlines) {
+                var gd = mapGraphDiv();
+                if (!gd || !window.Plotly || !gd.layout || !gd.layout.map) {
+                    return;
+                }
+                var source = (sido && outlines && outlines[sido]) || EMPTY_GEOJSON;
+                hover.shown = sido || null;
+                window.Plotly.relayout(gd, {"map.layers[1].source": source});
+            },
+
+            // 지도 figure가 바뀐 뒤(년도·지표·표시 방식·드릴다운·줌 단계 Patch) 호버 강조를 다시 적용한다.
+            // highlightSido의 relayout은 Dash가 보관한 figure에 남지 않으므로 Patch로 다시 그리면 강조가 지워지고,
+            // 같은 시도 안의 호버는 무시되어 다른 시도로 옮길 때까지 복구되지 않는다.
+            // 이 콜백이 다시 그리기보다 먼저 실행될 수 있으므로 그리기가 끝난 뒤(plotly_afterplot)에도 한 번 더 적용한다.
+            restoreHighlight: function (figure, sido, outlines) {
+                var highlight = window.dash_clientside.nabis.highlightSido;
+                if (!sido) {
+                    return;
+                }
+                highlight(sido, outlines);
+                var gd = mapGraphDiv();
+                if (gd && gd.once) {
+                    gd.once("plotly_afterplot", function () {
+                        if (hover.shown) {
+                            highlight(hover.shown, outlines);
+                        }
+                    });
+                }
+            }
+        }
+    });
+})();
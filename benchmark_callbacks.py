@@ -0,0 +1,249 @@
+"""콜백 지연 시간·응답 크기 벤치마크.
+
+app.py의 콜백 함수를 직접 호출해 (HTTP·Dash 디스패치 제외) 호출별 시간과
+Dash가 전송하는 JSON 직렬화 크기(bytes)와 app.py 응답 압축 설정(NABIS_COMPRESS)으로 전송될 크기
+(gzip, br: 최소 크기 미만은 원본 그대로)를 측정하고, 기준값 파일의 상한을 넘으면 종료 코드 1로 끝난다.
+
+측정 항목:
+  layout                    최초 페이지 레이아웃 (시간 = 직렬화 시간)
+  update_map[miss|hit]      (년도, 지표) 지도 Patch — 캐시를 비운 상태 / 캐시 적중
+  update_map_detail         줌 단계 지오메트리 교체 (세밀 단계가 있을 때)
+  update_drill              시도 드릴다운 전환 (시도 지오메트리 + 시도 시군구 값 + 화면 맞춤)
+  update_map[drill]         드릴다운 중 (년도, 지표) 지도 Patch — 캐시를 비운 상태
+  update_map[mode]          순위·백분위·5분위 지도 Patch — 캐시를 비운 상태
+  update_map[change]        증감·증감률 지도 Patch, 비교 년도 변경 — 캐시를 비운 상태
+  highlight_sido_on_hover   시도 호버 강조 Patch (서버 모드)
+  update_correlation[miss]  년도별 지표 상관 히트맵 — 상관행렬·히트맵 캐시를 모두 비운 상태
+  update_similar            분석 패널 목록 (관심지표와 상관 높은 지표 + 클릭 지역과 비슷한 지역), 년도별 분석 계산 후
+  update_sidebar[miss|hit]  지역 클릭 사이드바 — 캐시를 비운 상태 / 캐시 적중
+  search_regions            지역 검색 한 글자 입력 (시군구 이름 앞부분 / 초성)
+  choose_region             검색 결과 선택 (같은 시도 안에서는 화면 이동 Patch, 다른 시도면 드릴다운 지시)
+
+기준값(benchmark_thresholds.json)은 generate_synthetic_data.py 기본 설정 데이터셋 기준이다.
+
+예:
+  python generate_synthetic_data.py
+  python build_indicator_store.py --data-dir datasets/synthetic
+  python benchmark_callbacks.py
+  python benchmark_callbacks.py --update-thresholds   # 현재 결과 × 여유율로 기준값 갱신
+"""
+
+import argparse
+import gzip
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from plotly.io.json import to_json_plotly
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--data-dir", type=Path, default=Path("datasets/synthetic"))
+parser.add_argument("--samples", type=int, default=30, help="항목별 호출 수")
+parser.add_argument("--seed", type=int, default=0)
+parser.add_argument("--thresholds", type=Path, default=Path("benchmark_thresholds.json"))
+parser.add_argument("--output", type=Path, help="결과 JSON 저장 경로")
+parser.add_argument("--update-thresholds", action="store_true", help="현재 결과로 기준값 파일을 다시 쓴다")
+parser.add_argument("--time-headroom", type=float, default=3.0, help="기준값 갱신 시 p95 시간 여유 배수")
+parser.add_argument("--bytes-headroom", type=float, default=1.1, help="기준값 갱신 시 응답 크기 여유 배수")
+args = parser.parse_args()
+
+if not (args.data_dir / "indicators_long.csv").exists() and not (args.data_dir / "indicator_store").exists():
+    sys.exit(f"✗ {args.data_dir}에 지표 데이터가 없습니다. python generate_synthetic_data.py --out {args.data_dir} 먼저 실행")
+
+# app.py는 import 시 설정을 읽으므로 먼저 지정한다 (서버 모드: 호버 강조 콜백 등록)
+os.environ["NABIS_DATA_DIR"] = str(args.data_dir)
+os.environ["NABIS_HOVER_MODE"] = "server"
+os.environ["NABIS_CACHE_WARMUP"] = "0"
+
+t0 = time.perf_counter()
+import app as dashboard  # noqa: E402
+import region_search  # noqa: E402
+
+startup_s = time.perf_counter() - t0
+cube = dashboard.cube
+rng = random.Random(args.seed)
+
+
+def compressed_sizes(body):
+    """응답 본문 → (gzip bytes, br bytes). app.py의 Flask-Compress 설정과 같은 수준·최소 크기."""
+    if len(body) < dashboard.COMPRESS_MIN_SIZE:
+        return len(body), len(body)
+    gz = len(gzip.compress(body, compresslevel=6, mtime=0))
+    br = len(dashboard.brotli.compress(body, quality=4)) if dashboard.brotli else gz
+    return gz, br
+
+
+def measure(call, before=None):
+    """call()을 samples회 실행 → (호출별 ms, 호출별 응답 본문). before()는 시간 측정 밖에서 매번 실행."""
+    times, bodies = [], []
+    for _ in range(args.samples):
+        if before:
+            before()
+        t = time.perf_counter()
+        result = call()
+        times.append((time.perf_counter() - t) * 1e3)
+        bodies.append(to_json_plotly(result).encode("utf-8"))
+    return times, bodies
+
+
+def pick_view():
+    return rng.choice(cube.years), rng.choice(cube.indicators)
+
+
+def pick_click():
+    sido, sigungu = rng.choice(cube.regions)
+    return {"points": [{"customdata": [sido, sigungu]}]}
+
+
+def pick_sido():
+    return rng.choice(list(dashboard.drill_views))
+
+
+def pick_viewport():
+    """임의 시군구 중심의 줌 8 화면 (약 1.5° × 1°)."""
+    minx, miny, maxx, maxy = dashboard.geo_levels[-1]["bbox"][rng.randrange(len(cube.regions))]
+    cx, cy = (minx + maxx) / 2, (miny + maxy) / 2
+    return {"zoom": 8, "bounds": [cx - 0.75, cy - 0.5, cx + 0.75, cy + 0.5]}
+
+
+results = {}
+
+
+def record(name, times, bodies):
+    gz, br = zip(*(compressed_sizes(body) for body in bodies))
+    results[name] = {
+        "p50_ms": float(np.percentile(times, 50)),
+        "p95_ms": float(np.percentile(times, 95)),
+        "max_ms": float(np.max(times)),
+        "bytes": int(np.median([len(body) for body in bodies])),
+        "gzip_bytes": int(np.median(gz)),
+        "br_bytes": int(np.median(br)),
+    }
+
+
+# 최초 레이아웃 (지오메트리 URL 모드에서는 URL만, inline 모드에서는 GeoJSON 포함)
+layout_times, layout_bodies = [], []
+for _ in range(args.samples):
+    t = time.perf_counter()
+    layout_bodies.append(to_json_plotly(dashboard.app.layout).encode("utf-8"))
+    layout_times.append((time.perf_counter() - t) * 1e3)
+record("layout", layout_times, layout_bodies)
+
+# 지도: 캐시 미스 (매 호출 전 캐시 비움) / 적중 (같은 키 반복)
+record("update_map[miss]", *measure(lambda: dashboard.update_map(*pick_view()), before=dashboard.map_cache.clear))
+view = pick_view()
+dashboard.update_map(*view)
+record("update_map[hit]", *measure(lambda: dashboard.update_map(*view)))
+
+if hasattr(dashboard, "update_map_detail"):
+    record("update_map_detail", *measure(lambda: dashboard.update_map_detail(pick_viewport(), [0])))
+
+record("update_drill", *measure(lambda: dashboard.update_drill(pick_sido(), *pick_view())))
+record("update_map[drill]", *measure(
+    lambda: dashboard.update_map(*pick_view(), sido=pick_sido()), before=dashboard.map_cache.clear
+))
+
+record("update_map[mode]", *measure(
+    lambda: dashboard.update_map(*pick_view(), mode=rng.choice(["rank", "percentile", "quintile"])),
+    before=dashboard.map_cache.clear,
+))
+view = pick_view()
+record("update_map[change]", *measure(
+    lambda: dashboard.update_map(
+        *view, mode=rng.choice(["change", "change_pct"]), base_year=rng.choice(cube.years)
+    ),
+    before=dashboard.map_cache.clear,
+))
+
+record("highlight_sido_on_hover", *measure(
+    lambda: dashboard.highlight_sido_on_hover(rng.choice(cube.sidos))
+))
+
+
+def clear_analysis():
+    cube.analyses.clear()
+    dashboard.analysis_cache.clear()
+
+
+record("update_correlation[miss]", *measure(
+    lambda: dashboard.update_correlation(True, rng.choice(cube.years)), before=clear_analysis
+))
+for y in range(len(cube.years)):
+    cube.analysis(y)
+record("update_similar", *measure(
+    lambda: dashboard.update_similar(rng.choice(cube.indicators), pick_click(), rng.choice(cube.years))
+))
+
+record("update_sidebar[miss]", *measure(
+    lambda: dashboard.update_sidebar(pick_click(), *pick_view()), before=dashboard.sidebar_cache.clear
+))
+click, view = pick_click(), pick_view()
+dashboard.update_sidebar(click, *view)
+record("update_sidebar[hit]", *measure(lambda: dashboard.update_sidebar(click, *view)))
+
+# 지역 검색: 임의 시군구 이름의 앞부분 또는 초성 골격 앞부분
+def pick_search():
+    _, sigungu = rng.choice(cube.regions)
+    text = rng.choice([sigungu, region_search.skeleton(sigungu)])
+    return text[: rng.randint(1, len(text))]
+
+
+record("search_regions", *measure(lambda: dashboard.search_regions(pick_search())))
+record("choose_region", *measure(
+    lambda: dashboard.choose_region(
+        dashboard.cube.region_keys[rng.randrange(len(cube.regions))], rng.choice([None, *cube.sidos])
+    )
+))
+
+# 보고
+print(f"데이터: {args.data_dir} (지표 {len(cube.indicators)} × 년도 {len(cube.years)} × 시군구 {len(cube.regions)}), "
+      f"앱 로딩 {startup_s:.2f}s, 항목별 {args.samples}회")
+print(f"{'콜백':<26}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}{'bytes':>12}{'gzip':>10}{'br':>10}")
+for name, r in results.items():
+    print(f"{name:<26}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}{r['max_ms']:>10.2f}{r['bytes']:>12,}"
+          f"{r['gzip_bytes']:>10,}{r['br_bytes']:>10,}")
+
+if args.output:
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"data_dir": str(args.data_dir), "startup_s": startup_s, "results": results}, f, ensure_ascii=False, indent=2)
+
+if args.update_thresholds:
+    thresholds = {
+        name: {
+            "p95_ms": round(max(r["p95_ms"] * args.time_headroom, 5.0), 1),
+            "bytes": int(r["bytes"] * args.bytes_headroom),
+            "br_bytes": int(r["br_bytes"] * args.bytes_headroom),
+        }
+        for name, r in results.items()
+    }
+    with open(args.thresholds, "w", encoding="utf-8") as f:
+        json.dump(thresholds, f, ensure_ascii=False, indent=2)
+    print(f"✓ {args.thresholds} 기준값 갱신")
+    sys.exit(0)
+
+# 기준값 비교: 하나라도 넘으면 종료 코드 1
+if not args.thresholds.exists():
+    print(f"  - 기준값 파일 없음 ({args.thresholds}), 비교 생략")
+    sys.exit(0)
+with open(args.thresholds, encoding="utf-8") as f:
+    thresholds = json.load(f)
+
+failures = []
+for name, limit in thresholds.items():
+    r = results.get(name)
+    if r is None:
+        continue
+    for metric, bound in limit.items():
+        if r[metric] > bound:
+            failures.append(f"{name} {metric}: {r[metric]:,.2f} > {bound:,}")
+
+if failures:
+    print("✗ 기준값 초과:")
+    for line in failures:
+        print(f"  - {line}")
+    sys.exit(1)
+print(f"✓ 기준값 이내 ({args.thresholds})")
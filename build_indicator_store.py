@@ -0,0 +1,65 @@
+"""지표 번들 생성: indicators_long.csv → datasets/processed/indicator_store/.
+
+CSV 파싱·지역명 보정·큐브 색인을 빌드 시 1회 수행하고 결과를 mmap 가능한 .npy 번들로 저장한다.
+모든 CSV 시군구/시도 키를 region_index.json(prepare_dashboard_data.py 출력)과 대조하고,
+GeoJSON에 없는 키가 있으면 목록을 출력하고 중단한다 (배포 전 조인 누락 검출).
+큐브 시군구 축은 지역 색인 id 순서 = GeoJSON feature 순서.
+app.py는 번들이 있으면 CSV 대신 번들을 연다 (파싱 없음, 워커 간 페이지 공유).
+CSV나 GeoJSON이 갱신되면 다시 실행한다. --data-dir로 다른 데이터 디렉터리(예: 합성 데이터)를 지정할 수 있다.
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+from indicator_store import ARRAYS, RANK_ARRAYS, IndicatorCube, read_indicators_csv
+from region_index import RegionIndex
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--data-dir", type=Path, default=Path("datasets/processed"))
+args = parser.parse_args()
+
+DATA = args.data_dir
+SRC = DATA / "indicators_long.csv"
+DST = DATA / "indicator_store"
+
+# 1. CSV 로딩 + 지역명 보정
+t0 = time.perf_counter()
+df = read_indicators_csv(SRC)
+print(f"1. CSV 로딩: {len(df):,}행 ({time.perf_counter() - t0:.2f}s)")
+
+# 2. 지역 키 검증 + 지표 카탈로그 순서·지역 색인 순서로 큐브 색인
+regions = RegionIndex.load(DATA / "region_index.json")
+unknown_sidos = sorted(set(df.loc[df["region_type"] == "시도", "sido"]) - {sd for sd, _ in regions.regions})
+if unknown_sidos:
+    sys.exit(f"✗ GeoJSON에 없는 시도 {len(unknown_sidos)}개: {unknown_sidos}")
+
+with open(DATA / "indicator_catalog.json", encoding="utf-8") as f:
+    catalog = json.load(f)
+try:
+    cube = IndicatorCube.from_frame(df, [ind["indicator_name"] for ind in catalog], regions.regions)
+except ValueError as e:
+    sys.exit(f"✗ {e}")
+print(f"2. 큐브: 지표 {len(cube.indicators)} × 년도 {len(cube.years)} × 시군구 {len(cube.regions)} (시도 {len(cube.sidos)})")
+no_data = [key for r, key in enumerate(cube.region_keys) if not cube.present[:, :, r].any()]
+if no_data:
+    print(f"  - 데이터가 없는 GeoJSON 시군구 {len(no_data)}개: {no_data}")
+
+# 3. 번들 저장
+cube.save(DST)
+size = sum(p.stat().st_size for p in DST.iterdir())
+print(f"✓ {DST} 생성 완료 ({size / 1e6:.2f} MB, CSV {SRC.stat().st_size / 1e6:.1f} MB)")
+
+# 검증: 번들 재로딩 결과가 원본 큐브와 같은지
+loaded = IndicatorCube.load(DST)
+for name in ARRAYS + RANK_ARRAYS:
+    assert np.array_equal(
+        getattr(cube, name), getattr(loaded, name), equal_nan=name in ("local", "national", "sido", "percentile")
+    ), name
+t0 = time.perf_counter()
+IndicatorCube.load(DST)
+print(f"  번들 로딩 시간: {(time.perf_counter() - t0) * 1e3:.1f} ms")
@@ -0,0 +1,203 @@
+"""선택한 지표·년도·지역 데이터 내려받기 (/export): CSV 또는 Parquet을 조각 단위로 스트리밍한다.
+
+요청마다 long-format DataFrame을 만들어 to_csv()로 통째로 직렬화하는 대신, 지표 큐브 배열에서
+(지표, 년도) 블록 단위로 행을 만들어 CHUNK_BYTES 정도씩 보낸다. 전체 데이터를 내려받아도 워커 메모리는
+조각 하나 크기만 쓰고, 스레드 서버에서는 다른 콜백 요청을 막지 않는다.
+
+    GET /export?format=csv&indicator=<지표명>&year=2025&sido=<시도>&region=<시도 시군구>
+
+  indicator, year  여러 번 지정 가능. 생략하면 전체
+  sido, region     시도 전체 / 시군구 (csv_sido_sigungu 키). 둘 다 생략하면 전국 시군구
+  format           csv (UTF-8 BOM — 엑셀에서 한글이 깨지지 않도록) | parquet (pyarrow 설치 시, 지표마다 row group 1개)
+
+열: sido, sigungu, publish_year, indicator_name, unit, local_value, sido_value, national_value, reference_year
+(값이 없는 (지표, 년도, 시군구) 행은 내보내지 않는다)
+"""
+
+import csv
+import io
+
+import numpy as np
+from flask import Response, abort, request
+
+import metrics
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow 미설치: CSV만 제공
+    pa = pq = None
+
+FORMATS = ("csv", "parquet") if pa is not None else ("csv",)
+COLUMNS = [
+    "sido", "sigungu", "publish_year", "indicator_name", "unit",
+    "local_value", "sido_value", "national_value", "reference_year",
+]
+# CSV 조각 크기: 이만큼 쌓이면 보낸다
+CHUNK_BYTES = 64 * 1024
+
+
+class Selection:
+    """요청 인자 → 큐브 정수 코드 (지표 i, 년도 y, 시군구 r). 알 수 없는 이름은 ValueError."""
+
+    def __init__(self, cube, indicators=(), years=(), sidos=(), regions=()):
+        self.cube = cube
+        self.indicators = self._codes(cube.indicator_index, indicators, "지표") or range(len(cube.indicators))
+        self.years = self._codes(cube.year_index, years, "년도") or range(len(cube.years))
+
+        keys = {key: r for r, key in enumerate(cube.region_keys)}
+        chosen = set(self._codes(keys, regions, "시군구"))
+        for s in self._codes(cube.sido_index, sidos, "시도"):
+            chosen.update(np.flatnonzero(cube.region_sido == s).tolist())
+        self.regions = np.array(sorted(chosen), dtype=np.intp) if (regions or sidos) else np.arange(len(cube.regions))
+
+    @staticmethod
+    def _codes(index, names, label):
+        unknown = [name for name in names if name not in index]
+        if unknown:
+            raise ValueError(f"알 수 없는 {label}: {', '.join(map(str, unknown))}")
+        return list(dict.fromkeys(index[name] for name in names))
+
+    @classmethod
+    def from_args(cls, cube, args):
+        years = []
+        for value in args.getlist("year"):
+            try:
+                years.append(int(value))
+            except ValueError:
+                raise ValueError(f"년도가 정수가 아님: {value}") from None
+        return cls(cube, args.getlist("indicator"), years, args.getlist("sido"), args.getlist("region"))
+
+    def blocks(self):
+        """(지표, 년도) 블록마다 값이 있는 시군구 행의 열 배열 dict. 블록 하나는 시군구 수(≤229)행."""
+        cube = self.cube
+        sido_labels = np.array([sido for sido, _ in cube.regions], dtype=object)
+        sigungu_labels = np.array([sigungu for _, sigungu in cube.regions], dtype=object)
+        reference_labels = np.array(cube.reference_labels + [None], dtype=object)  # -1 → None
+        for i in self.indicators:
+            for y in self.years:
+                rows = self.regions[np.asarray(cube.present[i, y, self.regions])]
+                if not rows.size:
+                    continue
+                yield i, {
+                    "sido": sido_labels[rows],
+                    "sigungu": sigungu_labels[rows],
+                    "publish_year": np.full(rows.size, cube.years[y]),
+                    "indicator_name": np.full(rows.size, cube.indicators[i], dtype=object),
+                    "unit": np.full(rows.size, cube.units[i], dtype=object),
+                    "local_value": np.asarray(cube.local[i, y, rows]),
+                    "sido_value": np.asarray(cube.sido[i, y, cube.region_sido[rows]]),
+                    "national_value": np.asarray(cube.national[i, y, rows]),
+                    "reference_year": reference_labels[np.asarray(cube.reference[i, y, rows])],
+                }
+
+
+def _csv_cells(values):
+    """float32 배열 → 최단 표기 문자열 (NaN → 빈 칸)."""
+    return ["" if cell == "nan" else cell for cell in values.astype(str)]
+
+
+def stream_csv(selection):
+    buffer = io.StringIO()
+    buffer.write("\ufeff")
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(COLUMNS)
+    for _, block in selection.blocks():
+        for name in ("local_value", "sido_value", "national_value"):
+            block[name] = _csv_cells(block[name])
+        writer.writerows(zip(*(block[name] for name in COLUMNS)))
+        if buffer.tell() >= CHUNK_BYTES:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+
+class _ChunkSink(io.RawIOBase):
+    """ParquetWriter 출력 버퍼: 쓴 바이트를 모았다가 drain()으로 넘긴다 (위치는 누적값 — row group 오프셋 유지)."""
+
+    def __init__(self):
+        super().__init__()
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self):
+        body = b"".join(self.chunks)
+        self.chunks.clear()
+        return body
+
+
+def _parquet_schema():
+    return pa.schema([
+        ("sido", pa.string()), ("sigungu", pa.string()), ("publish_year", pa.int32()),
+        ("indicator_name", pa.string()), ("unit", pa.string()),
+        ("local_value", pa.float32()), ("sido_value", pa.float32()), ("national_value", pa.float32()),
+        ("reference_year", pa.string()),
+    ])
+
+
+def stream_parquet(selection):
+    """지표 하나(선택 년도 전체)를 row group 하나로 써서 보낸다. 파일 끝의 메타데이터는 마지막 조각에 실린다."""
+    schema = _parquet_schema()
+    sink = _ChunkSink()
+    writer = pq.ParquetWriter(pa.PythonFile(sink, mode="w"), schema, compression="zstd")
+    pending = []
+
+    def flush():
+        writer.write_table(pa.concat_tables(pending))
+        pending.clear()
+        return sink.drain()
+
+    current = None
+    for i, block in selection.blocks():
+        if pending and i != current:
+            yield flush()
+        current = i
+        pending.append(pa.Table.from_pydict(block, schema=schema))
+    if pending:
+        yield flush()
+    writer.close()
+    yield sink.drain()
+
+
+def _filename(selection, extension):
+    cube = selection.cube
+    years = [cube.years[y] for y in selection.years]
+    span = str(years[0]) if len(years) == 1 else f"{min(years)}-{max(years)}"
+    return f"nabis_indicators_{span}.{extension}"
+
+
+def init_app(server, cube):
+    """/export 라우트 등록."""
+
+    @server.route("/export")
+    def export_indicators():
+        fmt = request.args.get("format", "csv")
+        if fmt not in FORMATS:
+            abort(400, description=f"지원하지 않는 형식: {fmt} (가능: {', '.join(FORMATS)})")
+        try:
+            selection = Selection.from_args(cube, request.args)
+        except ValueError as exc:
+            abort(400, description=str(exc))
+        if metrics.ENABLED:
+            metrics.registry.inc("nabis_exports_total", (("format", fmt),))
+        if fmt == "csv":
+            body, mimetype = stream_csv(selection), "text/csv"
+        else:
+            body, mimetype = stream_parquet(selection), "application/vnd.apache.parquet"
+        response = Response(body, mimetype=mimetype)
+        response.headers["Content-Disposition"] = f'attachment; filename="{_filename(selection, fmt)}"'
+        return response
+
+    return export_indicators
@@ -0,0 +1,129 @@
+"""전국 지도·지역 클릭 사이드바 응답 사전 렌더링 (static_views.py가 Dash 디스패치 없이 그대로 응답).
+
+app.py를 import해 앱의 Flask 테스트 클라이언트로 /_dash-update-component를 호출하므로
+저장되는 본문은 실행 중인 앱이 보낼 응답과 바이트 단위로 같다.
+  - 지도: 지표 × 년도 전체 (전국 화면). 원본 + br/gzip 최고 수준 압축본
+  - 사이드바: 지표 × 년도 × 시군구 전체. (지표, 년도)마다 시군구 id 순서의 본문 목록을 gzip 파일 하나로
+결과는 임시 디렉터리에 만든 뒤 교체하므로 내보내는 동안에도 기존 디렉터리를 그대로 쓸 수 있다.
+데이터(build_indicator_store.py)나 app.py·indicator_store.py·region_index.py를 바꾸면 다시 실행한다 (지문이 다르면 앱이 사전 렌더링 뷰를 쓰지 않는다).
+
+예:
+  python export_static_views.py
+  NABIS_STATIC_DIR=datasets/static_views python app.py
+  python export_static_views.py --data-dir datasets/synthetic --out datasets/synthetic/static_views
+"""
+
+import argparse
+import gzip
+import json
+import os
+import shutil
+import sys
+import time
+from pathlib import Path
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--data-dir", type=Path, default=Path("datasets/processed"))
+parser.add_argument("--out", type=Path, default=Path("datasets/static_views"))
+parser.add_argument("--no-sidebar", action="store_true", help="지도만 내보낸다")
+args = parser.parse_args()
+
+# app.py는 import 시 설정을 읽으므로 먼저 지정한다 (사전 렌더링 뷰·계측·캐시 적재 끔)
+os.environ["NABIS_DATA_DIR"] = str(args.data_dir)
+os.environ["NABIS_STATIC_DIR"] = ""
+os.environ["NABIS_METRICS"] = "0"
+os.environ["NABIS_SLOW_CALLBACK_MS"] = "0"
+os.environ["NABIS_CACHE_WARMUP"] = "0"
+
+import app as dashboard  # noqa: E402
+import static_views  # noqa: E402
+
+cube = dashboard.cube
+client = dashboard.app.server.test_client()
+deps = {dep["output"]: dep for dep in client.get(dashboard.app.get_relative_path("/_dash-dependencies")).get_json()}
+UPDATE_URL = dashboard.app.get_relative_path("/_dash-update-component")
+
+
+def render(output, values, changed):
+    """콜백 하나를 앱과 같은 경로로 호출 → 응답 본문 (압축 없음)."""
+    dep = deps[output]
+
+    def fill(items):
+        return [{**item, "value": values.get(f"{item['id']}.{item['property']}")} for item in items]
+
+    outputs = [
+        dict(zip(("id", "property"), part.split(".", 1)))
+        for part in (output[2:-2].split("...") if output.startswith("..") else [output])
+    ]
+    response = client.post(UPDATE_URL, json={
+        "output": output,
+        "outputs": outputs if output.startswith("..") else outputs[0],
+        "inputs": fill(dep["inputs"]),
+        "changedPropIds": [changed],
+        "state": fill(dep.get("state", [])),
+    }, headers={"Accept-Encoding": "identity"})
+    if response.status_code != 200:
+        sys.exit(f"✗ {output} 응답 {response.status_code}: {values}")
+    return response.data
+
+
+def write_map(path, body):
+    path.write_bytes(body)
+    if len(body) < dashboard.COMPRESS_MIN_SIZE:
+        return
+    if dashboard.brotli:
+        path.with_name(path.name + ".br").write_bytes(dashboard.brotli.compress(body, quality=11))
+    path.with_name(path.name + ".gz").write_bytes(gzip.compress(body, compresslevel=9, mtime=0))
+
+
+tmp = args.out.with_name(args.out.name + ".tmp")
+shutil.rmtree(tmp, ignore_errors=True)
+(tmp / "map").mkdir(parents=True)
+(tmp / "sidebar").mkdir()
+
+t0 = time.perf_counter()
+for i, indicator in enumerate(cube.indicators):
+    for year in cube.years:
+        values = {
+            **static_views.MAP_DEFAULTS,
+            "year-select.value": year,
+            "indicator-select.value": indicator,
+            "color-scale.value": [],
+        }
+        write_map(tmp / static_views.MAP_FILE.format(indicator=i, year=year), render(
+            static_views.MAP_OUTPUT, values, "indicator-select.value"
+        ))
+        if args.no_sidebar:
+            continue
+        bodies = [
+            render(static_views.SIDEBAR_OUTPUT, {
+                **values,
+                "choropleth-map.clickData": {"points": [{"customdata": [sido, sigungu]}]},
+            }, "choropleth-map.clickData").decode("utf-8")
+            for sido, sigungu in cube.regions
+        ]
+        with gzip.open(tmp / static_views.SIDEBAR_FILE.format(indicator=i, year=year), "wt", encoding="utf-8") as f:
+            json.dump(bodies, f, ensure_ascii=False, separators=(",", ":"))
+        # 사이드바 캐시가 내보내기 중에 상한까지 차지 않도록 (지표·년도마다 전체 시군구를 한 번씩만 요청)
+        dashboard.sidebar_cache.clear()
+    print(f"  {i + 1:>3}/{len(cube.indicators)} {indicator}")
+
+manifest = {
+    "fingerprint": static_views.fingerprint(cube, (dashboard.__file__,) + static_views.DEPENDENCY_SOURCES),
+    "indicators": cube.indicators,
+    "years": cube.years,
+    "regions": [list(region) for region in cube.regions],
+    "map": static_views.MAP_FILE,
+    "sidebar": None if args.no_sidebar else static_views.SIDEBAR_FILE,
+}
+with open(tmp / static_views.MANIFEST, "w", encoding="utf-8") as f:
+    json.dump(manifest, f, ensure_ascii=False, indent=1)
+
+shutil.rmtree(args.out, ignore_errors=True)
+tmp.replace(args.out)
+
+size_mb = sum(path.stat().st_size for path in args.out.rglob("*") if path.is_file()) / 1e6
+n_views = len(cube.indicators) * len(cube.years)
+print(f"✓ {args.out} 생성 완료: 지도 {n_views}개"
+      + ("" if args.no_sidebar else f", 사이드바 {n_views * len(cube.regions):,}개")
+      + f" ({size_mb:.1f} MB, {time.perf_counter() - t0:.1f}s)")
@@ -0,0 +1,97 @@
+"""콜백 응답 LRU 캐시: 직렬화 크기 기준 메모리 상한, 적중/미스 카운터, 백그라운드 사전 적재."""
+
+import threading
+from collections import OrderedDict
+
+from plotly.io.json import to_json_plotly
+
+
+class FigureCache:
+    """키 → 완성된 콜백 응답(Figure / Patch) 캐시.
+
+    항목 크기는 Dash가 실제로 전송하는 JSON 직렬화 길이(bytes)로 계산하고,
+    합계가 max_bytes를 넘으면 가장 오래 사용되지 않은 항목부터 축출한다.
+    Flask 멀티스레드 서버에서 공유되므로 모든 접근은 잠금으로 보호한다.
+    """
+
+    def __init__(self, name, max_bytes):
+        self.name = name
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key → (value, nbytes)
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value):
+        nbytes = len(to_json_plotly(value))
+        if nbytes > self.max_bytes:
+            return value
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes -= old[1]
+            self._entries[key] = (value, nbytes)
+            self.bytes += nbytes
+            while self.bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.bytes -= evicted
+                self.evictions += 1
+        return value
+
+    def get_or_build(self, key, build):
+        value = self.get(key)
+        if value is None:
+            value = self.put(key, build())
+        return value
+
+    def warm(self, keys, build, background=True):
+        """keys 전체를 미리 채운다. build(key) → 값. 이미 있는 키는 건너뛴다."""
+
+        def run():
+            for key in keys:
+                if key not in self:
+                    self.put(key, build(key))
+
+        if not background:
+            run()
+            return None
+        thread = threading.Thread(target=run, name=f"{self.name}-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def clear(self):
+        """모든 항목 제거 (카운터는 유지)."""
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
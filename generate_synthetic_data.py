@@ -0,0 +1,117 @@
+"""합성 지표 데이터 생성: 실제 indicators_long.csv와 같은 스키마의 재현 가능한 데이터셋.
+
+저장소에는 원본 CSV가 포함되지 않으므로 성능 측정(benchmark_callbacks.py)과 로컬 실행에 사용한다.
+지역은 region_index.json(GeoJSON 시군구 229개)을 따르고, 원본 CSV의 지역명 불일치
+(전라북도 구 명칭, 군위군 경상북도 소속, 세종 시도 행만 존재)도 그대로 재현해 보정 단계까지 거치게 한다.
+
+출력 (--out, 기본 datasets/synthetic):
+  - indicators_long.csv      (지역 × 년도 × 지표 long-format, 12열)
+  - indicator_catalog.json   (카탈로그 지표 + 부족분은 '합성지표 N'으로 채움)
+  - geo_*.json, region_index.json (datasets/processed에서 복사 — 앱이 그대로 읽을 수 있는 데이터 디렉터리)
+
+예:
+  python generate_synthetic_data.py --years 20 --indicators 200
+  python build_indicator_store.py --data-dir datasets/synthetic
+  NABIS_DATA_DIR=datasets/synthetic python app.py
+"""
+
+import argparse
+import json
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from region_index import RegionIndex
+
+SRC = Path("datasets/processed")
+COLUMNS = [
+    "sido", "sigungu", "region_type", "publish_year", "indicator_no", "indicator_type",
+    "category", "indicator_name", "unit", "local_value", "national_value", "reference_year",
+]
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--out", type=Path, default=Path("datasets/synthetic"))
+parser.add_argument("--years", type=int, default=5, help="년도 수 (2021년부터)")
+parser.add_argument("--first-year", type=int, default=2021)
+parser.add_argument("--indicators", type=int, default=46, help="지표 수 (카탈로그 46종 초과분은 합성)")
+parser.add_argument("--missing-rate", type=float, default=0.05, help="시군구 값 결측 비율")
+parser.add_argument("--seed", type=int, default=0)
+args = parser.parse_args()
+if args.out.resolve() == SRC.resolve():
+    parser.error(f"--out은 {SRC}와 달라야 합니다 (실제 카탈로그 보호)")
+
+rng = np.random.default_rng(args.seed)
+
+# 1. 지표 카탈로그 (실제 카탈로그 순서 유지, 부족분 합성)
+with open(SRC / "indicator_catalog.json", encoding="utf-8") as f:
+    catalog = json.load(f)[:args.indicators]
+for no in range(len(catalog) + 1, args.indicators + 1):
+    catalog.append({
+        "indicator_no": no,
+        "indicator_type": "객관지표",
+        "category": "합성",
+        "indicator_name": f"합성지표 {no:03d}",
+        "unit": "%",
+    })
+
+# 2. 지역 (GeoJSON 기준 이름) + 년도
+regions = RegionIndex.load(SRC / "region_index.json")
+sidos = sorted({sd for sd, _ in regions.regions})
+years = np.arange(args.first_year, args.first_year + args.years)
+sgg_regions = [(sd, sgg) for sd, sgg in regions.regions if sd != "세종특별자치시"]  # 세종은 시도 행만 존재
+
+n_ind, n_year = len(catalog), len(years)
+
+# 지표별 전국 평균·분산, 지역별 편차를 두어 지도 색상 분포가 실제처럼 퍼지게 한다
+center = rng.uniform(10, 100, n_ind)
+spread = center * rng.uniform(0.05, 0.3, n_ind)
+national = center[:, None] + spread[:, None] * rng.normal(0, 0.2, (n_ind, n_year))  # (I, Y)
+
+
+def frame(names, region_type):
+    """(지표, 년도, 지역) 전 조합의 long-format 블록."""
+    n = len(names)
+    i, y, r = (a.ravel() for a in np.meshgrid(np.arange(n_ind), np.arange(n_year), np.arange(n), indexing="ij"))
+    bias = rng.normal(0, 1, (n_ind, n))  # 지역 고유 편차 (년도 간 유지)
+    local = national[i, y] + spread[i] * (bias[i, r] + rng.normal(0, 0.3, len(i)))
+    if region_type == "시군구":
+        local[rng.random(len(i)) < args.missing_rate] = np.nan
+    sido = np.array([sd for sd, _ in names])[r]
+    sigungu = np.array([sgg for _, sgg in names])[r]
+    reference = np.where(rng.random(len(i)) < 0.05, "-", (years[y] - 1).astype(str) + "년")
+    return pd.DataFrame({
+        "sido": sido,
+        "sigungu": sigungu,
+        "region_type": region_type,
+        "publish_year": years[y],
+        "indicator_no": [catalog[k]["indicator_no"] for k in i],
+        "indicator_type": [catalog[k]["indicator_type"] for k in i],
+        "category": [catalog[k]["category"] for k in i],
+        "indicator_name": [catalog[k]["indicator_name"] for k in i],
+        "unit": [catalog[k]["unit"] for k in i],
+        "local_value": local.round(3),
+        "national_value": national[i, y].round(3),
+        "reference_year": reference,
+    }, columns=COLUMNS)
+
+
+df = pd.concat([frame([(sd, sd) for sd in sidos], "시도"), frame(sgg_regions, "시군구")], ignore_index=True)
+
+# 3. 원본 CSV의 지역명 불일치 재현 (build_indicator_store.py / region_index 보정 대상)
+df.loc[(df["sido"] == "전북특별자치도") & (df["publish_year"] < 2024), "sido"] = "전라북도"
+df.loc[(df["region_type"] == "시도") & (df["sigungu"] == "전북특별자치도") & (df["publish_year"] < 2024), "sigungu"] = "전라북도"
+df.loc[(df["sigungu"] == "군위군") & (df["publish_year"] < 2023), "sido"] = "경상북도"
+
+# 4. 저장
+args.out.mkdir(parents=True, exist_ok=True)
+df.to_csv(args.out / "indicators_long.csv", index=False)
+with open(args.out / "indicator_catalog.json", "w", encoding="utf-8") as f:
+    json.dump(catalog, f, ensure_ascii=False, indent=2)
+for path in [SRC / "region_index.json", *SRC.glob("geo_*.json")]:
+    shutil.copy2(path, args.out / path.name)
+
+print(f"✓ {args.out / 'indicators_long.csv'} 생성 완료 ({len(df):,}행, "
+      f"지표 {n_ind} × 년도 {n_year} × 시군구 {len(regions)}, "
+      f"{(args.out / 'indicators_long.csv').stat().st_size / 1e6:.1f} MB)")
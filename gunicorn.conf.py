@@ -0,0 +1,43 @@
+"""gunicorn 설정 (운영): gunicorn -c gunicorn.conf.py wsgi:server
+
+환경 변수:
+  NABIS_BIND     바인드 주소 (기본 0.0.0.0:8050)
+  NABIS_WORKERS  워커 프로세스 수 (기본 CPU 코어 수). 콜백은 CPU 위주(NumPy 조회·JSON 직렬화)라 GIL을 나눠 쓰지 않도록
+                 프로세스로 코어를 채운다. 데이터는 공유되므로 워커를 늘려도 메모리는 워커별 캐시·요청 객체만큼만 는다.
+  NABIS_THREADS  워커당 스레드 수 (기본 4). 정적 지오메트리 응답·느린 클라이언트 대기 등 I/O를 겹치는 용도.
+  NABIS_METRICS_DIR  워커 지표 스냅샷 디렉터리 (기본 임시 디렉터리 nabis-metrics-<마스터 pid>).
+                 NABIS_METRICS=1일 때 /metrics가 모든 워커 스냅샷을 합산한다. 시작할 때 이전 스냅샷을 지운다.
+"""
+
+import glob
+import multiprocessing
+import os
+import tempfile
+
+bind = os.environ.get("NABIS_BIND", "0.0.0.0:8050")
+workers = int(os.environ.get("NABIS_WORKERS", multiprocessing.cpu_count()))
+threads = int(os.environ.get("NABIS_THREADS", "4"))
+worker_class = "gthread"
+
+# 마스터에서 app을 1회 import한 뒤 fork (wsgi.py: 데이터 로딩 + gc.freeze)
+preload_app = True
+
+timeout = 60
+graceful_timeout = 30
+keepalive = 5
+accesslog = os.environ.get("NABIS_ACCESS_LOG")  # 예: "-" (표준 출력)
+
+# 워커 간 지표 합산 (metrics.py): app import 전에 지정해야 하므로 설정 파일에서 정한다
+os.environ.setdefault("NABIS_METRICS_DIR", os.path.join(tempfile.gettempdir(), f"nabis-metrics-{os.getpid()}"))
+
+
+def on_starting(server):
+    # 이전 실행의 워커 스냅샷이 합산되지 않도록 (디렉터리는 preload한 app이 이미 만들었을 수 있어 파일만 지운다)
+    for path in glob.glob(os.path.join(os.environ["NABIS_METRICS_DIR"], "*.json")):
+        os.remove(path)
+
+
+def child_exit(server, worker):
+    import metrics
+
+    metrics.mark_process_dead(worker.pid)
@@ -0,0 +1,331 @@
+"""지표 큐브: indicators_long 데이터를 지표 × 년도 × 지역 밀집 배열로 색인.
+
+콜백마다 56k행 DataFrame 전체를 문자열 비교 마스크로 스캔하는 대신,
+로딩 시 1회 지역·지표·년도에 정수 코드를 부여하고 NumPy 배열 슬라이스로 조회한다.
+
+번들 형식 (build_indicator_store.py가 생성, save/load):
+  <dir>/meta.json  축 라벨 (지표·년도·시군구·시도·단위·기준년도 문자열)
+  <dir>/*.npy      배열별 .npy (float32 값, bool 존재 여부, int16 기준년도 코드, 순위·백분위·5분위)
+.npy는 mmap으로 열리므로 파싱 비용이 없고, 여러 워커 프로세스가 같은 페이지 캐시를 공유한다.
+"""
+
+import json
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from region_index import normalize_csv_regions, region_key
+
+KEY_COLS = ["sido", "sigungu", "publish_year", "indicator_name"]
+VALUE_DTYPE = np.float32
+ARRAYS = ["local", "national", "present", "reference", "sido", "sido_present"]
+# local에서 파생: 번들에 함께 저장하고, 없으면 (이전 번들·CSV) 로딩 시 계산
+RANK_ARRAYS = ["rank", "percentile", "quintile"]
+
+
+def read_indicators_csv(path):
+    """indicators_long.csv 로딩 + CSV/GeoJSON 간 지역명 불일치 보정 (region_index 규칙)."""
+    return normalize_csv_regions(pd.read_csv(path))
+
+
+def _label_reference_year(values):
+    """기준년도 표시 문자열 (예: '2023년' → '2023'). 결측·'-'은 None."""
+    labels = values.astype(str).str.rstrip("년")
+    return labels.where(values.notna() & (values != "-"))
+
+
+def rank_arrays(values):
+    """(..., R) 값 → 마지막 축(지역) 기준 순위·백분위·5분위 (전체를 한 번에 정렬, 행별 반복 없음).
+
+    rank        1 = 최댓값, 동점은 같은 (가장 높은) 순위, 결측 0 (int16)
+    percentile  (n - rank) / (n - 1) × 100: 최댓값 100, 최솟값 0, 결측 NaN (float32)
+    quintile    1–5 (5 = 상위 20%), 결측 0 (int8)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    valid = ~np.isnan(values)
+    n = valid.sum(axis=-1, keepdims=True)
+    keyed = np.where(valid, -values, np.inf)
+    order = np.argsort(keyed, axis=-1, kind="stable")
+    ordered = np.take_along_axis(keyed, order, axis=-1)
+    # 정렬 위치 → 동점 묶음의 첫 위치 (누적 최대)
+    starts = np.ones(values.shape, dtype=bool)
+    starts[..., 1:] = ordered[..., 1:] != ordered[..., :-1]
+    positions = np.broadcast_to(np.arange(values.shape[-1]), values.shape)
+    ranked = np.maximum.accumulate(np.where(starts, positions, 0), axis=-1) + 1
+
+    rank = np.zeros(values.shape, dtype=np.int16)
+    np.put_along_axis(rank, order, ranked.astype(np.int16), axis=-1)
+    rank[~valid] = 0
+    percentile = np.where(valid, 100 * (n - rank) / np.maximum(n - 1, 1), np.nan).astype(VALUE_DTYPE)
+    quintile = np.where(valid, 5 - (rank - 1) * 5 // np.maximum(n, 1), 0).astype(np.int8)
+    return {"rank": rank, "percentile": percentile, "quintile": quintile}
+
+
+def change_values(base, target):
+    """기준년도·비교년도 값 (..., R) → 증감 target - base와 기준값 대비 증감률(%).
+
+    어느 한쪽이 결측이면 둘 다 NaN, 기준값이 0이면 delta_pct만 NaN (증감률 정의 불가).
+    결측 사유는 change_missing으로 센다.
+    """
+    base = np.asarray(base, dtype=VALUE_DTYPE)
+    delta = np.asarray(target, dtype=VALUE_DTYPE) - base
+    with np.errstate(divide="ignore", invalid="ignore"):
+        delta_pct = np.where(base != 0, delta / np.abs(base) * 100, np.nan).astype(VALUE_DTYPE)
+    return {"delta": delta, "delta_pct": delta_pct}
+
+
+def change_missing(base, target):
+    """기준년도·비교년도 값 (R,) → 비교할 수 없는 시군구 수 {기준년도 결측, 비교년도 결측, 기준값 0}."""
+    base_missing = np.isnan(base)
+    target_missing = np.isnan(target) & ~base_missing
+    return {
+        "base": int(base_missing.sum()),
+        "target": int(target_missing.sum()),
+        "zero": int(((base == 0) & ~target_missing).sum()),
+    }
+
+
+# 지표 상관계수를 계산할 최소 공통 시군구 수, 유사 시군구 목록 길이
+MIN_PAIRS = 10
+SIMILAR_K = 10
+
+
+def _standardize(matrix):
+    """(R, I) → 열(지표)별 z-점수 (결측 NaN 유지). 값이 모두 같거나 없는 지표는 전부 NaN."""
+    with np.errstate(invalid="ignore", divide="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # 빈 열의 nanmean/nanstd
+        mean = np.nanmean(matrix, axis=0)
+        std = np.nanstd(matrix, axis=0)
+        return np.where(std > 0, (matrix - mean) / std, np.nan)
+
+
+def correlation_matrix(matrix):
+    """(R, I) 시군구 × 지표 → 지표 간 피어슨 상관 (I, I)과 쌍별 공통 시군구 수 (I, I).
+
+    결측은 쌍별로 제외한다 (pandas DataFrame.corr와 같은 pairwise-complete). 지표 쌍마다 반복하지 않고
+    존재 마스크 M과 0으로 채운 값 X의 행렬곱 (Mᵀ M, Xᵀ M, Xᵀ X)으로 합계를 한 번에 구한다.
+    공통 시군구가 MIN_PAIRS 미만이거나 분산이 0이면 NaN.
+    """
+    z = _standardize(np.asarray(matrix, dtype=np.float64))  # 상관은 척도와 무관 — 큰 값의 자릿수 손실 방지
+    valid = ~np.isnan(z)
+    m = valid.astype(np.float64)
+    x = np.where(valid, z, 0.0)
+    n = m.T @ m
+    sx = x.T @ m  # sx[a, b] = a, b가 모두 있는 시군구의 x_a 합
+    sxx = (x * x).T @ m
+    cov = n * (x.T @ x) - sx * sx.T
+    var = (n * sxx - sx * sx) * (n * sxx.T - sx.T * sx.T)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        corr = np.clip(cov / np.sqrt(var), -1, 1)
+    corr = np.where((n >= MIN_PAIRS) & (var > 0), corr, np.nan)
+    return corr.astype(VALUE_DTYPE), n.astype(np.int32)
+
+
+def similar_regions(matrix, k=SIMILAR_K):
+    """(R, I) 시군구 × 지표 → 시군구별 가장 비슷한 시군구 k곳 (자기 자신 제외).
+
+    거리는 지표별 z-점수 차이의 제곱평균제곱근(RMS)으로, 두 시군구에 모두 값이 있는 지표만 쓴다.
+    전체 (R, R) 거리를 행렬곱으로 한 번에 구하며, 공통 지표가 값이 있는 지표의 절반 미만인 쌍은 제외한다.
+    반환: neighbours (R, k) 시군구 번호 (-1 = 없음), distance (R, k), shared (R, k) 공통 지표 수.
+    """
+    z = _standardize(np.asarray(matrix, dtype=np.float64))
+    valid = ~np.isnan(z)
+    m = valid.astype(np.float64)
+    x = np.where(valid, z, 0.0)
+    shared = m @ m.T
+    sq = (x * x) @ m.T  # sq[a, b] = b에도 값이 있는 지표의 z_a² 합
+    d2 = np.maximum(sq + sq.T - 2 * (x @ x.T), 0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        distance = np.sqrt(d2 / shared)
+    usable = valid.any(axis=0).sum()
+    distance[(shared < max(usable / 2, 1)) | np.eye(len(z), dtype=bool)] = np.inf
+
+    k = min(k, max(len(z) - 1, 0))
+    order = np.argsort(distance, axis=1, kind="stable")[:, :k]
+    nearest = np.take_along_axis(distance, order, axis=1)
+    found = np.isfinite(nearest)
+    return {
+        "neighbours": np.where(found, order, -1).astype(np.int32),
+        "distance": np.where(found, nearest, np.nan).astype(VALUE_DTYPE),
+        "shared": np.where(found, np.take_along_axis(shared, order, axis=1), 0).astype(np.int16),
+    }
+
+
+class IndicatorCube:
+    """지표 × 년도 × 지역 밀집 배열 저장소.
+
+    시군구 축 (r):
+      - local[i, y, r]     지자체값
+      - national[i, y, r]  같은 행의 전국값
+      - present[i, y, r]   해당 행 존재 여부
+      - reference[i, y, r] 기준년도 코드 (reference_labels 인덱스, -1 = 없음)
+      - rank[i, y, r]       전국 시군구 중 지자체값 순위 (1 = 최댓값, 0 = 결측), rank_arrays
+      - percentile[i, y, r] 백분위 (0–100), quintile[i, y, r] 5분위 (1–5, 0 = 결측)
+    년도 a → b 증감·증감률은 change(i, a, b)로 요청 시 계산한다 (시군구 수만큼 뺄셈 1회).
+    모든 년도 쌍 배열 (I × Y × Y × R)은 년도 수의 제곱으로 커지므로 만들어 두지 않는다.
+    년도별 분석 (analysis(y), 처음 요청될 때 계산해 analyses에 보관):
+      - corr[a, b], pairs[a, b]  지표 간 상관계수·공통 시군구 수 (correlation_matrix)
+      - neighbours/distance/shared[r, k]  시군구별 비슷한 시군구 (similar_regions)
+    시도 축 (s):
+      - sido[i, y, s]         시도 지자체값 (region_type == "시도")
+      - sido_present[i, y, s] 해당 행 존재 여부
+    """
+
+    def __init__(self, indicators, years, regions, sidos, units, reference_labels,
+                 local, national, present, reference, sido, sido_present,
+                 rank=None, percentile=None, quintile=None):
+        self.indicators = list(indicators)
+        self.years = list(years)
+        self.regions = list(regions)  # [(sido, sigungu), ...]
+        self.sidos = list(sidos)
+        self.units = list(units)
+        self.reference_labels = list(reference_labels)
+
+        self.local = local
+        self.national = national
+        self.present = present
+        self.reference = reference
+        self.sido = sido
+        self.sido_present = sido_present
+        if rank is None or percentile is None or quintile is None:
+            derived = rank_arrays(local)
+            rank, percentile, quintile = derived["rank"], derived["percentile"], derived["quintile"]
+        self.rank = rank
+        self.percentile = percentile
+        self.quintile = quintile
+        # (i, y)별 순위가 있는 시군구 수
+        self.ranked = (np.asarray(rank) > 0).sum(axis=-1)
+        self.analyses = {}  # y → analysis(y) 결과
+
+        self.indicator_index = {name: i for i, name in enumerate(self.indicators)}
+        self.year_index = {year: y for y, year in enumerate(self.years)}
+        self.region_index = {region: r for r, region in enumerate(self.regions)}
+        self.sido_index = {name: s for s, name in enumerate(self.sidos)}
+
+        # 동명 시군구 대응: sido+sigungu 복합키 (GeoJSON csv_sido_sigungu와 동일)
+        self.region_keys = [region_key(sd, sgg) for sd, sgg in self.regions]
+        self.region_sido = np.array([self.sido_index[sd] for sd, _ in self.regions], dtype=np.int32)
+
+    @classmethod
+    def from_frame(cls, df, indicators=None, regions=None):
+        """long-format DataFrame으로부터 큐브를 생성한다.
+
+        indicators를 주면 해당 순서(지표 카탈로그 순)로 지표 축을 구성한다.
+        regions(RegionIndex.regions)를 주면 시군구 축을 그 순서로 고정하고,
+        색인에 없는 시군구 행이 있으면 키 목록과 함께 ValueError를 낸다.
+        동일 키의 중복 행은 첫 행을 사용한다.
+        """
+        years = sorted(int(y) for y in df["publish_year"].unique())
+        if indicators is None:
+            indicators = sorted(df["indicator_name"].unique())
+        indicators = list(indicators)
+
+        sgg = df[df["region_type"] == "시군구"].drop_duplicates(KEY_COLS)
+        sd = df[df["region_type"] == "시도"].drop_duplicates(KEY_COLS[:1] + KEY_COLS[2:])
+
+        if regions is None:
+            regions = sorted(set(zip(sgg["sido"], sgg["sigungu"])))
+        else:
+            regions = [tuple(region) for region in regions]
+            known = {region_key(sd, sgg_name) for sd, sgg_name in regions}
+            unmatched = sorted(set(sgg["sido"] + " " + sgg["sigungu"]) - known)
+            if unmatched:
+                raise ValueError(f"GeoJSON에 없는 시군구 {len(unmatched)}개: {unmatched}")
+        sidos = sorted(set(sd["sido"]) | {s for s, _ in regions})
+
+        # 단위: 지표별 첫 유효값
+        units_by_name = df.dropna(subset=["unit"]).drop_duplicates("indicator_name").set_index("indicator_name")["unit"]
+        units = [units_by_name.get(name, "") for name in indicators]
+
+        ref = _label_reference_year(sgg["reference_year"])
+        reference_labels = sorted(ref.dropna().unique())
+
+        shape = (len(indicators), len(years))
+        local = np.full(shape + (len(regions),), np.nan, dtype=VALUE_DTYPE)
+        national = np.full(shape + (len(regions),), np.nan, dtype=VALUE_DTYPE)
+        present = np.zeros(shape + (len(regions),), dtype=bool)
+        reference = np.full(shape + (len(regions),), -1, dtype=np.int16)
+        sido = np.full(shape + (len(sidos),), np.nan, dtype=VALUE_DTYPE)
+        sido_present = np.zeros(shape + (len(sidos),), dtype=bool)
+
+        # 정수 코드 변환 (카탈로그 밖 지표는 -1 → 제외)
+        i = pd.Categorical(sgg["indicator_name"], categories=indicators).codes
+        y = pd.Categorical(sgg["publish_year"], categories=years).codes
+        r = pd.Categorical(sgg["sido"] + " " + sgg["sigungu"], categories=[region_key(a, b) for a, b in regions]).codes
+        ok = i >= 0
+        idx = (i[ok], y[ok], r[ok])
+        local[idx] = sgg["local_value"].to_numpy(dtype=float)[ok]
+        national[idx] = sgg["national_value"].to_numpy(dtype=float)[ok]
+        present[idx] = True
+        reference[idx] = pd.Categorical(ref, categories=reference_labels).codes[ok]
+
+        i = pd.Categorical(sd["indicator_name"], categories=indicators).codes
+        y = pd.Categorical(sd["publish_year"], categories=years).codes
+        s = pd.Categorical(sd["sido"], categories=sidos).codes
+        ok = i >= 0
+        idx = (i[ok], y[ok], s[ok])
+        sido[idx] = sd["local_value"].to_numpy(dtype=float)[ok]
+        sido_present[idx] = True
+
+        return cls(indicators, years, regions, sidos, units, reference_labels,
+                   local, national, present, reference, sido, sido_present)
+
+    def save(self, path):
+        """번들 디렉터리로 저장 (meta.json + 배열별 .npy)."""
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        for name in ARRAYS + RANK_ARRAYS:
+            np.save(path / f"{name}.npy", np.ascontiguousarray(getattr(self, name)))
+        meta = {
+            "indicators": self.indicators,
+            "years": self.years,
+            "regions": [list(region) for region in self.regions],
+            "sidos": self.sidos,
+            "units": self.units,
+            "reference_labels": self.reference_labels,
+        }
+        with open(path / "meta.json", "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        """번들 디렉터리 로딩. mmap=True면 배열을 읽기 전용 메모리 맵으로 연다."""
+        path = Path(path)
+        with open(path / "meta.json", encoding="utf-8") as f:
+            meta = json.load(f)
+        arrays = {
+            name: np.load(path / f"{name}.npy", mmap_mode="r" if mmap else None)
+            for name in ARRAYS + RANK_ARRAYS
+            if name in ARRAYS or (path / f"{name}.npy").exists()
+        }
+        return cls(
+            meta["indicators"], meta["years"], [tuple(region) for region in meta["regions"]],
+            meta["sidos"], meta["units"], meta["reference_labels"], **arrays,
+        )
+
+    def locate(self, indicator, year):
+        """(지표, 년도) → (i, y) 정수 코드. 없으면 None."""
+        i = self.indicator_index.get(indicator)
+        y = self.year_index.get(year)
+        if i is None or y is None:
+            return None
+        return i, y
+
+    def change(self, i, base, y):
+        """지표 i의 년도 base → y 시군구별 증감·증감률 (change_values). 완성된 지도 응답은 앱이 캐시한다."""
+        return change_values(self.local[i, base], self.local[i, y])
+
+    def analysis(self, y):
+        """년도 y의 시군구 × 지표 행렬로 계산한 지표 상관행렬·유사 시군구 (년도별 1회 계산)."""
+        found = self.analyses.get(y)
+        if found is None:
+            matrix = np.asarray(self.local[:, y, :]).T
+            corr, pairs = correlation_matrix(matrix)
+            found = self.analyses[y] = {"corr": corr, "pairs": pairs, **similar_regions(matrix)}
+        return found
+
+    def reference_label(self, i, y, r):
+        code = self.reference[i, y, r]
+        return self.reference_labels[code] if code >= 0 else None
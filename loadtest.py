@@ -0,0 +1,305 @@
+"""동시 사용자 부하 테스트: /_dash-update-component에 실제 사용 흐름을 재생한다.
+
+app.py의 Flask 서버를 같은 프로세스의 로컬 스레드 서버로 띄우고 (외부 서비스 없음),
+가상 사용자(스레드)마다 세션을 반복한다.
+  지표 선택 → 년도 변경 몇 차례 → 시도 간 호버 → 확대/이동 → 지역 클릭 → 시도 드릴다운 (년도 변경 후 전국 복귀)
+콜백 목록은 /_dash-dependencies에서 읽고 서버 콜백만 호출한다
+(clientside 호버 모드에서는 호버 강조가 서버로 오지 않으므로 해당 단계는 요청이 없다).
+
+사용자 수 단계별로 콜백마다 p50/p95/p99 지연, 처리량(req/s), 오류율을 출력한다.
+
+예:
+  python loadtest.py --users 1,10,50 --duration 20
+  NABIS_HOVER_MODE=server python loadtest.py --data-dir datasets/synthetic
+  python loadtest.py --url http://127.0.0.1:8050   # 이미 실행 중인 서버 (gunicorn 등) 대상
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import numpy as np
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--users", default="1,10,50", help="동시 사용자 수 단계 (쉼표 구분)")
+parser.add_argument("--duration", type=float, default=15, help="단계별 측정 시간 (초)")
+parser.add_argument("--think", type=float, default=0.0, help="사용자 동작 간 대기 (초)")
+parser.add_argument("--data-dir", type=Path, help="NABIS_DATA_DIR (로컬 서버 모드)")
+parser.add_argument("--url", help="이미 실행 중인 서버 주소. 없으면 app을 로컬 스레드 서버로 띄운다")
+parser.add_argument("--seed", type=int, default=0)
+parser.add_argument("--output", type=Path, help="결과 JSON 저장 경로")
+args = parser.parse_args()
+
+
+# ─── 서버 ───────────────────────────────────────────────────────────
+
+def start_local_server():
+    """app.server를 werkzeug 멀티스레드 서버로 띄우고 주소를 돌려준다 (HTTP/1.1 keep-alive)."""
+    if args.data_dir:
+        os.environ["NABIS_DATA_DIR"] = str(args.data_dir)
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    import app as dashboard
+
+    class KeepAliveHandler(WSGIRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_request(self, *_):
+            pass
+
+    server = make_server("127.0.0.1", 0, dashboard.app.server, threaded=True, request_handler=KeepAliveHandler)
+    threading.Thread(target=server.serve_forever, name="loadtest-server", daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}"
+
+
+class Client:
+    """스레드별 keep-alive 연결. 연결이 끊기면 한 번 재연결한다."""
+
+    def __init__(self, base_url):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.prefix = parts.path.rstrip("/")
+        self.conn = None
+
+    def request(self, method, path, body=None):
+        payload = None if body is None else json.dumps(body, ensure_ascii=False).encode("utf-8")
+        headers = {"Content-Type": "application/json"} if payload is not None else {}
+        for attempt in range(2):
+            if self.conn is None:
+                self.conn = http.client.HTTPConnection(self.host, self.port, timeout=60)
+            try:
+                self.conn.request(method, self.prefix + path, body=payload, headers=headers)
+                response = self.conn.getresponse()
+                return response.status, response.read()
+            except (http.client.HTTPException, ConnectionError):
+                self.conn.close()
+                self.conn = None
+                if attempt:
+                    raise
+
+
+# ─── 콜백 요청 ──────────────────────────────────────────────────────
+
+def parse_outputs(output):
+    """'a.b' 또는 '..a.b...c.d..' → [{'id', 'property'}, ...] (allow_duplicate의 '@해시' 포함)."""
+    parts = output[2:-2].split("...") if output.startswith("..") else [output]
+    return [dict(zip(("id", "property"), part.split(".", 1))) for part in parts]
+
+
+class Callback:
+    """/_dash-dependencies의 서버 콜백 하나 → /_dash-update-component 요청 본문 생성기."""
+
+    def __init__(self, name, dep):
+        self.name = name
+        self.dep = dep
+        outputs = parse_outputs(dep["output"])
+        self.outputs = outputs if dep["output"].startswith("..") else outputs[0]
+
+    def body(self, values, changed):
+        def fill(items):
+            return [{**item, "value": values.get(f"{item['id']}.{item['property']}")} for item in items]
+
+        return {
+            "output": self.dep["output"],
+            "outputs": self.outputs,
+            "inputs": fill(self.dep["inputs"]),
+            "changedPropIds": [changed],
+            "state": fill(self.dep.get("state", [])),
+        }
+
+
+def discover_callbacks(client):
+    """첫 번째 입력 속성으로 서버 콜백을 식별한다 (출력 이름은 allow_duplicate 해시가 붙어 바뀔 수 있음).
+
+    년도·지도 클릭처럼 여러 콜백이 함께 받는 입력이 있으므로 첫 번째 입력만 본다."""
+    status, body = client.request("GET", "/_dash-dependencies")
+    if status != 200:
+        raise SystemExit(f"✗ /_dash-dependencies 응답 {status}")
+    by_input = {
+        "year-select.value": "update_map",
+        "map-view.data": "update_map_detail",
+        "sido-select.value": "update_drill",
+        "hover-sido.data": "highlight_sido_on_hover",
+        "choropleth-map.clickData": "update_sidebar",
+        "analysis-open.data": "update_correlation",
+        "indicator-select.value": "update_similar",
+        "region-search.search_value": "search_regions",
+        "region-search.value": "choose_region",
+    }
+    callbacks = {}
+    for dep in json.loads(body):
+        if dep.get("clientside_function") or dep.get("no_output"):
+            continue
+        first = dep["inputs"][0]
+        name = by_input.get(f"{first['id']}.{first['property']}")
+        if name:
+            callbacks[name] = Callback(name, dep)
+    return callbacks
+
+
+def discover_choices(client):
+    """레이아웃에서 년도·지표 옵션, 기본 Figure에서 지역(customdata)을 읽는다."""
+    status, body = client.request("GET", "/_dash-layout")
+    if status != 200:
+        raise SystemExit(f"✗ /_dash-layout 응답 {status}")
+    found = {}
+
+    def walk(node):
+        if isinstance(node, dict):
+            props = node.get("props", {})
+            if props.get("id") in ("year-select", "indicator-select"):
+                found[props["id"]] = [opt["value"] for opt in props["options"]]
+            elif props.get("id") == "choropleth-map":
+                found["regions"] = props["figure"]["data"][0]["customdata"]
+            for value in (props.values() if props else node.values()):
+                walk(value)
+        elif isinstance(node, list):
+            for value in node:
+                walk(value)
+
+    walk(json.loads(body))
+    return found["year-select"], found["indicator-select"], found["regions"]
+
+
+# ─── 세션 재생 ──────────────────────────────────────────────────────
+
+class Recorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latency = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def add(self, name, ms, ok):
+        with self.lock:
+            self.latency[name].append(ms)
+            if not ok:
+                self.errors[name] += 1
+
+
+def run_user(client, callbacks, choices, recorder, stop, rng):
+    years, indicators, regions = choices
+    sidos = sorted({sido for sido, _ in regions})
+
+    def call(name, values, changed):
+        callback = callbacks.get(name)
+        if callback is None:
+            return
+        t = time.perf_counter()
+        try:
+            status, _ = client.request("POST", "/_dash-update-component", callback.body(values, changed))
+            ok = status in (200, 204)
+        except (OSError, http.client.HTTPException):
+            ok = False
+        recorder.add(name, (time.perf_counter() - t) * 1e3, ok)
+        if args.think:
+            time.sleep(args.think)
+
+    while not stop.is_set():
+        # 1. 지표 선택
+        indicator = rng.choice(indicators)
+        year = years[0]
+        call("update_map", {"year-select.value": year, "indicator-select.value": indicator}, "indicator-select.value")
+        # 2. 년도 변경
+        for year in rng.sample(years, min(3, len(years))):
+            call("update_map", {"year-select.value": year, "indicator-select.value": indicator}, "year-select.value")
+        # 2-1. 증감 지도에서 비교 년도 변경
+        change = {"year-select.value": year, "indicator-select.value": indicator, "map-mode.value": "change"}
+        for base in rng.sample(years, min(2, len(years))):
+            call("update_map", {**change, "base-year.value": base}, "base-year.value")
+        # 3. 시도 간 호버 (마지막은 지도 밖으로 나감)
+        for sido in rng.sample(sidos, min(5, len(sidos))) + [None]:
+            call("highlight_sido_on_hover", {"hover-sido.data": sido}, "hover-sido.data")
+        # 4. 확대/이동 (줌 단계 교체)
+        lon, lat = rng.uniform(126.5, 129.0), rng.uniform(35.0, 37.8)
+        view = {"zoom": rng.choice([6, 8, 9]), "bounds": [lon - 0.75, lat - 0.5, lon + 0.75, lat + 0.5]}
+        call("update_map_detail", {"map-view.data": view, "map-lod.data": [0]}, "map-view.data")
+        # 5. 지역 클릭
+        for sido, sigungu in rng.sample(regions, 3):
+            call("update_sidebar", {
+                "choropleth-map.clickData": {"points": [{"customdata": [sido, sigungu]}]},
+                "year-select.value": year,
+                "indicator-select.value": indicator,
+            }, "choropleth-map.clickData")
+        # 6. 시도 드릴다운 → 드릴다운 중 년도 변경 → 전국 복귀
+        drill = {"year-select.value": year, "indicator-select.value": indicator, "sido-select.value": sido}
+        call("update_drill", drill, "sido-select.value")
+        call("update_map", {**drill, "year-select.value": rng.choice(years)}, "year-select.value")
+        call("update_drill", {**drill, "sido-select.value": None}, "sido-select.value")
+        # 7. 지역 검색: 한 글자씩 입력 → 결과 선택 (드릴다운 + 사이드바)
+        target_sido, target = rng.choice(regions)
+        for end in range(1, len(target) + 1):
+            call("search_regions", {"region-search.search_value": target[:end]}, "region-search.search_value")
+        call("choose_region", {
+            "region-search.value": f"{target_sido} {target}", "sido-select.value": sido,
+        }, "region-search.value")
+        # 8. 분석 패널: 열기 (히트맵 + 목록) → 다른 지역 클릭 (목록만)
+        analysis = {**drill, "analysis-open.data": True}
+        call("update_correlation", analysis, "analysis-open.data")
+        for sido, sigungu in rng.sample(regions, 2):
+            call("update_similar", {
+                **analysis, "choropleth-map.clickData": {"points": [{"customdata": [sido, sigungu]}]},
+            }, "choropleth-map.clickData")
+
+
+def run_stage(base_url, users, callbacks, choices):
+    recorder = Recorder()
+    stop = threading.Event()
+    threads = [
+        threading.Thread(
+            target=run_user,
+            args=(Client(base_url), callbacks, choices, recorder, stop, random.Random(args.seed + k)),
+            daemon=True,
+        )
+        for k in range(users)
+    ]
+    t0 = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    time.sleep(args.duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - t0
+
+    report = {}
+    for name, values in sorted(recorder.latency.items()):
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        report[name] = {
+            "requests": len(values),
+            "rps": len(values) / elapsed,
+            "p50_ms": float(p50),
+            "p95_ms": float(p95),
+            "p99_ms": float(p99),
+            "error_rate": recorder.errors[name] / len(values),
+        }
+    return elapsed, report
+
+
+base_url = args.url or start_local_server()
+probe = Client(base_url)
+callbacks = discover_callbacks(probe)
+choices = discover_choices(probe)
+print(f"대상: {base_url}  서버 콜백: {', '.join(callbacks)}")
+
+results = {}
+for users in (int(n) for n in args.users.split(",")):
+    elapsed, report = run_stage(base_url, users, callbacks, choices)
+    results[users] = report
+    total = sum(r["requests"] for r in report.values())
+    errors = sum(r["error_rate"] * r["requests"] for r in report.values())
+    print(f"\n사용자 {users}명 · {elapsed:.1f}s · {total / elapsed:.1f} req/s · 오류 {errors / max(total, 1):.2%}")
+    print(f"{'콜백':<26}{'요청':>8}{'req/s':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'오류율':>9}")
+    for name, r in report.items():
+        print(f"{name:<26}{r['requests']:>8}{r['rps']:>9.1f}{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}"
+              f"{r['p99_ms']:>10.1f}{r['error_rate']:>9.2%}")
+
+if args.output:
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"url": base_url, "duration": args.duration, "results": results}, f, ensure_ascii=False, indent=2)
@@ -0,0 +1,365 @@
+"""콜백 계측: 단계별 시간, 응답 크기, 캐시 적중률 → /metrics (Prometheus 텍스트 형식) + 느린 콜백 로그.
+
+NABIS_METRICS=1(/metrics 노출) 또는 NABIS_SLOW_CALLBACK_MS(느린 콜백 로그)를 지정했을 때만 동작한다.
+꺼져 있으면 instrument()는 원래 함수를 그대로 돌려주고
+phase()는 공유 no-op 컨텍스트를 돌려주므로 콜백 경로에 추가 비용이 사실상 없다.
+
+측정 구조 (요청 1건 = Flask 스레드 1개):
+  /_dash-update-component 요청 ─┬─ 콜백 함수 (instrument)  ─┬─ phase("lookup")  큐브 조회
+                                │                          └─ phase("figure")  Figure/Patch 구성
+                                └─ 나머지 = "serialize"    Dash 디스패치 + JSON 직렬화
+  네트워크 구간은 서버에서 보이지 않으므로 응답 크기(bytes)로 가늠한다.
+
+지표:
+  nabis_callback_seconds{callback}          콜백 함수 실행 시간 (히스토그램)
+  nabis_callback_phase_seconds{callback,phase}  단계별 시간 (히스토그램)
+  nabis_request_seconds{callback}           요청 전체 시간 (히스토그램)
+  nabis_response_bytes{callback}            응답 본문 크기, 압축 전 JSON (히스토그램)
+  nabis_callback_errors_total{callback}     예외 수
+  nabis_cache_*{cache}                      FigureCache 항목·바이트·적중·미스·축출·적중률
+
+멀티 워커 (gunicorn): 지표는 워커 프로세스마다 따로 쌓이므로, NABIS_METRICS_DIR을 지정하면 (gunicorn.conf.py가 기본값 지정)
+워커마다 FLUSH_SECONDS마다 스냅샷을 <dir>/<pid>.json으로 쓰고 /metrics는 모든 워커 파일을 합산해 응답한다
+(prometheus_client multiprocess 방식). 어느 워커가 스크레이프를 받아도 같은 전체 합계이며 카운터가 줄지 않는다.
+종료된 워커의 파일은 남겨 누적 카운터·히스토그램을 유지하고, 캐시 항목·바이트 게이지만 뺀다 (mark_process_dead).
+"""
+
+import atexit
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from contextlib import nullcontext
+
+from flask import Response, g, request
+
+EXPOSE = os.environ.get("NABIS_METRICS", "0") == "1"
+# 요청 전체 시간이 이 값(ms)을 넘으면 단계별 시간과 함께 로그 (0 = 끔)
+SLOW_MS = float(os.environ.get("NABIS_SLOW_CALLBACK_MS", "0"))
+ENABLED = EXPOSE or SLOW_MS > 0
+# 워커 간 합산용 공유 디렉터리 (/metrics 노출 시에만, 없으면 프로세스 내 지표만)
+MULTIPROCESS_DIR = (os.environ.get("NABIS_METRICS_DIR") or None) if EXPOSE else None
+# 워커 스냅샷 주기 (초): 다른 워커의 지표는 최대 이만큼 늦게 합산된다
+FLUSH_SECONDS = 1.0
+
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+BYTES_BUCKETS = (1e3, 1e4, 1e5, 1e6, 1e7)
+
+logger = logging.getLogger("nabis.metrics")
+_NOOP = nullcontext()
+_local = threading.local()
+
+
+class Histogram:
+    """누적 버킷 히스토그램 (Prometheus histogram)."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 마지막 = +Inf
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+
+# FigureCache.stats() 중 워커 간 합산할 값 (hit_rate는 합산한 적중·미스로 다시 계산)
+CACHE_GAUGES = ("entries", "bytes", "max_bytes")
+CACHE_COUNTERS = ("hits", "misses", "evictions")
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}  # (name, labels) → Histogram
+        self._counters = defaultdict(int)  # (name, labels) → int
+        self.caches = []
+        self._flusher_pid = None  # 스냅샷 스레드를 시작한 프로세스 (fork 후 워커마다 다시 시작)
+
+    def observe(self, name, labels, value, buckets=SECONDS_BUCKETS):
+        self.start_flusher()
+        with self._lock:
+            histogram = self._histograms.get((name, labels))
+            if histogram is None:
+                histogram = self._histograms[name, labels] = Histogram(buckets)
+            histogram.observe(value)
+
+    def inc(self, name, labels):
+        self.start_flusher()
+        with self._lock:
+            self._counters[name, labels] += 1
+
+    def snapshot(self):
+        """이 프로세스의 지표 → JSON 직렬화 가능한 dict (워커 간 합산·렌더링 공통 형식)."""
+        with self._lock:
+            histograms = [
+                [name, labels, histogram.buckets, list(histogram.counts), histogram.sum]
+                for (name, labels), histogram in self._histograms.items()
+            ]
+            counters = [[name, labels, value] for (name, labels), value in self._counters.items()]
+        caches = {}
+        for cache in self.caches:
+            stats = cache.stats()
+            caches[cache.name] = {key: stats[key] for key in CACHE_GAUGES + CACHE_COUNTERS}
+        return {"histograms": histograms, "counters": counters, "caches": caches}
+
+    def flush(self):
+        """스냅샷을 <MULTIPROCESS_DIR>/<pid>.json으로 교체 저장 (읽는 쪽이 쓰다 만 파일을 보지 않도록 임시 파일 → rename)."""
+        _write_snapshot(_snapshot_path(os.getpid()), self.snapshot())
+
+    def start_flusher(self):
+        """워커 프로세스마다 1회: FLUSH_SECONDS마다 스냅샷을 쓰는 데몬 스레드 + 종료 시 마지막 스냅샷."""
+        if MULTIPROCESS_DIR is None:
+            return
+        pid = os.getpid()
+        if self._flusher_pid == pid:
+            return
+        with self._lock:
+            if self._flusher_pid == pid:
+                return
+            self._flusher_pid = pid
+
+        def run():
+            while True:
+                time.sleep(FLUSH_SECONDS)
+                try:
+                    self.flush()
+                except OSError as exc:
+                    logger.warning("지표 스냅샷 저장 실패 (%s): %s", MULTIPROCESS_DIR, exc)
+
+        threading.Thread(target=run, name="nabis-metrics-flush", daemon=True).start()
+        atexit.register(self.flush)
+
+    def collect(self):
+        """/metrics에 낼 스냅샷: 공유 디렉터리가 있으면 모든 워커 파일의 합, 없으면 이 프로세스 것."""
+        if MULTIPROCESS_DIR is None:
+            return self.snapshot()
+        self.flush()
+        snapshots = []
+        for entry in os.scandir(MULTIPROCESS_DIR):
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                with open(entry.path, encoding="utf-8") as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):  # 교체 중 사라진 파일 등: 다음 스크레이프에 반영
+                continue
+        return merge(snapshots)
+
+    def render(self):
+        """Prometheus 텍스트 형식."""
+        return render(self.collect())
+
+
+def _snapshot_path(pid):
+    return os.path.join(MULTIPROCESS_DIR, f"{pid}.json")
+
+
+def _write_snapshot(path, snapshot):
+    with open(f"{path}.tmp", "w", encoding="utf-8") as f:
+        json.dump(snapshot, f, ensure_ascii=False)
+    os.replace(f"{path}.tmp", path)
+
+
+def _pairs(labels):
+    """JSON에서 읽은 [[key, value], ...] → ((key, value), ...) (정렬·dict 키로 쓸 수 있게)."""
+    return tuple(tuple(pair) for pair in labels)
+
+
+def merge(snapshots):
+    """워커 스냅샷들 → 하나로 합산 (히스토그램 버킷·합계, 카운터, 캐시 값)."""
+    histograms, counters, caches = {}, defaultdict(int), {}
+    for snapshot in snapshots:
+        for name, labels, buckets, counts, total in snapshot["histograms"]:
+            key = (name, _pairs(labels))
+            merged = histograms.get(key)
+            if merged is None:
+                histograms[key] = [name, key[1], tuple(buckets), list(counts), total]
+            else:
+                merged[3] = [a + b for a, b in zip(merged[3], counts)]
+                merged[4] += total
+        for name, labels, value in snapshot["counters"]:
+            counters[name, _pairs(labels)] += value
+        for name, stats in snapshot["caches"].items():
+            merged = caches.setdefault(name, dict.fromkeys(CACHE_GAUGES + CACHE_COUNTERS, 0))
+            for key in CACHE_GAUGES + CACHE_COUNTERS:
+                merged[key] += stats.get(key, 0)
+    return {
+        "histograms": list(histograms.values()),
+        "counters": [[name, labels, value] for (name, labels), value in counters.items()],
+        "caches": caches,
+    }
+
+
+def render(snapshot):
+    """스냅샷 → Prometheus 텍스트 형식."""
+    lines = []
+    typed = set()
+    for name, labels, buckets, counts, total in sorted(snapshot["histograms"], key=lambda h: (h[0], _pairs(h[1]))):
+        labels = _pairs(labels)
+        if name not in typed:
+            lines.append(f"# TYPE {name} histogram")
+            typed.add(name)
+        cumulative = 0
+        for bound, count in zip(tuple(buckets) + ("+Inf",), counts):
+            cumulative += count
+            lines.append(f"{name}_bucket{_labels(labels + (('le', _number(bound)),))} {cumulative}")
+        lines.append(f"{name}_sum{_labels(labels)} {total!r}")
+        lines.append(f"{name}_count{_labels(labels)} {cumulative}")
+    for name, labels, value in sorted(snapshot["counters"], key=lambda c: (c[0], _pairs(c[1]))):
+        if name not in typed:
+            lines.append(f"# TYPE {name} counter")
+            typed.add(name)
+        lines.append(f"{name}{_labels(_pairs(labels))} {value}")
+
+    caches = snapshot["caches"]
+    for name, stats in caches.items():
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+    for metric, kind, key in (
+        ("nabis_cache_entries", "gauge", "entries"),
+        ("nabis_cache_bytes", "gauge", "bytes"),
+        ("nabis_cache_max_bytes", "gauge", "max_bytes"),
+        ("nabis_cache_hits_total", "counter", "hits"),
+        ("nabis_cache_misses_total", "counter", "misses"),
+        ("nabis_cache_evictions_total", "counter", "evictions"),
+        ("nabis_cache_hit_ratio", "gauge", "hit_rate"),
+    ):
+        lines.append(f"# TYPE {metric} {kind}")
+        for name, stats in caches.items():
+            lines.append(f"{metric}{_labels((('cache', name),))} {stats[key]!r}")
+    return "\n".join(lines) + "\n"
+
+
+def mark_process_dead(pid):
+    """종료된 워커 스냅샷에서 캐시 게이지(항목·바이트·상한)만 0으로 (gunicorn.conf.py child_exit).
+
+    누적 카운터·히스토그램은 남겨 합산 값이 워커 재시작 때 줄지 않게 한다.
+    """
+    if MULTIPROCESS_DIR is None:
+        return
+    path = _snapshot_path(pid)
+    try:
+        with open(path, encoding="utf-8") as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return
+    for stats in snapshot["caches"].values():
+        stats.update(dict.fromkeys(CACHE_GAUGES, 0))
+    _write_snapshot(path, snapshot)
+
+
+def _number(value):
+    return value if isinstance(value, str) else repr(float(value))
+
+
+def _labels(pairs):
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in pairs) + "}"
+
+
+registry = Registry()
+
+
+def instrument(name):
+    """콜백 함수 계측 데코레이터 (@app.callback 아래에 둔다). 비활성 시 원래 함수를 그대로 반환."""
+
+    def decorate(func):
+        if not ENABLED:
+            return func
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            _local.callback = name
+            _local.phases = {}
+            t = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except Exception:
+                registry.inc("nabis_callback_errors_total", (("callback", name),))
+                raise
+            finally:
+                elapsed = time.perf_counter() - t
+                # 단계 귀속은 실행 중에만, 요청 훅에는 마지막 콜백과 실행 시간을 넘긴다
+                _local.callback = None
+                _local.finished = (name, elapsed)
+                registry.observe("nabis_callback_seconds", (("callback", name),), elapsed)
+
+        return wrapper
+
+    return decorate
+
+
+class _Phase:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        callback = getattr(_local, "callback", None)
+        if callback is None:
+            return
+        _local.phases[self.name] = _local.phases.get(self.name, 0.0) + elapsed
+        registry.observe("nabis_callback_phase_seconds", (("callback", callback), ("phase", self.name)), elapsed)
+
+
+def phase(name):
+    """콜백 안의 단계 구간: with metrics.phase("lookup"): ... (비활성 시 no-op)."""
+    return _Phase(name) if ENABLED else _NOOP
+
+
+def init_app(server, caches=()):
+    """요청 전체 시간·응답 크기 훅과 /metrics 라우트 등록. 비활성 시 아무것도 하지 않는다."""
+    if not ENABLED:
+        return
+    registry.caches.extend(caches)
+    if MULTIPROCESS_DIR:
+        os.makedirs(MULTIPROCESS_DIR, exist_ok=True)
+
+    @server.before_request
+    def _start_timer():
+        registry.start_flusher()  # fork된 워커의 첫 요청에서 1회 시작 (이후 pid 비교만)
+        if request.path.endswith("/_dash-update-component"):
+            g.nabis_request_start = time.perf_counter()
+            _local.finished = None
+
+    @server.after_request
+    def _record_request(response):
+        start = g.pop("nabis_request_start", None)
+        finished = getattr(_local, "finished", None)
+        if start is None or finished is None:
+            return response
+        _local.finished = None
+        callback, callback_seconds = finished
+
+        total = time.perf_counter() - start
+        nbytes = response.calculate_content_length() or 0
+        labels = (("callback", callback),)
+        registry.observe("nabis_request_seconds", labels, total)
+        registry.observe("nabis_response_bytes", labels, nbytes, BYTES_BUCKETS)
+        serialize = max(total - callback_seconds, 0.0)
+        registry.observe("nabis_callback_phase_seconds", labels + (("phase", "serialize"),), serialize)
+
+        if SLOW_MS and total * 1e3 > SLOW_MS:
+            phases = ", ".join(f"{key}={value * 1e3:.1f}ms" for key, value in _local.phases.items())
+            logger.warning(
+                "slow callback %s: %.1f ms (callback %.1f ms, serialize %.1f ms%s), %d bytes",
+                callback, total * 1e3, callback_seconds * 1e3, serialize * 1e3,
+                f", {phases}" if phases else "", nbytes,
+            )
+        return response
+
+    if EXPOSE:
+        @server.route("/metrics")
+        def _metrics():
+            return Response(registry.render(), mimetype="text/plain; version=0.0.4")
@@ -0,0 +1,89 @@
+"""시도 단위 병렬 지오메트리 처리 (process_shapefile.py --jobs). 결과는 직렬 경로와 같다.
+
+  dissolve_by_sido      dissolve 그룹 키에 시도가 들어 있어 그룹이 시도를 넘지 않는다.
+                        시도별로 나눠 dissolve한 뒤 시도 순서로 이어 붙이면 직렬 dissolve와 같은 행·순서가 된다.
+  toposimplify_by_sido  위상(arc)은 전체 데이터에서 1회 구성한다 (이웃 시도의 공유 경계 = arc 하나).
+                        arc를 처음 참조하는 시도에 배정해 시도별로 나눠 단순화하므로 공유 경계는 한 번만 단순화되고
+                        양쪽 시도가 같은 결과를 쓴다. 단순화는 arc마다 독립이라 Topology.toposimplify와 같은 arc를 만들고,
+                        고리 복원(prevent_oversimplify)은 여러 arc에 걸치므로 병합 후 전체에서 직렬로 한다.
+                        Topology.toposimplify의 전체 deepcopy 대신 arc 목록만 교체한 얕은 사본을 돌려준다.
+"""
+
+import copy
+
+import numpy as np
+import pandas as pd
+from topojson.core import incremental
+from topojson.ops import arc_coordinates, bounds, compare_bounds, restore_collapsed_rings, simplify
+
+
+def _dissolve(part, by):
+    return part.dissolve(by=by, as_index=False)
+
+
+def dissolve_by_sido(gdf, by, pool):
+    """gdf.dissolve(by=by, as_index=False)와 같은 결과. by[0]이 시도 열이다."""
+    sido = by[0]
+    parts = [part for _, part in gdf.groupby(sido, sort=True)]
+    results = list(pool.map(_dissolve, parts, [by] * len(parts)))
+    return pd.concat(results, ignore_index=True)
+
+
+def _arc_refs(arcs):
+    """geometry의 중첩 arc 참조 → arc 번호 (~i는 역방향 i)."""
+    for ref in arcs:
+        if isinstance(ref, list):
+            yield from _arc_refs(ref)
+        else:
+            yield ref if ref >= 0 else ~ref
+
+
+def _simplify_arcs(arcs, epsilon, algorithm, package, prevent_oversimplify):
+    return simplify(
+        arcs, epsilon, algorithm=algorithm, package=package,
+        input_as="array", prevent_oversimplify=prevent_oversimplify,
+    )
+
+
+def arc_partitions(topo, field):
+    """arc 번호를 처음 참조하는 feature의 field(시도) 값으로 나눈 목록 (참조 없는 arc는 별도 묶음)."""
+    output = topo.output
+    owner = np.full(len(output["arcs"]), -1)
+    groups = {}
+    for geom in (g for obj in output["objects"].values() for g in obj["geometries"]):
+        group = groups.setdefault(geom["properties"][field], len(groups))
+        refs = np.fromiter(_arc_refs(geom.get("arcs", [])), np.intp)
+        unowned = refs[owner[refs] < 0]
+        owner[unowned] = group
+    parts = (np.flatnonzero(owner == group) for group in range(-1, len(groups)))
+    return [part for part in parts if len(part)]
+
+
+def toposimplify_by_sido(topo, epsilon, pool, field="SIDO_NM"):
+    """topo.toposimplify(epsilon)와 같은 arc의 Topology (prequantize=False 위상 전용)."""
+    output, options = topo.output, topo.options
+    if output.get("transform") is not None:
+        raise ValueError("양자화된 Topology는 지원하지 않습니다 (prequantize=False로 구성)")
+    original = arc_coordinates(output["arcs"])
+    parts = arc_partitions(topo, field)
+    futures = [
+        pool.submit(
+            _simplify_arcs, [original[i] for i in part], epsilon,
+            options.simplify_algorithm, options.simplify_with, options.prevent_oversimplify,
+        )
+        for part in parts
+    ]
+    arcs = [None] * len(original)
+    for part, future in zip(parts, futures):
+        for i, arc in zip(part, future.result()):
+            arcs[i] = arc
+    if options.prevent_oversimplify:
+        rings = [sequence for sequence, ring in incremental._all_sequences(output) if ring]
+        arcs = restore_collapsed_rings(arcs, original, rings)
+
+    result = copy.copy(topo)
+    result.options = copy.copy(options)
+    if not result.options.toposimplify:
+        result.options.toposimplify = epsilon
+    result.output = {**output, "arcs": arcs, "bbox": compare_bounds(bounds(arcs), bounds(output["coordinates"]))}
+    return result
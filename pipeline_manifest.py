@@ -0,0 +1,133 @@
+"""지오메트리 파이프라인 증분 빌드: 단계별 입력 해시·파라미터·출력 해시를 매니페스트에 기록한다.
+
+단계(stage)는 입력 파일 내용(SHA-256), 파라미터(허용오차, CRS 등), 출력 파일 내용이 모두 지난 실행의
+기록과 같으면 건너뛰고, 하나라도 다르면 (입력 수정, 파라미터 변경, 출력 삭제·수동 편집) 그 단계만 다시 만든다.
+앞 단계의 출력이 뒤 단계의 입력이므로, 다시 만든 결과가 이전과 내용이 같으면 뒤 단계는 그대로 건너뛴다.
+
+    manifest = Manifest(PIPELINE_DIR / "manifest.json")
+    stage = manifest.stage("sido", inputs=[SRC], params={"tolerance": 500}, outputs=[DST])
+    if stage.stale:
+        ...  # DST 생성
+        stage.done()
+
+파일 해시는 (크기, mtime_ns)가 기록과 같으면 파일을 다시 읽지 않는다 (큰 원본 Shapefile 재해시 방지).
+스크립트 코드의 변경은 추적하지 않으므로 처리 로직을 고친 뒤에는 --force로 전체를 다시 만든다.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+
+# 파이프라인 중간 산출물(재사용용)과 매니페스트 위치 (git 제외)
+PIPELINE_DIR = Path("datasets/.pipeline")
+MANIFEST = PIPELINE_DIR / "manifest.json"
+
+
+def _normalize(params):
+    """JSON 왕복으로 비교 가능한 형태 (tuple → list, Path → str)."""
+    return json.loads(json.dumps(params, ensure_ascii=False, sort_keys=True, default=str))
+
+
+class Stage:
+    """매니페스트의 한 단계. stale이면 reason에 다시 만드는 이유가 들어 있다."""
+
+    def __init__(self, manifest, name, inputs, params, outputs, reason):
+        self.manifest = manifest
+        self.name = name
+        self.inputs = inputs
+        self.params = params
+        self.outputs = outputs
+        self.reason = reason
+        self.stale = reason is not None
+
+    def done(self):
+        """출력 생성 후 호출: 입력·파라미터·출력 해시를 기록하고 매니페스트를 바로 저장 (중단해도 진행분 유지)."""
+        missing = [str(path) for path in self.outputs if not path.exists()]
+        if missing:
+            raise FileNotFoundError(f"{self.name} 단계 출력 없음: {missing}")
+        self.manifest._recorded.add(self.name)
+        self.manifest.stages[self.name] = {
+            "inputs": {str(path): self.manifest.file_hash(path) for path in self.inputs},
+            "params": self.params,
+            "outputs": {str(path): self.manifest.file_hash(path) for path in self.outputs},
+        }
+        self.stale = False
+        self.manifest.save()
+
+    def describe(self):
+        return f"{self.name}: {self.reason}" if self.stale else f"{self.name}: 최신 (건너뜀)"
+
+
+class Manifest:
+    """단계 기록 {이름: {inputs, params, outputs}} + 파일 해시 캐시 {경로: {size, mtime_ns, sha256}}."""
+
+    def __init__(self, path=MANIFEST, force=False):
+        self.path = Path(path)
+        self.force = force
+        data = self._read()
+        self.stages = data.get("stages", {})
+        self.files = data.get("files", {})
+        self._recorded = set()  # 이 인스턴스가 기록한 단계 (저장 시 이것만 덮어쓴다)
+
+    def _read(self):
+        if not self.path.exists():
+            return {}
+        with open(self.path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def file_hash(self, path):
+        path = Path(path)
+        stat = path.stat()
+        cached = self.files.get(str(path))
+        if cached and cached["size"] == stat.st_size and cached["mtime_ns"] == stat.st_mtime_ns:
+            return cached["sha256"]
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        self.files[str(path)] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": digest.hexdigest()}
+        return digest.hexdigest()
+
+    def stage(self, name, inputs, params, outputs):
+        """단계 조회 → Stage. 입력 파일은 모두 있어야 한다."""
+        inputs = [Path(path) for path in inputs]
+        outputs = [Path(path) for path in outputs]
+        params = _normalize(params)
+        return Stage(self, name, inputs, params, outputs, self._stale_reason(name, inputs, params, outputs))
+
+    def _stale_reason(self, name, inputs, params, outputs):
+        if self.force:
+            return "--force"
+        record = self.stages.get(name)
+        if record is None:
+            return "기록 없음"
+        if record["params"] != params:
+            changed = sorted(
+                key for key in record["params"].keys() | params.keys()
+                if record["params"].get(key) != params.get(key)
+            )
+            return f"파라미터 변경 ({', '.join(changed)})"
+        if sorted(record["inputs"]) != sorted(str(path) for path in inputs):
+            return "입력 목록 변경"
+        for path in inputs:
+            if record["inputs"][str(path)] != self.file_hash(path):
+                return f"입력 변경 ({path.name})"
+        if sorted(record["outputs"]) != sorted(str(path) for path in outputs):
+            return "출력 목록 변경"
+        for path in outputs:
+            if not path.exists():
+                return f"출력 없음 ({path.name})"
+            if record["outputs"][str(path)] != self.file_hash(path):
+                return f"출력 변경됨 ({path.name})"
+        return None
+
+    def save(self):
+        """디스크의 최신 매니페스트에 이 인스턴스가 기록한 단계만 반영 (같은 실행의 다른 Manifest 기록 보존)."""
+        data = self._read()
+        stages = {**data.get("stages", {}), **{name: self.stages[name] for name in self._recorded}}
+        files = {**data.get("files", {}), **self.files}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"stages": stages, "files": files}, f, ensure_ascii=False, indent=2)
+        tmp.replace(self.path)
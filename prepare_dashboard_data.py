@@ -1,47 +1,285 @@
-"""GeoJSON 전처리: EPSG:5179 → EPSG:4326 재투영 + 조인 키 추가.
+"""GeoJSON 전처리: EPSG:5179 → EPSG:4326 재투영 + 조인 키 추가 + 경량화.
 
-한 번만 실행하면 된다.
+증분 빌드: 단계마다 입력 파일 해시와 파라미터(좌표 자릿수, 허용오차, 조각 면적, CRS)를
+datasets/.pipeline/manifest.json에 기록하고 (pipeline_manifest.py), 바뀐 단계만 다시 만든다.
+예를 들어 --sido-tolerance만 바꾸면 보관해 둔 dissolve 결과로 시도 단순화만 다시 한다.
+처리 코드를 고친 뒤에는 --force로 전체를 다시 만든다.
 출력:
   - datasets/processed/geo_sgg_4326.json  (시군구 경계)
   - datasets/processed/geo_sido_4326.json (시도 외곽선)
+  - datasets/processed/geo_sgg_4326_lod*.json + geo_sido_4326_lod*.json + geo_sgg_lod.json
+    (줌 단계별 시군구 경계·시도 외곽선과 목록)
+  - datasets/processed/region_index.json  (시군구 id ↔ 시도/시군구/코드, region_index.py)
+  - datasets/processed/geo_sgg_sido.json  (시도별 드릴다운용 시군구 부분집합 + 시도 범위)
+  - (--topojson) 위 2개의 양자화 TopoJSON (*.topo.json)
+
+시군구 GeoJSON은 모든 줌 단계에서 region_index.json의 id 순서로 저장하고 feature마다 region_id를 기록한다.
+줌 단계 간 시군구 키 집합이 다르면 중단한다.
+
+줌 단계 (LOD_LEVELS): 전국 화면용 거친 단계(lod0)는 기본 단계와 같은 토폴로지를 더 단순화해 만들고,
+세밀 단계(lod2)는 process_shapefile.py가 만든 1 km 단순화본이 있을 때만 생성한다.
+시도 외곽선은 단계마다 그 단계의 시군구를 dissolve해 만든다 (따로 단순화하지 않음). 외곽선이 함께 그려지는
+시군구와 같은 정점을 쓰므로 어느 줌에서도 시군구 경계에서 벗어나지 않는다. 앱은 시군구 단계와 함께 외곽선도 바꾼다.
+시도 드릴다운 부분집합은 가장 세밀한 줌 단계를 시도별로 나눈 것이다 (한 시도만 그리므로 세밀 단계도 가볍다).
+
+경량화 옵션:
+  --precision N         좌표 소수점 자릿수 (기본 5 ≈ 1 m). 공유 경계의 정점은 양쪽에서 같은 값으로
+                        반올림되므로 이웃 폴리곤 사이에 틈이 생기지 않는다.
+  --min-part-area KM2   이 면적 미만의 조각(무인도·슬리버)은 제거 (기본 0.01 km²). 각 시군구의 가장 큰 조각은 항상 유지.
+  --sido-tolerance M    기본 단계 시도 외곽선(geo_sido_4326.json)의 추가 위상 보존 단순화 허용오차 (기본 0 = 생략).
+                        0보다 크면 파일은 작아지지만 확대 시 외곽선이 시군구 경계에서 어긋난다.
+  --topojson            양자화 TopoJSON 추가 출력 (--quantize, 기본 1e5)
+  --force               모든 단계 다시 만들기
 """
 
-import geopandas as gpd
+import argparse
+import functools
 import json
+from collections import Counter
 from pathlib import Path
 
+import geopandas as gpd
+import numpy as np
+import shapely
+import topojson as tp
+
+from pipeline_manifest import PIPELINE_DIR, Manifest
+from region_index import RegionIndex, normalize_geo_regions
+
 SRC = Path("datasets/shapefile/SGG_2025/smooth_sgg_2025.json")
+SRC_DETAIL = Path("datasets/shapefile/SGG_2025/smooth_sgg_2025_1000m.json")
 DST_SGG = Path("datasets/processed/geo_sgg_4326.json")
 DST_SIDO = Path("datasets/processed/geo_sido_4326.json")
+DST_LOD = Path("datasets/processed/geo_sgg_lod.json")
+DST_REGIONS = Path("datasets/processed/region_index.json")
+DST_DRILL = Path("datasets/processed/geo_sgg_sido.json")
+DST_SIDO_DISSOLVED = PIPELINE_DIR / "sido_dissolved_5179.gpkg"  # 중간 산출물: 단순화 전 시도 외곽선
+DST_EPSG = 4326
+# 지역명 보정 규칙: 바뀌면 조인 키·지역 색인이 달라지므로 시군구 단계의 입력으로 추적
+RULES = Path("region_index.py")
+
+# 줌 단계별 시군구 지오메트리 (거친 → 세밀). min_zoom 이상에서 해당 단계를 사용한다.
+#   tolerance: 추가 위상 보존 단순화 (m), min_part_area: 조각 최소 면적 (km², None = --min-part-area)
+#   outline: 그 단계 시군구를 dissolve한 시도 외곽선 (기본 단계는 4-5단계의 DST_SIDO)
+LOD_LEVELS = [
+    dict(src=SRC, dst=Path("datasets/processed/geo_sgg_4326_lod0.json"), tolerance=10000, min_part_area=1.0, min_zoom=0,
+         outline=Path("datasets/processed/geo_sido_4326_lod0.json")),
+    dict(src=SRC, dst=DST_SGG, tolerance=0, min_part_area=None, min_zoom=7, outline=DST_SIDO),
+    dict(src=SRC_DETAIL, dst=Path("datasets/processed/geo_sgg_4326_lod2.json"), tolerance=0, min_part_area=None, min_zoom=9,
+         outline=Path("datasets/processed/geo_sido_4326_lod2.json")),
+]
+
+parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+parser.add_argument("--precision", type=int, default=5)
+parser.add_argument("--min-part-area", type=float, default=0.01)
+parser.add_argument("--sido-tolerance", type=float, default=0)
+parser.add_argument("--topojson", action="store_true")
+parser.add_argument("--quantize", type=float, default=1e5)
+parser.add_argument("--force", action="store_true", help="매니페스트를 무시하고 모든 단계를 다시 만든다")
+args = parser.parse_args()
+
+
+def drop_small_parts(geom, min_area):
+    """min_area(m²) 미만 조각 제거. 가장 큰 조각은 항상 남긴다."""
+    parts = shapely.get_parts(geom)
+    if len(parts) <= 1:
+        return geom
+    areas = shapely.area(parts)
+    keep = parts[(areas >= min_area) | (areas == areas.max())]
+    return shapely.multipolygons(keep) if len(keep) > 1 else keep[0]
+
+
+def polygonal(geom):
+    """make_valid/dissolve 결과의 GeometryCollection에서 면 성분만 남긴다."""
+    if geom.geom_type != "GeometryCollection":
+        return geom
+    parts = [p for p in shapely.get_parts(geom) if p.geom_type in ("Polygon", "MultiPolygon")]
+    return shapely.union_all(parts)
+
+
+def dissolve_sido(gdf):
+    """시군구 → 시도 외곽선 (SIDO_NM으로 dissolve). 단순화한 시군구 정점을 그대로 쓰므로 시군구 경계와 겹친다."""
+    gdf = gdf.copy()
+    gdf["geometry"] = gdf["geometry"].make_valid()
+    sido_gdf = gdf.dissolve(by="SIDO_NM").reset_index()[["SIDO_NM", "geometry"]]
+    sido_gdf["geometry"] = sido_gdf.geometry.apply(polygonal)
+    return sido_gdf
+
+
+def count_parts(gdf):
+    return int(shapely.get_num_geometries(gdf.geometry.values).sum())
 
-# 1. 로딩 + 재투영
-gdf = gpd.read_file(SRC)
-gdf = gdf.to_crs(epsg=4326)
 
-# 2. csv_sigungu 조인 키 생성 (기본: SIGUNGU_NM 그대로)
-gdf["csv_sigungu"] = gdf["SIGUNGU_NM"]
+def build_sgg(src, min_part_area, tolerance):
+    """시군구 경계 로딩 (EPSG:5179, 미터 단위에서 면적·단순화 처리 후 재투영)."""
+    gdf = gpd.read_file(src)
 
-# 세종시 → 세종특별자치시 (CSV에는 시도 레벨 데이터만 존재)
-gdf.loc[gdf["SIGUNGU_NM"] == "세종시", "csv_sigungu"] = "세종특별자치시"
+    # 작은 조각 제거
+    if min_part_area > 0:
+        gdf["geometry"] = gdf.geometry.apply(drop_small_parts, min_area=min_part_area * 1e6)
 
-# 동명 시군구 대응: sido+sigungu 복합키 (서구, 중구, 동구 등 7종 중복)
-gdf["csv_sido_sigungu"] = gdf["SIDO_NM"] + " " + gdf["csv_sigungu"]
+    # 추가 단순화: 같은 토폴로지에서 공유 경계를 한 번만 단순화
+    if tolerance > 0:
+        topo = tp.Topology(gdf, prequantize=False, toposimplify=tolerance)
+        gdf = topo.to_gdf().set_crs(gdf.crs, allow_override=True)
 
-# 3. 시도 외곽선: 시군구를 SIDO_NM으로 dissolve
-gdf_valid = gdf.copy()
-gdf_valid["geometry"] = gdf_valid["geometry"].make_valid()
-sido_gdf = gdf_valid.dissolve(by="SIDO_NM").reset_index()
-sido_gdf.to_file(DST_SIDO, driver="GeoJSON")
+    # CSV 조인 키 (세종시 → 세종특별자치시, sido+sigungu 복합키)
+    return normalize_geo_regions(gdf)
 
-# 4. GeoJSON 저장
-gdf.to_file(DST_SGG, driver="GeoJSON")
+
+def size_mb(path):
+    return path.stat().st_size / 1e6
+
+
+manifest = Manifest(force=args.force)
+stage_params = {"precision": args.precision, "crs": f"EPSG:{DST_EPSG}"}
+
+
+@functools.cache
+def base_sgg():
+    """기본 단계 시군구 (EPSG:5179, 작은 조각 제거 + 조인 키). 다시 만들 단계가 있을 때만 1회 로딩."""
+    return build_sgg(SRC, args.min_part_area, 0)
+
+
+def run(stage):
+    print(f"  {'↻' if stage.stale else '·'} {stage.describe()}")
+    return stage.stale
+
+
+# 기존 출력 크기 (크기 비교용)
+prev_sizes = {dst: dst.stat().st_size / 1e6 for dst in (DST_SGG, DST_SIDO) if dst.exists()}
+
+# 1-3. 기본 단계 로딩 + 작은 조각 제거 + 조인 키 + 지역 색인
+# 지역 색인: 기본 단계 시군구로 id 부여 → 모든 줌 단계를 같은 id 순서로 저장
+n_parts = None
+stage = manifest.stage(
+    "sgg", inputs=[SRC, RULES], params={**stage_params, "min_part_area": args.min_part_area},
+    outputs=[DST_SGG, DST_REGIONS],
+)
+if run(stage):
+    n_parts = (count_parts(gpd.read_file(SRC)), count_parts(base_sgg()))
+    regions = RegionIndex.from_gdf(base_sgg())
+    regions.save(DST_REGIONS)
+    regions.assign(base_sgg()).to_crs(epsg=DST_EPSG).to_file(
+        DST_SGG, driver="GeoJSON", COORDINATE_PRECISION=args.precision
+    )
+    stage.done()
+else:
+    regions = RegionIndex.load(DST_REGIONS)
+
+# 4. 시도 외곽선: 시군구를 SIDO_NM으로 dissolve (EPSG:5179 그대로 중간 산출물로 보관 → 허용오차만 바꿀 때 재사용)
+stage = manifest.stage(
+    "sido_dissolve", inputs=[SRC], params={"min_part_area": args.min_part_area}, outputs=[DST_SIDO_DISSOLVED]
+)
+if run(stage):
+    sido_gdf = dissolve_sido(regions.assign(base_sgg()))
+    DST_SIDO_DISSOLVED.parent.mkdir(parents=True, exist_ok=True)
+    sido_gdf.to_file(DST_SIDO_DISSOLVED, driver="GPKG", promote_to_multi=False)
+    stage.done()
+
+# 5. 재투영 + 저장. --sido-tolerance > 0이면 시도 간 공유 경계를 한 번만 단순화 (topojson: 이웃 시도 외곽선이 어긋나지 않음)
+#    기본값 0: 기본 단계 시군구를 dissolve한 그대로 (확대 화면에서 시군구 경계와 겹침)
+stage = manifest.stage(
+    "sido", inputs=[DST_SIDO_DISSOLVED], params={**stage_params, "sido_tolerance": args.sido_tolerance},
+    outputs=[DST_SIDO],
+)
+if run(stage):
+    sido_gdf = gpd.read_file(DST_SIDO_DISSOLVED)
+    if args.sido_tolerance > 0:
+        topo = tp.Topology(sido_gdf, prequantize=False, toposimplify=args.sido_tolerance)
+        sido_gdf = topo.to_gdf().set_crs(sido_gdf.crs, allow_override=True)
+    sido_gdf.to_crs(epsg=DST_EPSG).to_file(DST_SIDO, driver="GeoJSON", COORDINATE_PRECISION=args.precision)
+    stage.done()
+
+# 6. 줌 단계별 시군구 경계 + 시도 외곽선 + 목록 (앱은 geo_sgg_lod.json을 읽어 줌에 따라 둘 다 교체)
+#    기본 단계(DST_SGG, DST_SIDO)는 1-5에서 저장. 지역 색인은 내용 해시로 추적하므로 id가 그대로면 다시 만들지 않는다.
+lod_list = []
+for i, level in enumerate(LOD_LEVELS):
+    if not level["src"].exists():
+        print(f"  - 줌 단계 건너뜀 (원본 없음): {level['src']}")
+        continue
+    if level["dst"] != DST_SGG:
+        min_part_area = args.min_part_area if level["min_part_area"] is None else level["min_part_area"]
+        stage = manifest.stage(
+            f"lod{i}", inputs=[level["src"], RULES, DST_REGIONS],
+            params={**stage_params, "min_part_area": min_part_area, "tolerance": level["tolerance"], "outline": "dissolve"},
+            outputs=[level["dst"], level["outline"]],
+        )
+        if run(stage):
+            level_gdf = regions.assign(build_sgg(level["src"], min_part_area, level["tolerance"]))
+            level_gdf.to_crs(epsg=DST_EPSG).to_file(level["dst"], driver="GeoJSON", COORDINATE_PRECISION=args.precision)
+            dissolve_sido(level_gdf).to_crs(epsg=DST_EPSG).to_file(
+                level["outline"], driver="GeoJSON", COORDINATE_PRECISION=args.precision
+            )
+            stage.done()
+    lod_list.append({
+        "file": level["dst"].name, "outline": level["outline"].name,
+        "min_zoom": level["min_zoom"], "tolerance": level["tolerance"],
+    })
+with open(DST_LOD, "w", encoding="utf-8") as f:
+    json.dump(lod_list, f, ensure_ascii=False, indent=2)
+
+# 7. 시도 드릴다운: 가장 세밀한 줌 단계를 시도별로 나눈 부분집합 (feature는 id 순서 유지) + 시도 범위 (앱의 지도 맞춤)
+detail = DST_SGG.with_name(lod_list[-1]["file"])
+stage = manifest.stage("sido_subsets", inputs=[detail, DST_REGIONS], params={}, outputs=[DST_DRILL])
+if run(stage):
+    with open(detail, encoding="utf-8") as f:
+        features = json.load(f)["features"]
+    bounds = gpd.GeoDataFrame.from_features(features).bounds.to_numpy()
+    subsets = {}
+    for feature, bbox in zip(features, bounds):
+        region_id = feature["properties"]["region_id"]
+        subsets.setdefault(regions.regions[region_id][0], []).append((region_id, feature, bbox))
+    drill = []
+    for sido, members in sorted(subsets.items()):
+        boxes = np.array([bbox for _, _, bbox in members])
+        bbox = [*boxes[:, :2].min(axis=0), *boxes[:, 2:].max(axis=0)]
+        drill.append({
+            "sido": sido,
+            "region_ids": [region_id for region_id, _, _ in members],
+            "bbox": [round(float(v), args.precision) for v in bbox],
+            "geojson": {"type": "FeatureCollection", "features": [feature for _, feature, _ in members]},
+        })
+    with open(DST_DRILL, "w", encoding="utf-8") as f:
+        json.dump(drill, f, ensure_ascii=False, separators=(",", ":"))
+    stage.done()
+
+# 8. (선택) 양자화 TopoJSON: 공유 경계를 arc 하나로 저장 + 정수 델타 인코딩
+topo_paths = []
+if args.topojson:
+    for dst in (DST_SGG, DST_SIDO):
+        topo_path = dst.with_suffix(".topo.json")
+        stage = manifest.stage(
+            f"topojson_{dst.stem}", inputs=[dst], params={"quantize": args.quantize}, outputs=[topo_path]
+        )
+        if run(stage):
+            tp.Topology(gpd.read_file(dst), prequantize=args.quantize).to_json(topo_path)
+            stage.done()
+        topo_paths.append(topo_path)
 
 # 검증
-with open(DST_SGG) as f:
+with open(DST_SGG, encoding="utf-8") as f:
     geo = json.load(f)
 n = len(geo["features"])
-print(f"✓ {DST_SGG} 생성 완료 ({n}개 feature, {DST_SGG.stat().st_size / 1e6:.1f} MB)")
-print(f"✓ {DST_SIDO} 생성 완료 ({len(sido_gdf)}개 시도, {DST_SIDO.stat().st_size / 1e6:.1f} MB)")
+print(f"✓ {DST_SGG} 생성 완료 ({n}개 feature, {size_mb(DST_SGG):.1f} MB)")
+with open(DST_SIDO, encoding="utf-8") as f:
+    n_sido = len(json.load(f)["features"])
+print(f"✓ {DST_SIDO} 생성 완료 ({n_sido}개 시도, {size_mb(DST_SIDO):.1f} MB)")
+print(f"✓ {DST_REGIONS} 생성 완료 ({len(regions)}개 시군구)")
+for entry in lod_list:
+    path = DST_SGG.with_name(entry["file"])
+    outline = DST_SGG.with_name(entry["outline"])
+    print(f"✓ 줌 단계 min_zoom={entry['min_zoom']}: {path} ({size_mb(path):.2f} MB), 시도 외곽선 {outline.name} ({size_mb(outline):.2f} MB)")
+with open(DST_DRILL, encoding="utf-8") as f:
+    n_drill = len(json.load(f))
+print(f"✓ {DST_DRILL} 생성 완료 ({n_drill}개 시도 부분집합, {size_mb(DST_DRILL):.2f} MB)")
+for topo_path in topo_paths:
+    print(f"✓ {topo_path} 생성 완료 ({size_mb(topo_path):.2f} MB)")
+
+if n_parts:
+    print(f"  조각 수: {n_parts[0]} → {n_parts[1]} (최소 면적 {args.min_part_area} km²)")
+for dst, before in prev_sizes.items():
+    print(f"  크기 비교 {dst.name}: {before:.2f} MB → {size_mb(dst):.2f} MB")
 
 # 세종 확인
 for feat in geo["features"]:
@@ -50,7 +288,6 @@ for feat in geo["features"]:
         break
 
 # 동명 시군구 확인
-from collections import Counter
 names = [f["properties"]["csv_sigungu"] for f in geo["features"]]
 dups = {k: v for k, v in Counter(names).items() if v > 1}
 print(f"  동명 시군구: {len(dups)}종 → 복합키로 해결: {list(dups.keys())}")
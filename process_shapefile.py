@@ -1,76 +1,206 @@
+"""원본 시군구 Shapefile → 지역 코드 조인 + 구 단위 dissolve + 허용오차별 위상 보존 단순화.
+
+증분 빌드 (pipeline_manifest.py): 입력 해시(Excel, Shapefile 구성 파일)와 허용오차·CRS를
+datasets/.pipeline/manifest.json에 기록하고, 바뀐 단계만 다시 만든다.
+  - 조인·dissolve: Excel 또는 Shapefile이 바뀌었을 때만 (결과 sgg_20250630.json을 다음 단계 입력으로 재사용)
+  - 단순화: 허용오차별 단계 — LOD_TOLERANCES의 값 하나를 바꾸면 그 출력만 다시 만든다
+처리 코드를 고친 뒤에는 --force로 전체를 다시 만든다.
+
+병렬 모드 (--jobs N, 기본 CPU 코어 수; 1 = 직렬): dissolve와 단순화를 시도 단위로 나눠 프로세스 풀에서 처리한다
+(parallel_geometry.py). 위상은 전체에서 1회 구성하므로 이웃 시도의 공유 경계는 같은 arc 하나로 단순화되고,
+출력은 직렬 경로와 같다 (--verify: 직렬 경로도 실행해 비교). 실행이 끝나면 단계별 소요 시간을 출력한다.
+"""
+
+import argparse
+import glob
 import os
-import pandas as pd
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
 import geopandas as gpd
+import shapely
 import topojson as tp
 
-print("1. Excel 지역 코드 매핑 로딩 중...")
+from parallel_geometry import dissolve_by_sido, toposimplify_by_sido
+from pipeline_manifest import Manifest
+from region_codes import RegionCodes
+
 excel_path = 'datasets/shapefile/센서스 공간정보 지역 코드.xlsx'
-df_codes = pd.read_excel(excel_path, header=1, dtype=str)
+shp_path = 'datasets/shapefile/BND_SIGUNGU_PG/BND_SIGUNGU_PG.shp'
+out_dir = 'datasets/shapefile/SGG_2025'
+out_file1 = os.path.join(out_dir, 'sgg_20250630.json')
 
-df_sgg = df_codes[['시도코드', '시도명칭', '시군구코드', '시군구명칭']].drop_duplicates().copy()
-df_sgg['시군구코드_3자리'] = df_sgg['시군구코드'].str.zfill(3)
-df_sgg['SIGUNGU_CD'] = df_sgg['시도코드'] + df_sgg['시군구코드_3자리']
+# 하나의 토폴로지에서 허용오차별로 단순화 → 줌 단계별 지오메트리 (단계가 달라도 이웃 경계가 일치)
+# 5 km: 기본 단계 (prepare_dashboard_data.py 입력), 1 km: 확대 시 세밀 단계
+LOD_TOLERANCES = {5000: 'smooth_sgg_2025.json', 1000: 'smooth_sgg_2025_1000m.json'}
+DISSOLVE_BY = ['시도명칭', 'TARGET_NM']
 
-def get_target_nm(row):
-    nm = row['시군구명칭'].strip()
-    sido = row['시도명칭']
-    # 도/특별자치도 산하의 시 소속 비자치구 (예: '수원시 장안구' -> '수원시')
-    # 화성시, 남양주시 등은 공백이 없어 그대로 리턴됨
-    if ('도' in sido or '특별자치도' in sido) and ('시 ' in nm and nm.endswith('구')):
-        return nm.split(' ')[0]
-    return nm
+timings = []  # (단계, 초)
 
-df_sgg['TARGET_NM'] = df_sgg.apply(get_target_nm, axis=1)
 
-print("2. 원본 Shapefile 로딩 중...")
-shp_path = 'datasets/shapefile/BND_SIGUNGU_PG/BND_SIGUNGU_PG.shp'
-gdf = gpd.read_file(shp_path)
-print(f" -> 로딩 완료 (총 {len(gdf)}개 행). 좌표계(CRS): {gdf.crs}")
+@contextmanager
+def timed(name):
+    t = time.perf_counter()
+    yield
+    timings.append((name, time.perf_counter() - t))
 
-print("3. 데이터 병합(Join) 및 전처리...")
-gdf_merged = gdf.merge(df_sgg[['SIGUNGU_CD', '시도명칭', 'TARGET_NM']], on='SIGUNGU_CD', how='left')
 
-missing_mask = gdf_merged['TARGET_NM'].isna()
-if missing_mask.any():
-    print(f" -> 경고: 엑셀 매핑이 없는 {missing_mask.sum()}개 행에 대해 원본 데이터 유지")
-    gdf_merged.loc[missing_mask, 'TARGET_NM'] = gdf_merged.loc[missing_mask, 'SIGUNGU_NM']
-    gdf_merged.loc[missing_mask, '시도명칭'] = '기타'
+def load_merged():
+    """1-3. 지역 코드 레지스트리 + 원본 Shapefile 조인."""
+    # 도/특별자치도 산하의 시 소속 비자치구는 TARGET_NM이 소속 시 (예: '수원시 장안구' -> '수원시')
+    with timed("지역 코드 로딩"):
+        df_sgg = RegionCodes.load(excel_path).sigungu
 
-print("4. 하위 '구' 단위 12개 시에 대한 병합 (Dissolve) 수행 중...")
-dissolved_gdf = gdf_merged.dissolve(by=['시도명칭', 'TARGET_NM'], as_index=False)
-dissolved_gdf = dissolved_gdf[['시도명칭', 'TARGET_NM', 'SIGUNGU_CD', 'geometry']]
-dissolved_gdf.rename(columns={'TARGET_NM': 'SIGUNGU_NM', '시도명칭': 'SIDO_NM'}, inplace=True)
-print(f" -> 결과 병합 완료 (총 {len(dissolved_gdf)}개 시군구 폴리곤 완성)")
+    print("2. 원본 Shapefile 로딩 중...")
+    with timed("Shapefile 로딩"):
+        gdf = gpd.read_file(shp_path)
+    print(f" -> 로딩 완료 (총 {len(gdf)}개 행). 좌표계(CRS): {gdf.crs}")
 
-out_dir = 'datasets/shapefile/SGG_2025'
-os.makedirs(out_dir, exist_ok=True)
+    print("3. 데이터 병합(Join) 및 전처리...")
+    with timed("조인"):
+        gdf_merged = gdf.merge(df_sgg[['SIGUNGU_CD', '시도명칭', 'TARGET_NM']], on='SIGUNGU_CD', how='left')
 
-out_file1 = os.path.join(out_dir, 'sgg_20250630.json')
-print(f"5. 원본 해상도 병합 GeoJSON 저장: {out_file1}")
-dissolved_gdf.to_file(out_file1, driver='GeoJSON')
-size_mb = os.path.getsize(out_file1) / (1024*1024)
-print(f" -> 저장 완료 (크기: {size_mb:.2f} MB)")
-
-print("\n6. Topology-preserving Smoothing (단순화) 적용 중...")
-tolerance = 5000  # 5km (for projected CRS like EPSG:5179 in meters)
-if dissolved_gdf.crs and dissolved_gdf.crs.is_geographic:
-    # 5km in degrees (approx)
-    tolerance = 5000 / 111000.0
-    print(f" -> 지리(경위도) 좌표계 감지. 허용오차(Tolerance): {tolerance:.5f} degree 적용")
-else:
-    print(f" -> 투영(평면) 좌표계 감지. 허용오차(Tolerance): {tolerance} meters 적용")
-
-# topojson 라이브러리로 빈틈/겹침 없는 위상 보정 스무딩 진행
-topo = tp.Topology(dissolved_gdf, prequantize=False)
-simplified_topo = topo.toposimplify(tolerance)
-smooth_gdf = simplified_topo.to_gdf()
-
-# CRS 속성 복구
-if smooth_gdf.crs is None:
-    smooth_gdf.set_crs(dissolved_gdf.crs, inplace=True)
-
-out_file2 = os.path.join(out_dir, 'smooth_sgg_2025.json')
-print(f"7. 스무딩 완료된 GeoJSON 저장: {out_file2}")
-smooth_gdf.to_file(out_file2, driver='GeoJSON')
-size2_mb = os.path.getsize(out_file2) / (1024*1024)
-print(f" -> 정상 저장 완료! (축소된 파일 크기: {size2_mb:.2f} MB)")
+        missing_mask = gdf_merged['TARGET_NM'].isna()
+        if missing_mask.any():
+            print(f" -> 경고: 엑셀 매핑이 없는 {missing_mask.sum()}개 행에 대해 원본 데이터 유지")
+            gdf_merged.loc[missing_mask, 'TARGET_NM'] = gdf_merged.loc[missing_mask, 'SIGUNGU_NM']
+            gdf_merged.loc[missing_mask, '시도명칭'] = '기타'
+    return gdf_merged
+
+
+def same_frames(a, b):
+    """속성과 좌표가 정확히 같은지 (--verify)."""
+    geometry = a.geometry.name
+    return (
+        a.drop(columns=geometry).equals(b.drop(columns=geometry))
+        and bool(shapely.equals_exact(a.geometry.values, b.geometry.values, tolerance=0).all())
+    )
+
+
+def dissolve(gdf_merged, pool, verify):
+    """4. 하위 '구' 단위 시 병합. 병렬 모드는 시도별로 나눠 dissolve (그룹 키에 시도가 포함)."""
+    with timed("dissolve"):
+        if pool is None:
+            dissolved_gdf = gdf_merged.dissolve(by=DISSOLVE_BY, as_index=False)
+        else:
+            dissolved_gdf = dissolve_by_sido(gdf_merged, DISSOLVE_BY, pool)
+    if verify and pool is not None:
+        with timed("dissolve (직렬 검증)"):
+            serial = gdf_merged.dissolve(by=DISSOLVE_BY, as_index=False)
+        if not same_frames(dissolved_gdf, serial):
+            sys.exit("✗ 병렬 dissolve 결과가 직렬 경로와 다릅니다")
+        print(" -> 검증: 병렬 dissolve = 직렬 dissolve")
+
+    dissolved_gdf = dissolved_gdf[['시도명칭', 'TARGET_NM', 'SIGUNGU_CD', 'geometry']]
+    return dissolved_gdf.rename(columns={'TARGET_NM': 'SIGUNGU_NM', '시도명칭': 'SIDO_NM'})
+
+
+def toposimplify(topo, tolerance, tolerance_m, pool, verify):
+    """위상 보존 단순화. 병렬 모드는 arc를 시도별로 나눠 단순화 (공유 경계 arc는 한 시도에서 1회)."""
+    with timed(f"단순화 {tolerance_m} m"):
+        if pool is None:
+            simplified_topo = topo.toposimplify(tolerance)
+        else:
+            simplified_topo = toposimplify_by_sido(topo, tolerance, pool)
+    if verify and pool is not None:
+        with timed(f"단순화 {tolerance_m} m (직렬 검증)"):
+            serial = topo.toposimplify(tolerance)
+        if serial.output["arcs"] != simplified_topo.output["arcs"]:
+            sys.exit(f"✗ 병렬 단순화 결과가 직렬 경로와 다릅니다 (허용오차 {tolerance_m} m)")
+        print(" -> 검증: 병렬 단순화 = 직렬 단순화")
+    return simplified_topo
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--force", action="store_true", help="매니페스트를 무시하고 모든 단계를 다시 만든다")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="프로세스 수 (1 = 직렬, 기본 CPU 코어 수)")
+    parser.add_argument("--verify", action="store_true", help="병렬 결과를 직렬 경로와 비교 (다르면 종료 코드 1)")
+    args = parser.parse_args()
+    manifest = Manifest(force=args.force)
+    pool = ProcessPoolExecutor(args.jobs) if args.jobs > 1 else None
+    print(f"프로세스 {args.jobs}개 ({'병렬' if pool else '직렬'})")
+
+    # Shapefile은 .shp/.dbf/.shx/.prj/.cpg 묶음 → 모두 입력으로 추적
+    shp_files = sorted(glob.glob(os.path.splitext(shp_path)[0] + '.*'))
+    stage = manifest.stage('shapefile_dissolve', inputs=[excel_path, *shp_files], params={}, outputs=[out_file1])
+    if not stage.stale:
+        print(f"1-5. 조인·dissolve 건너뜀 (입력 변경 없음): {out_file1}")
+    else:
+        print(f"1. 지역 코드 매핑 로딩 중 (region_codes.py 캐시)... ({stage.reason})")
+        gdf_merged = load_merged()
+
+        print("4. 하위 '구' 단위 12개 시에 대한 병합 (Dissolve) 수행 중...")
+        dissolved_gdf = dissolve(gdf_merged, pool, args.verify)
+        print(f" -> 결과 병합 완료 (총 {len(dissolved_gdf)}개 시군구 폴리곤 완성)")
+
+        os.makedirs(out_dir, exist_ok=True)
+        print(f"5. 원본 해상도 병합 GeoJSON 저장: {out_file1}")
+        with timed("저장 (병합본)"):
+            dissolved_gdf.to_file(out_file1, driver='GeoJSON')
+        size_mb = os.path.getsize(out_file1) / (1024*1024)
+        print(f" -> 저장 완료 (크기: {size_mb:.2f} MB)")
+        stage.done()
+
+    print("\n6. Topology-preserving Smoothing (단순화) 적용 중...")
+    # 허용오차별 단계: 입력은 항상 저장된 병합 GeoJSON (dissolve를 건너뛴 실행과 결과가 같도록)
+    stages = {
+        tolerance_m: manifest.stage(
+            f'smooth_{tolerance_m}m', inputs=[out_file1], params={'tolerance_m': tolerance_m},
+            outputs=[os.path.join(out_dir, out_name)],
+        )
+        for tolerance_m, out_name in LOD_TOLERANCES.items()
+    }
+    if any(stage.stale for stage in stages.values()):
+        with timed("병합본 로딩"):
+            dissolved_gdf = gpd.read_file(out_file1)
+        is_geographic = bool(dissolved_gdf.crs and dissolved_gdf.crs.is_geographic)
+
+        # topojson 라이브러리로 빈틈/겹침 없는 위상 보정 스무딩 진행 (위상은 전체에서 1회: 공유 경계 = arc 하나)
+        with timed("위상 구성"):
+            topo = tp.Topology(dissolved_gdf, prequantize=False)
+
+    for step, (tolerance_m, out_name) in enumerate(LOD_TOLERANCES.items(), start=1):
+        stage = stages[tolerance_m]
+        if not stage.stale:
+            print(f" -> [{step}] {tolerance_m} m 건너뜀 (최신): {out_name}")
+            continue
+        print(f" -> [{step}] {tolerance_m} m 다시 만듦 ({stage.reason})")
+        if is_geographic:
+            # 허용오차 m → degree (approx)
+            tolerance = tolerance_m / 111000.0
+            print(f" -> [{step}] 지리(경위도) 좌표계 감지. 허용오차(Tolerance): {tolerance:.5f} degree 적용")
+        else:
+            tolerance = tolerance_m
+            print(f" -> [{step}] 투영(평면) 좌표계 감지. 허용오차(Tolerance): {tolerance} meters 적용")
+
+        simplified_topo = toposimplify(topo, tolerance, tolerance_m, pool, args.verify)
+        with timed(f"GeoDataFrame 변환 {tolerance_m} m"):
+            smooth_gdf = simplified_topo.to_gdf()
+
+        # CRS 속성 복구
+        if smooth_gdf.crs is None:
+            smooth_gdf.set_crs(dissolved_gdf.crs, inplace=True)
+
+        out_file2 = os.path.join(out_dir, out_name)
+        print(f"7-{step}. 스무딩 완료된 GeoJSON 저장: {out_file2}")
+        with timed(f"저장 {tolerance_m} m"):
+            smooth_gdf.to_file(out_file2, driver='GeoJSON')
+        size2_mb = os.path.getsize(out_file2) / (1024*1024)
+        print(f" -> 정상 저장 완료! (축소된 파일 크기: {size2_mb:.2f} MB)")
+        stage.done()
+
+    if pool is not None:
+        pool.shutdown()
+
+    if timings:
+        print("\n단계별 소요 시간:")
+        for name, seconds in timings:
+            print(f"  {seconds:>8.2f}s  {name}")
+        print(f"  {sum(seconds for _, seconds in timings):>8.2f}s  합계")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""센서스 공간정보 지역 코드(Excel) 레지스트리: 1회 파싱 후 캐시 + 코드 ↔ 명칭 ↔ 상위 지역 조회.
+
+pd.read_excel은 느리므로 (약 0.8 s) 원본이 바뀌었을 때만 파싱하고, 결과 DataFrame은
+datasets/.pipeline/region_codes.pkl에 저장해 다음 실행부터 재사용한다.
+캐시 유효성은 파이프라인 매니페스트(pipeline_manifest.py)가 원본 해시로 판단한다.
+
+코드 체계: 시도 2자리, 시군구 5자리 (시도 + 시군구 3자리), 읍면동 8자리 (시군구 + 읍면동 3자리).
+도 산하 시의 행정구(예: '수원시 장안구')는 target_name에서 소속 시('수원시')로 합친다
+(Shapefile dissolve 키, 대시보드 시군구 단위와 같다).
+
+    codes = RegionCodes.load()
+    codes.name("31011")          # '수원시 장안구'
+    codes.target_name("31011")   # '수원시'
+    codes.parent("31011")        # '31' (경기도)
+    codes.code("경기도", "수원시 장안구")  # '31011'
+"""
+
+import pickle
+
+import pandas as pd
+
+from pipeline_manifest import PIPELINE_DIR, Manifest
+
+EXCEL = "datasets/shapefile/센서스 공간정보 지역 코드.xlsx"
+CACHE = PIPELINE_DIR / "region_codes.pkl"
+# 캐시 형식이 바뀌면 올린다 (매니페스트 파라미터 → 기존 캐시 무효화)
+CACHE_VERSION = 1
+
+
+def read_excel(path=EXCEL):
+    """원본 Excel → 읍면동 단위 DataFrame (모든 코드는 앞자리 0을 유지한 문자열)."""
+    return pd.read_excel(path, header=1, dtype=str)
+
+
+def collapse_admin_gu(sido_names, sigungu_names):
+    """행정구 → 소속 시 (벡터 연산). 도/특별자치도 산하 '○○시 ○○구'만 합치고 광역시 자치구는 그대로."""
+    names = sigungu_names.str.strip()
+    admin_gu = (
+        sido_names.str.contains("도", regex=False)
+        & names.str.contains("시 ", regex=False)
+        & names.str.endswith("구")
+    )
+    return names.where(~admin_gu, names.str.split(" ", n=1).str[0]), admin_gu
+
+
+class RegionCodes:
+    """지역 코드 표. frame = 읍면동 행 원본, sido / sigungu = 코드 단위 표."""
+
+    def __init__(self, frame):
+        self.frame = frame
+
+        sigungu = frame[["시도코드", "시도명칭", "시군구코드", "시군구명칭"]].drop_duplicates().copy()
+        sigungu["SIGUNGU_CD"] = sigungu["시도코드"] + sigungu["시군구코드"].str.zfill(3)
+        sigungu["TARGET_NM"], sigungu["admin_gu"] = collapse_admin_gu(sigungu["시도명칭"], sigungu["시군구명칭"])
+        self.sigungu = sigungu.reset_index(drop=True)
+        self.sido = frame[["시도코드", "시도명칭"]].drop_duplicates().reset_index(drop=True)
+
+        emd_codes = frame["시도코드"] + frame["시군구코드"].str.zfill(3) + frame["읍면동코드"].str.zfill(3)
+        self._names = {
+            **dict(zip(self.sido["시도코드"], self.sido["시도명칭"])),
+            **dict(zip(self.sigungu["SIGUNGU_CD"], self.sigungu["시군구명칭"])),
+            **dict(zip(emd_codes, frame["읍면동명칭"])),
+        }
+        self._target = dict(zip(self.sigungu["SIGUNGU_CD"], self.sigungu["TARGET_NM"]))
+        self._codes = {
+            **{(name,): code for code, name in zip(self.sido["시도코드"], self.sido["시도명칭"])},
+            **{
+                (sido, name): code
+                for code, sido, name in zip(self.sigungu["SIGUNGU_CD"], self.sigungu["시도명칭"], self.sigungu["시군구명칭"])
+            },
+        }
+
+    def __len__(self):
+        return len(self.sigungu)
+
+    @classmethod
+    def load(cls, path=EXCEL, cache=CACHE):
+        """캐시가 원본과 같으면 캐시에서, 아니면 Excel을 파싱해 캐시를 다시 쓴다."""
+        manifest = Manifest()
+        stage = manifest.stage("region_codes", inputs=[path], params={"version": CACHE_VERSION}, outputs=[cache])
+        if not stage.stale:
+            with open(cache, "rb") as f:
+                return cls(pickle.load(f))
+        frame = read_excel(path)
+        cache.parent.mkdir(parents=True, exist_ok=True)
+        with open(cache, "wb") as f:
+            pickle.dump(frame, f, protocol=pickle.HIGHEST_PROTOCOL)
+        stage.done()
+        return cls(frame)
+
+    def name(self, code):
+        """시도(2자리)·시군구(5자리)·읍면동(8자리) 코드 → 명칭. 없으면 None."""
+        return self._names.get(code)
+
+    def target_name(self, sigungu_code):
+        """시군구 코드 → dissolve 단위 명칭 (행정구는 소속 시)."""
+        return self._target.get(sigungu_code)
+
+    def parent(self, code):
+        """상위 지역 코드 (읍면동 → 시군구 → 시도 → None)."""
+        return {8: code[:5], 5: code[:2]}.get(len(code))
+
+    def code(self, sido, sigungu=None):
+        """명칭 → 코드 (시도만 주면 시도 코드). 없으면 None."""
+        return self._codes.get((sido,) if sigungu is None else (sido, sigungu))
@@ -0,0 +1,106 @@
+"""지역 색인: CSV/GeoJSON 지역명 보정 규칙 + 정수 지역 id ↔ (시도, 시군구) ↔ feature 위치.
+
+보정은 빌드 단계에서만 적용한다.
+  - prepare_dashboard_data.py: GeoJSON 조인 키 보정 → region_index.json 생성,
+    모든 줌 단계 GeoJSON을 id 순서로 저장하고 feature마다 properties.region_id 기록 (feature 위치 = id)
+  - build_indicator_store.py: CSV 지역명 보정 → 모든 시군구 키가 색인에 있는지 검증 → 큐브 시군구 축 = id 순서
+app.py는 문자열 보정 없이 id로 큐브 배열과 지오메트리를 맞춘다.
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# CSV 시도명 변경 (구 명칭 → GeoJSON 명칭)
+CSV_SIDO_RENAMES = {"전라북도": "전북특별자치도"}
+# CSV 시군구의 소속 시도 변경 — 군위군: 2023년 경상북도 → 대구광역시 편입 (GeoJSON은 최신 기준)
+CSV_SIGUNGU_SIDO = {"군위군": "대구광역시"}
+# 시군구 데이터가 없어 시도 행을 시군구 행으로도 쓰는 시도 (세종)
+CSV_SIDO_AS_SIGUNGU = ["세종특별자치시"]
+# GeoJSON 시군구명 → CSV 시군구명 (세종시 폴리곤 1개 = CSV 시도 레벨 세종특별자치시)
+GEO_SIGUNGU_RENAMES = {"세종시": "세종특별자치시"}
+
+
+def region_key(sido, sigungu):
+    """동명 시군구 대응 복합키 (서구, 중구, 동구 등 7종 중복). GeoJSON csv_sido_sigungu와 동일."""
+    return f"{sido} {sigungu}"
+
+
+def normalize_csv_region(sido, sigungu):
+    """CSV (시도, 시군구) 한 쌍 → GeoJSON 기준 (시도, 시군구). normalize_csv_regions의 행 단위 버전."""
+    return CSV_SIGUNGU_SIDO.get(sigungu, CSV_SIDO_RENAMES.get(sido, sido)), sigungu
+
+
+def normalize_csv_regions(df):
+    """indicators_long DataFrame의 지역명을 GeoJSON 기준으로 보정한 새 DataFrame."""
+    df = df.copy()
+    df["sido"] = df["sido"].replace(CSV_SIDO_RENAMES)
+    for sigungu, sido in CSV_SIGUNGU_SIDO.items():
+        df.loc[df["sigungu"] == sigungu, "sido"] = sido
+
+    as_sigungu = df[df["sido"].isin(CSV_SIDO_AS_SIGUNGU) & (df["region_type"] == "시도")].copy()
+    as_sigungu["region_type"] = "시군구"
+    return pd.concat([df, as_sigungu], ignore_index=True)
+
+
+def normalize_geo_regions(gdf):
+    """시군구 GeoDataFrame에 CSV 조인 키(csv_sigungu, csv_sido_sigungu)를 추가한다."""
+    gdf["csv_sigungu"] = gdf["SIGUNGU_NM"].replace(GEO_SIGUNGU_RENAMES)
+    gdf["csv_sido_sigungu"] = [region_key(sd, sgg) for sd, sgg in zip(gdf["SIDO_NM"], gdf["csv_sigungu"])]
+    return gdf
+
+
+class RegionIndex:
+    """시군구 정수 id 색인. id는 (시도, 시군구) 정렬 순서이며 큐브 시군구 축·GeoJSON feature 순서와 같다."""
+
+    def __init__(self, regions, codes=None):
+        self.regions = [tuple(region) for region in regions]  # [(sido, sigungu), ...]
+        self.codes = list(codes) if codes is not None else [None] * len(self.regions)
+        self.keys = [region_key(sd, sgg) for sd, sgg in self.regions]
+        self.id_of = {key: i for i, key in enumerate(self.keys)}
+        if len(self.id_of) != len(self.keys):
+            raise ValueError("지역 색인에 중복 키가 있습니다")
+
+    def __len__(self):
+        return len(self.regions)
+
+    @classmethod
+    def from_gdf(cls, gdf):
+        """normalize_geo_regions를 거친 GeoDataFrame → 색인 (id = 복합키 정렬 순서)."""
+        table = gdf[["SIDO_NM", "csv_sigungu", "SIGUNGU_CD"]].sort_values(["SIDO_NM", "csv_sigungu"])
+        return cls(zip(table["SIDO_NM"], table["csv_sigungu"]), table["SIGUNGU_CD"])
+
+    def missing(self, keys):
+        """색인에 없는 복합키 (정렬, 중복 제거)."""
+        return sorted({key for key in keys if key not in self.id_of})
+
+    def assign(self, gdf):
+        """GeoDataFrame을 id 순서로 정렬하고 region_id를 기록한다. 키 집합이 색인과 다르면 ValueError."""
+        ids = gdf["csv_sido_sigungu"].map(self.id_of)
+        unknown = self.missing(gdf["csv_sido_sigungu"])
+        if unknown or ids.nunique() != len(gdf) or len(gdf) != len(self):
+            raise ValueError(f"GeoJSON 지역 키가 지역 색인과 다릅니다: {len(gdf)}개 feature, 색인 {len(self)}개, 미등록 {unknown}")
+        gdf = gdf.assign(region_id=ids.astype(int)).sort_values("region_id")
+        return gdf.reset_index(drop=True)
+
+    def check_features(self, features):
+        """GeoJSON feature 목록이 id 순서로 저장되어 있는지 확인 (feature 위치 = id)."""
+        ids = np.array([feat["properties"].get("region_id", -1) for feat in features])
+        if len(ids) != len(self) or not np.array_equal(ids, np.arange(len(self))):
+            raise ValueError("GeoJSON feature가 지역 색인 순서가 아닙니다. prepare_dashboard_data.py를 다시 실행하세요.")
+
+    def save(self, path):
+        entries = [
+            {"id": i, "sido": sd, "sigungu": sgg, "code": code}
+            for i, ((sd, sgg), code) in enumerate(zip(self.regions, self.codes))
+        ]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(entries, f, ensure_ascii=False, indent=1)
+
+    @classmethod
+    def load(cls, path):
+        with open(Path(path), encoding="utf-8") as f:
+            entries = sorted(json.load(f), key=lambda entry: entry["id"])
+        return cls([(e["sido"], e["sigungu"]) for e in entries], [e.get("code") for e in entries])
@@ -0,0 +1,155 @@
+"""지역 검색 색인: 시군구·시도 이름의 앞부분 / 초성 / 입력 중인 글자로 찾는다 (앱 로딩 시 1회 생성).
+
+검색어마다 지역명을 훑지 않도록, 모든 검색 이름(시군구, 시도+시군구, 줄임 시도+시군구, 시도, 줄임 시도,
+region_hierarchy.json의 옛 이름)에 대해 "이 검색어면 이 이름이 맞는다"는 검색어 형태를 모두 미리 사전에 넣는다.
+"강남구"의 두 번째 글자까지라면:
+  강남  앞부분 그대로          강나  입력 중인 마지막 글자 (받침 전)
+  강ㄴ  마지막 글자만 초성      ㄱㄴ  전부 초성
+검색은 사전 한 번 조회다. 마지막 글자의 받침이 다음 글자 초성일 수 있는 경우 ("석" → 서구)는
+받침을 뗀 형태("서ㄱ")로 한 번 더 조회한다. 초성과 완성 글자가 섞인 드문 검색어 ("ㄱ남")만
+초성 골격으로 후보를 얻어 글자 단위로 확인한다.
+"""
+
+from region_index import normalize_csv_region
+
+CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+JONGSEONG = ["", "ㄱ", "ㄲ", "ㄳ", "ㄴ", "ㄵ", "ㄶ", "ㄷ", "ㄹ", "ㄺ", "ㄻ", "ㄼ", "ㄽ", "ㄾ", "ㄿ", "ㅀ",
+             "ㅁ", "ㅂ", "ㅄ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ"]
+# 겹받침 → (남는 받침, 다음 글자 초성)
+SPLIT_JONG = {"ㄳ": "ㄱㅅ", "ㄵ": "ㄴㅈ", "ㄶ": "ㄴㅎ", "ㄺ": "ㄹㄱ", "ㄻ": "ㄹㅁ", "ㄼ": "ㄹㅂ",
+              "ㄽ": "ㄹㅅ", "ㄾ": "ㄹㅌ", "ㄿ": "ㄹㅍ", "ㅀ": "ㄹㅎ", "ㅄ": "ㅂㅅ"}
+HANGUL_BASE, HANGUL_COUNT = 0xAC00, 11172
+# 검색 결과 수
+LIMIT = 10
+
+
+def _syllable(char):
+    """완성형 한글 → (초성, 중성, 종성) 번호. 아니면 None."""
+    code = ord(char) - HANGUL_BASE
+    if 0 <= code < HANGUL_COUNT:
+        return code // 588, code % 588 // 28, code % 28
+    return None
+
+
+def skeleton(text):
+    """완성 글자 → 초성 (그 밖의 글자는 그대로): "강남구" → "ㄱㄴㄱ"."""
+    out = []
+    for char in text:
+        parts = _syllable(char)
+        out.append(CHOSEONG[parts[0]] if parts else char)
+    return "".join(out)
+
+
+def _char_matches(q, t, last):
+    if q == t:
+        return True
+    parts = _syllable(t)
+    if parts is None:
+        return False
+    if q in CHOSEONG:
+        return CHOSEONG[parts[0]] == q
+    typed = _syllable(q)
+    # 입력 중인 마지막 글자: 받침 전까지 같으면 일치 ("나" → 남)
+    return last and typed is not None and typed[2] == 0 and typed[:2] == parts[:2]
+
+
+def matches(query, name):
+    """query가 name의 앞부분과 글자 단위로 맞는지 (같은 글자 / 초성 / 입력 중인 마지막 글자)."""
+    if len(query) > len(name):
+        return False
+    last = len(query) - 1
+    return all(_char_matches(q, t, i == last) for i, (q, t) in enumerate(zip(query, name)))
+
+
+def _split_last(query):
+    """마지막 글자의 받침을 다음 글자 초성으로 떼어 본 검색어 ("석" → "서ㄱ", "닭" → "달ㄱ"). 받침이 없으면 None."""
+    parts = _syllable(query[-1]) if query else None
+    if not parts or not parts[2]:
+        return None
+    split = SPLIT_JONG.get(JONGSEONG[parts[2]], JONGSEONG[parts[2]])
+    keep = JONGSEONG.index(split[0]) if len(split) > 1 else 0
+    return query[:-1] + chr(HANGUL_BASE + (parts[0] * 21 + parts[1]) * 28 + keep) + split[-1]
+
+
+def short_sido(sido):
+    """시도 줄임말: 서울특별시 → 서울, 경기도 → 경기, 충청북도 → 충북, 전북특별자치도 → 전북."""
+    for suffix in ("특별자치시", "특별자치도", "특별시", "광역시"):
+        if sido.endswith(suffix):
+            return sido[: -len(suffix)]
+    return sido[:-1] if len(sido) == 3 else sido[0] + sido[2]
+
+
+class RegionSearch:
+    """지역 검색 색인. entries[k] = {"key", "label", "kind": "시도" | "시군구", "sido", "region": 시군구 번호 | None}."""
+
+    def __init__(self, regions, sidos, hierarchy=None):
+        """regions: 큐브 시군구 축 [(시도, 시군구)], sidos: 시도 목록,
+        hierarchy: region_hierarchy.json {시도: [시군구]} (CSV 원래 이름 → 옛 이름으로도 찾도록)."""
+        self.entries = []
+        names = []  # (검색 이름, 항목 번호)
+        region_index = {region: r for r, region in enumerate(regions)}
+
+        sido_entry = {}
+        for sido in sidos:
+            r = region_index.get((sido, sido))  # 세종: 시도이자 시군구
+            sido_entry[sido] = self._add(sido, f"{sido} (시도)", "시도", sido, r)
+            names += [(sido, sido_entry[sido]), (short_sido(sido), sido_entry[sido])]
+        region_entry = {}
+        for r, (sido, sigungu) in enumerate(regions):
+            if sido == sigungu:
+                region_entry[r] = sido_entry[sido]
+                continue
+            k = region_entry[r] = self._add(f"{sido} {sigungu}", f"{sigungu} · {sido}", "시군구", sido, r)
+            names += [(sigungu, k), (sido + sigungu, k), (short_sido(sido) + sigungu, k)]
+
+        for old_sido, members in (hierarchy or {}).items():
+            for sigungu in members:
+                r = region_index.get(normalize_csv_region(old_sido, sigungu))
+                if r is not None:
+                    names += [(old_sido + sigungu, region_entry[r]), (short_sido(old_sido) + sigungu, region_entry[r])]
+            if old_sido not in sido_entry:
+                new_sido = normalize_csv_region(old_sido, None)[0]
+                if new_sido in sido_entry:
+                    names += [(old_sido, sido_entry[new_sido]), (short_sido(old_sido), sido_entry[new_sido])]
+
+        # 짧은 이름 → 시도 → 가나다 순으로 정렬해 두면 후보를 앞에서부터 LIMIT개만 확인하면 된다
+        self.names = sorted(
+            set(names), key=lambda item: (len(item[0]), self.entries[item[1]]["kind"] != "시도", item[0])
+        )
+        self.keys = {}  # 검색어 형태 → [names 번호] (names 순서)
+        for n, (name, _) in enumerate(self.names):
+            bones = skeleton(name)
+            for end in range(1, len(name) + 1):
+                head, char = name[: end - 1], name[end - 1]
+                forms = [name[:end], head + bones[end - 1], bones[:end]]
+                parts = _syllable(char)
+                if parts and parts[2]:
+                    forms.append(head + chr(HANGUL_BASE + (parts[0] * 21 + parts[1]) * 28))
+                for form in forms:
+                    ids = self.keys.setdefault(form, [])
+                    if not ids or ids[-1] != n:
+                        ids.append(n)
+        self.by_key = {entry["key"]: entry for entry in self.entries}
+
+    def _add(self, key, label, kind, sido, region):
+        self.entries.append({"key": key, "label": label, "kind": kind, "sido": sido, "region": region})
+        return len(self.entries) - 1
+
+    def search(self, text, limit=LIMIT):
+        """검색어 → 일치 항목 목록 (짧은 이름 순, 중복 없음). 공백은 무시한다."""
+        query = "".join(text.split()) if text else ""
+        if not query:
+            return []
+        found = {}
+        for candidate in filter(None, (query, _split_last(query))):
+            ids = self.keys.get(candidate, ())
+            if not ids and any(char in CHOSEONG for char in candidate[:-1]):
+                # 초성이 중간에 섞인 검색어: 전부 초성인 골격으로 후보를 얻어 확인
+                ids = [n for n in self.keys.get(skeleton(candidate), ()) if matches(candidate, self.names[n][0])]
+            for n in ids:
+                name, k = self.names[n]
+                if k not in found:
+                    found[k] = len(name)
+                    if len(found) >= limit:
+                        break
+        return [self.entries[k] for k in sorted(found, key=found.get)[:limit]]
@@ -0,0 +1,179 @@
+"""사전 렌더링 뷰: export_static_views.py가 만든 콜백 응답을 Dash 디스패치 없이 그대로 보낸다.
+
+지표 데이터는 NABIS가 새 년도를 게시할 때만 바뀌므로 전국 지도(update_map)와 지역 클릭 사이드바(update_sidebar)의
+응답은 (지표, 년도[, 시군구])별로 미리 만들어 둘 수 있다. NABIS_STATIC_DIR을 지정하면
+/_dash-update-component 요청 중 사전 렌더링된 조합은 before_request에서 파일 바이트로 바로 응답하고
+(콜백 실행·Plotly 직렬화·pandas 없음), 그 밖의 요청(드릴다운, 관심지표 없음 등)은 평소대로 Dash가 처리한다.
+
+디렉터리 구조:
+  manifest.json                 지표·년도·시군구 축, 파일 이름 형식, 지문(fingerprint)
+  map/<지표>_<년도>.json[.br|.gz] 전국 지도 응답 본문 (압축본 포함 → 응답마다 압축하지 않음)
+  sidebar/<지표>_<년도>.json.gz  시군구 id 순서의 사이드바 응답 본문 목록 (처음 요청될 때 읽어 LRU로 보관)
+
+지문은 지표 큐브 배열(저장 배열 + 순위 배열)·축 라벨과 응답을 만드는 모듈 소스(app.py, indicator_store.py, region_index.py)의 해시다. 앱이 계산한 지문과 다르면
+(데이터 갱신, 앱 수정 후 다시 내보내지 않음) 사전 렌더링 뷰를 쓰지 않고 경고만 남긴다.
+"""
+
+import functools
+import gzip
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+
+import numpy as np
+from flask import Response, request
+
+import indicator_store
+import metrics
+import region_index
+
+MANIFEST = "manifest.json"
+MAP_FILE = "map/{indicator}_{year}.json"
+SIDEBAR_FILE = "sidebar/{indicator}_{year}.json.gz"
+ENCODINGS = ("br", "gzip")
+SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+# 콜백 식별: Dash 요청 본문의 output 문자열
+MAP_OUTPUT = "choropleth-map.figure"
+SIDEBAR_OUTPUT = "..region-label.children...info-panel.children...sparkline.figure.."
+# 사전 렌더링한 지도의 화면 설정 (요청 값이 다르면 콜백이 처리)
+MAP_DEFAULTS = {"map-mode.value": "value", "sido-select.value": None}
+
+# 응답 내용을 좌우하는 모듈 소스 (app.py와 함께 지문에 포함): 큐브 배열·순위 계산, 지역명 보정·조인 키
+DEPENDENCY_SOURCES = (indicator_store.__file__, region_index.__file__)
+
+# 메모리에 보관할 사이드바 파일 수 (파일 1개 = 지표·년도 하나의 전체 시군구 응답, 약 2 MB)
+SIDEBAR_FILES = int(os.environ.get("NABIS_STATIC_SIDEBAR_FILES", "8"))
+
+logger = logging.getLogger("nabis.static_views")
+
+
+def fingerprint(cube, code_paths):
+    """큐브 축 라벨·배열 + 소스 파일들 → SHA-256 (사전 렌더링 뷰와 실행 중인 앱이 같은 응답을 만드는지 확인).
+
+    배열은 번들에 저장되는 것 전부(ARRAYS + RANK_ARRAYS)를 넣는다. 사이드바의 순위·5분위 행이 순위 배열을 쓰므로
+    순위 계산이나 번들이 바뀌면 지문도 바뀐다. code_paths: app.py + DEPENDENCY_SOURCES.
+    """
+    digest = hashlib.sha256()
+    labels = [cube.indicators, cube.years, cube.regions, cube.sidos, cube.units, cube.reference_labels]
+    digest.update(json.dumps(labels, ensure_ascii=False, default=str).encode("utf-8"))
+    for name in indicator_store.ARRAYS + indicator_store.RANK_ARRAYS:
+        digest.update(np.ascontiguousarray(getattr(cube, name)).tobytes())
+    for path in code_paths:
+        digest.update(Path(path).read_bytes())
+    return digest.hexdigest()
+
+
+class StaticViews:
+    """사전 렌더링 디렉터리. 지도 응답은 로딩 시 전부 메모리에 올리고, 사이드바는 파일 단위로 필요할 때 읽는다."""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        with open(self.directory / MANIFEST, encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        self.indicator_index = {name: i for i, name in enumerate(self.manifest["indicators"])}
+        self.years = set(self.manifest["years"])
+        self.region_index = {tuple(region): r for r, region in enumerate(self.manifest["regions"])}
+        # --no-sidebar로 내보낸 디렉터리: manifest["sidebar"]가 null → 사이드바는 Dash 콜백이 처리
+        self.has_sidebar = bool(self.manifest.get("sidebar"))
+        self._sidebar = functools.lru_cache(maxsize=SIDEBAR_FILES)(self._read_sidebar)
+        self._unreadable = set()  # 읽지 못한 사이드바 파일 (지표 번호, 년도) — 클릭마다 다시 읽지 않도록
+
+        self.maps = {}  # (지표 번호, 년도) → {None | "br" | "gzip": 본문}
+        for i in range(len(self.manifest["indicators"])):
+            for year in self.manifest["years"]:
+                path = self.directory / MAP_FILE.format(indicator=i, year=year)
+                bodies = {None: path.read_bytes()}
+                for encoding in ENCODINGS:
+                    encoded = path.with_name(path.name + SUFFIXES[encoding])
+                    if encoded.exists():
+                        bodies[encoding] = encoded.read_bytes()
+                self.maps[i, year] = bodies
+
+    @property
+    def fingerprint(self):
+        return self.manifest["fingerprint"]
+
+    def _read_sidebar(self, i, year):
+        with gzip.open(self.directory / SIDEBAR_FILE.format(indicator=i, year=year), "rt", encoding="utf-8") as f:
+            return [body.encode("utf-8") for body in json.load(f)]
+
+    def lookup(self, payload):
+        """Dash 요청 본문 → (콜백 이름, {인코딩: 본문}). 사전 렌더링 대상이 아니면 None."""
+        output = payload.get("output")
+        if output not in (MAP_OUTPUT, SIDEBAR_OUTPUT):
+            return None
+        values = {
+            f"{item['id']}.{item['property']}": item.get("value")
+            for item in payload.get("inputs", []) + payload.get("state", [])
+            if isinstance(item, dict)
+        }
+        i = self.indicator_index.get(values.get("indicator-select.value"))
+        year = values.get("year-select.value")
+        if i is None or year not in self.years:
+            return None
+
+        if output == MAP_OUTPUT:
+            # 전국 화면의 값 지도만 (드릴다운·순위 등 다른 표시 방식은 콜백이 처리)
+            if any(values.get(key, default) not in (None, default) for key, default in MAP_DEFAULTS.items()):
+                return None
+            return "update_map", self.maps[i, year]
+
+        if not self.has_sidebar:
+            return None
+        click = values.get("choropleth-map.clickData") or {}
+        points = click.get("points") or [{}]
+        customdata = points[0].get("customdata")
+        if not customdata or len(customdata) < 2:
+            return None
+        r = self.region_index.get((customdata[0], customdata[1]))
+        if r is None:
+            return None
+        if (i, year) in self._unreadable:
+            return None
+        try:
+            bodies = self._sidebar(i, year)
+        except (OSError, EOFError, ValueError) as exc:  # 파일 없음·손상 (gzip/JSON 오류): 콜백으로 넘긴다
+            self._unreadable.add((i, year))
+            logger.warning("사전 렌더링 사이드바를 읽지 못해 콜백으로 응답합니다 (%s): %s", SIDEBAR_FILE.format(indicator=i, year=year), exc)
+            return None
+        if r >= len(bodies):
+            return None
+        return "update_sidebar", {None: bodies[r]}
+
+
+def init_app(server, directory, expected):
+    """directory의 사전 렌더링 뷰를 /_dash-update-component 앞단에 등록. 지문이 다르면 등록하지 않는다."""
+    try:
+        views = StaticViews(directory)
+    except FileNotFoundError as exc:
+        logger.warning("사전 렌더링 뷰 없음 (%s): %s", directory, exc)
+        return None
+    if views.fingerprint != expected:
+        logger.warning(
+            "사전 렌더링 뷰가 현재 데이터·앱과 다릅니다 (%s). export_static_views.py를 다시 실행하세요. Dash 콜백으로 응답합니다.",
+            directory,
+        )
+        return None
+
+    @server.before_request
+    def _serve_static_view():
+        if request.method != "POST" or not request.path.endswith("/_dash-update-component"):
+            return None
+        payload = request.get_json(silent=True)
+        found = views.lookup(payload) if isinstance(payload, dict) else None
+        if found is None:
+            return None
+        callback, bodies = found
+        encoding = request.accept_encodings.best_match([e for e in ENCODINGS if e in bodies])
+        response = Response(bodies[encoding], mimetype="application/json")
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+        response.vary.add("Accept-Encoding")
+        if metrics.ENABLED:
+            metrics.registry.inc("nabis_static_view_hits_total", (("callback", callback),))
+        return response
+
+    return views
@@ -0,0 +1,27 @@
+"""운영용 WSGI 진입점: 데이터는 마스터에서 1회 로딩하고 fork된 워커가 페이지를 공유한다.
+
+  gunicorn -c gunicorn.conf.py wsgi:server
+
+gunicorn.conf.py의 preload_app=True로 이 모듈은 마스터에서 fork 전에 1회 import된다.
+  - 지표 큐브: .npy 번들을 mmap으로 열므로 워커 간 같은 페이지 캐시를 공유 (쓰기 없음)
+  - GeoJSON·지역 색인·지도 캐시(NABIS_CACHE_WARMUP=1이면 여기서 동기 적재): 마스터 힙에 만들어져 fork 후 copy-on-write로 공유
+  - 지오메트리 자산 압축본(br/gzip): 워커마다 다시 압축하지 않도록 여기서 1회 생성
+  - 사전 렌더링 지도 응답 (NABIS_STATIC_DIR): import 시 메모리에 올라가 워커가 공유
+로딩 중에는 GC를 끄고 로딩이 끝나면 gc.freeze()로 모든 객체를 영구 세대로 옮긴다.
+워커의 GC가 공유 객체의 GC 헤더를 건드리지 않아 페이지가 복사되지 않는다 (참조 카운트 변경은 접근한 객체에 한정).
+"""
+
+import gc
+
+gc.disable()
+
+import app as dashboard  # noqa: E402
+
+if dashboard.CACHE_WARMUP:
+    dashboard.warm_map_cache(background=False)
+dashboard.precompress_geometry()
+
+server = dashboard.server
+
+gc.freeze()
+gc.enable()